@@ -1,10 +1,12 @@
 from litestar import Router
 from app.config import settings
 from app.api.v1.endpoints.user_router import UserController
+from app.api.v1.endpoints.metrics_router import MetricsController
+from app.api.v1.endpoints.auth_router import AuthController
 
 api_router = Router(
     path=f"/{settings.API_V1_STR}",
-    route_handlers=[UserController]
+    route_handlers=[UserController, MetricsController, AuthController]
 
 )
 
@@ -0,0 +1,83 @@
+from litestar import Controller, get, post
+from litestar.di import Provide
+from litestar.status_codes import HTTP_200_OK, HTTP_204_NO_CONTENT
+
+from app.deps.auth_deps import provide_token_claims
+from app.deps.user_deps import get_read_user_service_provider, get_user_service_provider
+from app.schemas.auth_schema import LoginIn, TokenOut
+from app.schemas.user_schema import UserOut
+from app.services.tokens import TokenClaims, token_service
+from app.services.user_service import UserService
+
+
+class AuthController(Controller):
+    """Контроллер входа по паролю и токенов доступа.
+
+    Пароль проверяется (PBKDF2/scrypt) только при входе; остальные запросы
+    предъявляют подписанный токен, проверка которого - одна HMAC и чтение
+    версии токенов пользователя по первичному ключу.
+
+    Attributes:
+        path (str): Базовый путь для маршрутов (`/auth`).
+        tags (list[str]): Теги для OpenAPI-документации.
+        dependencies (dict): Зависимости контроллера (сервис пользователей).
+    """
+    path = "/auth"
+    tags = ["Auth"]
+    dependencies = {"user_service": get_user_service_provider()}
+
+    @post("/login", status_code=HTTP_200_OK)
+    async def login(self, user_service: UserService, data: LoginIn) -> TokenOut:
+        """Проверяет пароль и выдает токен доступа.
+
+        Устаревший хеш пароля при этом перехешируется с текущими настройками.
+
+        Args:
+            user_service (UserService): Сервис для работы с пользователями.
+            data (LoginIn): ID пользователя и пароль.
+
+        Returns:
+            TokenOut: Токен и время его жизни в секундах.
+
+        Raises:
+            HTTPException: 401 если пользователь не найден или пароль неверный.
+        """
+        token_version = await user_service.verify_credentials(data.user_id, data.password)
+        token, _ = token_service.issue(data.user_id, token_version)
+        return TokenOut(access_token=token, expires_in=token_service.ttl)
+
+    @get(
+        "/me",
+        dependencies={"claims": Provide(provide_token_claims), **get_read_user_service_provider()},
+    )
+    async def me(self, user_service: UserService, claims: TokenClaims) -> UserOut:
+        """Возвращает пользователя, которому выдан токен.
+
+        Args:
+            user_service (UserService): Сервис для работы с пользователями.
+            claims (TokenClaims): Содержимое токена.
+
+        Returns:
+            UserOut: Данные пользователя.
+
+        Raises:
+            HTTPException: 401 если токен недействителен, 404 если пользователь удален.
+        """
+        return await user_service.get_user(claims.sub)
+
+    @post(
+        "/logout",
+        status_code=HTTP_204_NO_CONTENT,
+        dependencies={"claims": Provide(provide_token_claims)},
+    )
+    async def logout(self, user_service: UserService, claims: TokenClaims) -> None:
+        """Отзывает все токены пользователя, включая предъявленный.
+
+        Args:
+            user_service (UserService): Сервис для работы с пользователями.
+            claims (TokenClaims): Содержимое токена.
+
+        Raises:
+            HTTPException: 401 если токен недействителен.
+        """
+        await user_service.revoke_tokens(claims.sub)
@@ -0,0 +1,35 @@
+from litestar import Response, get
+from litestar.status_codes import HTTP_200_OK, HTTP_503_SERVICE_UNAVAILABLE
+
+from app.db.warmup import startup_state
+from app.schemas.health_schema import HealthOut, ReadinessOut
+
+
+@get("/health", sync_to_thread=False, tags=["Health"])
+def health() -> HealthOut:
+    """Проверка живости: процесс запущен и обрабатывает запросы (БД не проверяется).
+
+    Returns:
+        HealthOut: ``{"status": "ok"}``.
+    """
+    return HealthOut(status="ok")
+
+
+@get("/health/ready", sync_to_thread=False, tags=["Health"])
+def readiness() -> Response[ReadinessOut]:
+    """Проверка готовности для балансировщика и rolling deploy.
+
+    Отвечает 503, пока в фоне прогревается пул соединений (или БД
+    недоступна), и 200 после прогрева.
+
+    Returns:
+        Response[ReadinessOut]: Состояние прогрева.
+    """
+    state = ReadinessOut(
+        ready=startup_state.ready,
+        warmed_connections=startup_state.warmed_connections,
+        attempts=startup_state.attempts,
+        startup_seconds=startup_state.startup_seconds,
+        error=startup_state.error,
+    )
+    return Response(state, status_code=HTTP_200_OK if state.ready else HTTP_503_SERVICE_UNAVAILABLE)
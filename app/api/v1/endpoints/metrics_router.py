@@ -0,0 +1,46 @@
+from litestar import Controller, Response, get
+
+from app.db.asyncpg_pool import asyncpg_pool_stats
+from app.db.pool_metrics import pool_metrics
+from app.schemas.metrics_schema import PoolMetricsOut
+from app.services.metrics import request_metrics
+
+# Content-Type текстового формата Prometheus
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4"
+
+
+class MetricsController(Controller):
+    """Контроллер служебных метрик приложения.
+
+    Attributes:
+        path (str): Базовый путь для маршрутов (`/metrics`).
+        tags (list[str]): Теги для OpenAPI-документации.
+    """
+    path = "/metrics"
+    tags = ["Metrics"]
+
+    @get("/pool", sync_to_thread=False)
+    def get_pool_metrics(self) -> PoolMetricsOut:
+        """Возвращает метрики пулов соединений.
+
+        Для пула SQLAlchemy: занятые и свободные соединения, количество выдач,
+        таймаутов, созданных соединений и гистограмма времени ожидания
+        соединения. Для пула asyncpg (если он используется) - его размер.
+
+        Returns:
+            PoolMetricsOut: Метрики пулов.
+        """
+        return PoolMetricsOut(sqlalchemy=pool_metrics.snapshot(), asyncpg=asyncpg_pool_stats())
+
+
+@get("/metrics", sync_to_thread=False, include_in_schema=False)
+def prometheus_metrics() -> Response[str]:
+    """Отдает метрики приложения в текстовом формате Prometheus.
+
+    Маршруты (задержка, запросы в работе, статусы, время и количество запросов
+    к БД), пул соединений и кеш пользователей. Значения - для текущего воркера.
+
+    Returns:
+        Response[str]: Метрики в формате Prometheus.
+    """
+    return Response(request_metrics.render(), media_type=PROMETHEUS_MEDIA_TYPE)
@@ -1,15 +1,21 @@
-from litestar import Controller, get, post, put, delete
+from litestar import Controller, Request, get, post, put, delete
 from litestar.dto import DTOData
-from litestar.response import Response
+from typing import Literal
+from litestar.response import Response, Stream
 from litestar.status_codes import HTTP_200_OK
 from litestar.enums import MediaType
-from app.schemas.user_schema import UserCreate, UserOut, UserUpdate, UserCreateDTO, UserOutDTO, UserCreate
+from app.schemas.user_schema import UserCreate, UserOut, UserUpdate, UserCreateDTO, UserOutDTO, UserCreate, BulkCreateResult, ImportReport, UserBatchRequest, UserBatchResult, ChangeFeedPage, UserBulkDelete, BulkDeleteResult
 from litestar import Controller, get, post, put, delete
 from litestar.di import Provide
-from app.deps.user_deps import provide_user_service
+from app.deps.user_deps import get_read_user_service_provider, get_user_service_provider, user_service_context
 from app.services.user_service import UserService
+from app.config import settings
 from litestar.params import Parameter, Dependency
 from litestar.pagination import OffsetPagination
+from app.schemas.pagination import CursorPage, OffsetPage
+from app.services.conditional import is_not_modified, page_etag, user_etag, validator_headers
+from litestar.status_codes import HTTP_304_NOT_MODIFIED
+from litestar.exceptions import ValidationException
 
 
 class UserController(Controller):
@@ -28,9 +34,9 @@ class UserController(Controller):
     """
     path = "/users"
     tags = ["Users"]
-    dependencies = {"user_service": Provide(provide_user_service)}
+    dependencies = {"user_service": get_user_service_provider()}
 
-    @post(dto=UserCreateDTO)
+    @post(dto=UserCreateDTO, return_dto=None)
     async def create_user(
         self,
         user_service: UserService,
@@ -50,44 +56,310 @@ class UserController(Controller):
         """
         return await user_service.create_user(data)
     
-    @get(dto=UserOutDTO)
+    @post("/bulk")
+    async def create_users_bulk(
+        self,
+        user_service: UserService,
+        data: list[UserCreate]
+    ) -> BulkCreateResult:
+        """Создает пользователей пакетом.
+
+        Все пользователи вставляются в одной транзакции многострочными
+        ``INSERT ... RETURNING``, пароли хешируются параллельно.
+
+        Args:
+            user_service (UserService): Сервис для работы с пользователями.
+            data (list[UserCreate]): Данные пользователей.
+
+        Returns:
+            BulkCreateResult: Созданные пользователи и ошибки по элементам в порядке запроса.
+
+        Raises:
+            HTTPException: 400 если элементов больше допустимого.
+        """
+        return await user_service.create_users(data)
+
+    @post("/bulk-delete", status_code=HTTP_200_OK)
+    async def delete_users_bulk(
+        self,
+        user_service: UserService,
+        data: UserBulkDelete,
+    ) -> BulkDeleteResult:
+        """Удаляет пользователей по списку ID или по фильтру.
+
+        Удаление идет порциями по ``BULK_DELETE_CHUNK_SIZE`` (``WHERE id = ANY(...)``),
+        каждая порция - отдельная короткая транзакция. При ``USER_SOFT_DELETE``
+        пользователи помечаются удаленными и окончательно удаляются очисткой.
+
+        Args:
+            user_service (UserService): Сервис для работы с пользователями.
+            data (UserBulkDelete): ``ids`` или ``filter``.
+
+        Returns:
+            BulkDeleteResult: Количество удаленных и ненайденные ID.
+
+        Raises:
+            HTTPException: 400 если не задано ровно одно из ``ids`` и ``filter``,
+                фильтр пустой или ID больше допустимого.
+        """
+        return await user_service.delete_users(data)
+
+    @post("/import", request_max_body_size=None)
+    async def import_users(
+        self,
+        user_service: UserService,
+        request: Request,
+    ) -> ImportReport:
+        """Импортирует пользователей из тела запроса в формате NDJSON.
+
+        Тело читается потоково, без ограничения размера: по одному объекту
+        ``UserCreate`` на строку. Ошибочные строки пропускаются и попадают в отчет.
+
+        Args:
+            user_service (UserService): Сервис для работы с пользователями.
+            request (Request): Запрос, из которого читается тело.
+
+        Returns:
+            ImportReport: Итоги импорта.
+        """
+        return await user_service.import_users(request.stream(), settings.IMPORT_BATCH_SIZE)
+
+    @get(dependencies=get_read_user_service_provider())
     async def get_all_users(
         self,
         user_service: UserService,
         page: int = Parameter(ge=1, default=1),
         page_size: int = Parameter(ge=1, le=1000, default=100),
-    ) -> OffsetPagination[UserOut]:
+        cursor: str | None = Parameter(default=None),
+        with_total: bool = Parameter(default=True),
+        if_none_match: str | None = Parameter(header="If-None-Match", default=None),
+    ) -> Response[OffsetPage[UserOut] | CursorPage[UserOut]]:
         """Возвращает список пользователей с пагинацией.
 
+        Если передан ``cursor``, используется keyset-пагинация: стоимость страницы
+        не зависит от ее глубины. Для первой страницы передается пустой курсор
+        (``?cursor=``), для следующих - ``next_cursor`` из предыдущего ответа.
+        Без ``cursor`` работает прежняя пагинация по номеру страницы; подсчет
+        общего количества можно отключить через ``with_total=false``.
+
+        Ответ содержит ETag (id и версии элементов страницы и общее количество);
+        при совпадении с ``If-None-Match`` возвращается 304 без тела.
+        ``If-Modified-Since`` для списков не учитывается: удаление или сдвиг
+        строк не меняют дату изменения страницы. При заданных
+        ``DATABASE_REPLICA_URLS`` список читается с реплики.
+
         Args:
             user_service (UserService): Сервис для работы с пользователями.
             page (int, optional): Номер страницы. Defaults to 1.
             page_size (int, optional): Размер страницы (1-1000). Defaults to 100.
+            cursor (str | None, optional): Курсор keyset-пагинации. Defaults to None.
+            with_total (bool, optional): Считать ли общее количество. Defaults to True.
+            if_none_match (str | None, optional): ETag из предыдущего ответа.
+
+        Returns:
+            Response[OffsetPage[UserOut] | CursorPage[UserOut]]: Пагинированный список
+                пользователей или 304 Not Modified.
+        """
+        if cursor is not None:
+            result = await user_service.get_page(cursor, page_size)
+            etag = page_etag(result.items)
+        else:
+            result = await user_service.get_list(page, page_size, with_total)
+            etag = page_etag(result.items, result.total)
+
+        headers = validator_headers(etag, None)
+        if is_not_modified(if_none_match, None, etag, None):
+            return Response(content=None, status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(result, headers=headers)
+
+    @get("/batch", dependencies=get_read_user_service_provider())
+    async def get_users_batch(
+        self,
+        user_service: UserService,
+        ids: str = Parameter(description="ID через запятую, например 1,2,3"),
+    ) -> UserBatchResult:
+        """Возвращает пользователей по списку ID одним запросом.
+
+        Пользователи берутся из кеша, недостающие читаются одним запросом
+        ``WHERE id = ANY(...)``. Ответ - в порядке запроса, ненайденные ID
+        возвращаются с ``user: null`` и перечисляются в ``missing``.
+
+        Args:
+            user_service (UserService): Сервис для работы с пользователями.
+            ids (str): Идентификаторы через запятую.
+
+        Returns:
+            UserBatchResult: Пользователи в порядке запроса.
+
+        Raises:
+            HTTPException: 400 если ID не числа или их больше допустимого.
+        """
+        try:
+            user_ids = [int(value) for value in ids.split(",") if value.strip()]
+        except ValueError as exc:
+            raise ValidationException("ids must be a comma-separated list of integers") from exc
+        return await user_service.get_users_batch(user_ids)
+
+    # Пакетное чтение: в бюджете чтений контроля допуска
+    @post(
+        "/batch",
+        status_code=HTTP_200_OK,
+        dependencies=get_read_user_service_provider(),
+        opt={"admission": "read"},
+    )
+    async def post_users_batch(
+        self,
+        user_service: UserService,
+        data: UserBatchRequest,
+    ) -> UserBatchResult:
+        """Возвращает пользователей по списку ID из тела запроса.
+
+        То же, что ``GET /users/batch``, для списков, не помещающихся в URL.
+
+        Args:
+            user_service (UserService): Сервис для работы с пользователями.
+            data (UserBatchRequest): Идентификаторы пользователей.
 
         Returns:
-            OffsetPagination[UserOut]: Пагинированный список пользователей.
+            UserBatchResult: Пользователи в порядке запроса.
+
+        Raises:
+            HTTPException: 400 если ID больше допустимого.
+        """
+        return await user_service.get_users_batch(data.ids)
+
+    @get("/search", dependencies=get_read_user_service_provider())
+    async def search_users(
+        self,
+        user_service: UserService,
+        q: str = Parameter(min_length=1, max_length=100, description="Строка поиска"),
+        mode: Literal["prefix", "substring"] = Parameter(default="prefix"),
+        field: Literal["any", "name", "surname"] = Parameter(default="any"),
+        limit: int = Parameter(ge=1, le=settings.SEARCH_MAX_LIMIT, default=20),
+        cursor: str | None = Parameter(default=None),
+    ) -> CursorPage[UserOut]:
+        """Ищет пользователей по имени и/или фамилии без учета регистра.
+
+        ``prefix`` ищет по началу строки, ``substring`` - по вхождению в любом
+        месте. Оба режима используют индексы (``text_pattern_ops`` и pg_trgm в
+        PostgreSQL), результаты упорядочены по ID и листаются по ``next_cursor``.
+
+        Args:
+            user_service (UserService): Сервис для работы с пользователями.
+            q (str): Строка поиска.
+            mode (str, optional): ``prefix`` или ``substring``. Defaults to prefix.
+            field (str, optional): ``any``, ``name`` или ``surname``. Defaults to any.
+            limit (int, optional): Размер страницы. Defaults to 20.
+            cursor (str | None, optional): Курсор следующей страницы. Defaults to None.
+
+        Returns:
+            CursorPage[UserOut]: Найденные пользователи.
+
+        Raises:
+            HTTPException: 400 если строка поиска пустая или курсор поврежден.
         """
-        return await user_service.get_list(page, page_size)
+        return await user_service.search_users(q, mode, field, cursor, limit)
 
-    @get("/{user_id:int}")
+    # Long-poll не занимает бюджет чтений и соединение с БД на время ожидания
+    @get("/changes", opt={"admission": "watch"})
+    async def get_changes(
+        self,
+        since: str | None = Parameter(default=None, description="next_cursor предыдущего ответа"),
+        limit: int = Parameter(ge=1, le=settings.CHANGE_FEED_MAX_LIMIT, default=100),
+        wait: float = Parameter(ge=0, le=settings.CHANGE_FEED_MAX_WAIT, default=0),
+    ) -> ChangeFeedPage:
+        """Возвращает пользователей, созданных, обновленных или удаленных после водяного знака.
+
+        Изменения читаются из журнала ``user_change``, который пишут триггеры
+        в транзакции записи, в порядке, не зависящем от часов: транзакция
+        любой длительности не окажется перед уже выданным водяным знаком.
+        Удаления приходят с ``deleted: true``. Клиент хранит ``next_cursor`` и
+        передает его в ``since``, пока ``has_more`` истинно. Читается основная БД.
+        Журнал старше ``CHANGE_FEED_RETENTION`` очищается: если очистка убрала
+        удаление после водяного знака, ответ 410 - клиент читает ленту с начала.
+
+        Args:
+            since (str | None, optional): Водяной знак. Defaults to None (с начала).
+            limit (int, optional): Максимум изменений. Defaults to 100.
+            wait (float, optional): Сколько секунд ждать изменений, если их нет. Defaults to 0.
+
+        Returns:
+            ChangeFeedPage: Изменения и следующий водяной знак.
+
+        Raises:
+            HTTPException: 400 если водяной знак поврежден, 410 если нужна
+                полная пересинхронизация.
+        """
+        return await UserService.watch_changes(user_service_context, since, limit, wait)
+
+    @get("/export")
+    async def export_users(
+        self,
+        fmt: Literal["ndjson", "csv"] = Parameter(query="format", default="ndjson"),
+    ) -> Stream:
+        """Выгружает всех пользователей потоком.
+
+        Строки читаются серверным курсором и отправляются клиенту пачками, поэтому
+        первый байт приходит сразу, а память не растет с размером таблицы.
+        Используется отдельная сессия: сессия из DI закрывается до отправки тела.
+
+        Args:
+            fmt (str, optional): Формат выгрузки: ``ndjson`` или ``csv``. Defaults to ndjson.
+
+        Returns:
+            Stream: Потоковый ответ с пользователями.
+        """
+        async def content():
+            async with user_service_context() as user_service:
+                async for chunk in user_service.export_users(fmt, settings.EXPORT_BATCH_SIZE):
+                    yield chunk
+
+        media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+        return Stream(
+            content(),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="users.{fmt}"'},
+        )
+
+    @get("/{user_id:int}", dependencies=get_read_user_service_provider())
     async def get_user(
         self,
         user_service: UserService,
-        user_id: int
-    ) -> UserOut:
+        user_id: int,
+        if_none_match: str | None = Parameter(header="If-None-Match", default=None),
+        if_modified_since: str | None = Parameter(header="If-Modified-Since", default=None),
+    ) -> Response[UserOut]:
         """Возвращает данные пользователя по ID.
 
+        Ответ содержит ETag (версия пользователя) и Last-Modified из
+        ``updated_at``. Условный запрос (``If-None-Match``/``If-Modified-Since``)
+        сначала читает только версию и при совпадении возвращает 304 без тела,
+        не читая пользователя. При заданных ``DATABASE_REPLICA_URLS``
+        пользователь читается с реплики.
+
         Args:
             user_service (UserService): Сервис для работы с пользователями.
             user_id (int): Идентификатор пользователя.
+            if_none_match (str | None, optional): ETag из предыдущего ответа.
+            if_modified_since (str | None, optional): Last-Modified из предыдущего ответа.
 
         Returns:
-            UserOut: Данные пользователя.
+            Response[UserOut]: Данные пользователя или 304 Not Modified.
 
         Raises:
             HTTPException: 404 если пользователь не найден.
         """
-        return await user_service.get_user(user_id)
+        if if_none_match is not None or if_modified_since is not None:
+            version, updated_at = await user_service.get_user_version(user_id)
+            etag = user_etag(user_id, version)
+            if is_not_modified(if_none_match, if_modified_since, etag, updated_at):
+                return Response(
+                    content=None, status_code=HTTP_304_NOT_MODIFIED, headers=validator_headers(etag, updated_at)
+                )
+
+        # ETag строится по самому ответу: пользователь из кеша получает свою версию
+        user = await user_service.get_user(user_id)
+        return Response(user, headers=validator_headers(user_etag(user.id, user.version), user.updated_at))
 
     @put("/{user_id:int}")
     async def update_user(
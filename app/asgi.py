@@ -10,6 +10,16 @@ from app.api.v1.api import api_router
 from litestar.status_codes import HTTP_500_INTERNAL_SERVER_ERROR
 from litestar.di import Provide
 from app.db.session import sqlalchemy_config,  on_startup
+from app.db.asyncpg_pool import asyncpg_config
+from app.db.replicas import dispose_replicas
+from litestar_asyncpg import AsyncpgPlugin
+from app.services.security import shutdown_password_hasher
+from app.api.v1.endpoints.metrics_router import prometheus_metrics
+from app.api.v1.endpoints.health_router import health, readiness
+from app.db.warmup import start_warm_up, stop_warm_up
+from app.deps.user_deps import close_create_batcher, start_purge_job, stop_purge_job
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.metrics import MetricsMiddleware
 from litestar.plugins.sqlalchemy import SQLAlchemyAsyncConfig, SQLAlchemyPlugin
 from litestar import Litestar, Request, Response
 from litestar.exceptions import HTTPException
@@ -62,12 +72,40 @@ def exception_handler(request: Request, exc: Exception) -> Response:
     )
 
 
+def get_plugins() -> list:
+    """Плагины БД: SQLAlchemy всегда (схема, on_startup), asyncpg - для REPOSITORY_BACKEND=asyncpg."""
+    plugins = [SQLAlchemyPlugin(config=sqlalchemy_config)]
+    if settings.REPOSITORY_BACKEND == "asyncpg":
+        plugins.append(AsyncpgPlugin(config=asyncpg_config))
+    return plugins
+
+
+def get_middleware() -> list:
+    """Middleware приложения; метрики - внешние, чтобы учитывать и отклоненные запросы."""
+    middleware = [MetricsMiddleware()] if settings.METRICS_ENABLED else []
+    if settings.ADMISSION_ENABLED:
+        middleware.append(AdmissionMiddleware())
+    return middleware
+
+
+def get_startup_hooks() -> list:
+    """Хуки старта: в production без тестовых данных, только фоновый прогрев пула."""
+    if settings.STARTUP_MODE == "production":
+        return [start_warm_up, start_purge_job]
+    return [on_startup, start_warm_up, start_purge_job]
+
+
 def create_app() -> Litestar:
-    """Создать приложение Litestar."""
+    """Создать приложение Litestar.
+
+    OpenAPI-схема строится при первом запросе к ``/schema``, а не при создании.
+    """
     return Litestar(
-        route_handlers=[api_router],
-        plugins=[SQLAlchemyPlugin(config=sqlalchemy_config)],
-        on_startup=[on_startup],
+        route_handlers=[api_router, prometheus_metrics, health, readiness],
+        plugins=get_plugins(),
+        middleware=get_middleware(),
+        on_startup=get_startup_hooks(),
+        on_shutdown=[stop_warm_up, stop_purge_job, close_create_batcher, shutdown_password_hasher, dispose_replicas],
         cors_config=get_cors_config(),
         openapi_config=get_openapi_config(),
         exception_handlers={Exception: exception_handler},
@@ -75,6 +113,11 @@ def create_app() -> Litestar:
     )
 
 
-app = create_app()
+def __getattr__(name: str) -> Litestar:
+    """Создает ``app`` при первом обращении (``uvicorn app.asgi:app``), а не при импорте модуля."""
+    if name == "app":
+        application = globals()["app"] = create_app()
+        return application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
@@ -0,0 +1,93 @@
+"""Консольные команды приложения.
+
+Примеры::
+
+    python -m app.cli import-users users.ndjson
+    python -m app.cli import-users - < users.ndjson
+    python -m app.cli purge-users --older-than 0
+"""
+import argparse
+import asyncio
+import sys
+from typing import AsyncIterator, BinaryIO
+
+import msgspec
+
+from app.config import settings
+from app.deps.user_deps import user_repository_context, user_service_context
+from app.schemas.user_schema import ImportReport
+from app.services.purge import PurgeJob
+from app.services.security import password_hasher
+
+# Размер блока чтения файла импорта, байт
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+async def read_chunks(file: BinaryIO) -> AsyncIterator[bytes]:
+    """Читает файл блоками, не блокируя event loop."""
+    while chunk := await asyncio.to_thread(file.read, READ_CHUNK_SIZE):
+        yield chunk
+
+
+def print_progress(report: ImportReport) -> None:
+    """Печатает прогресс импорта в stderr."""
+    print(
+        f"batch {report.batches}: imported={report.imported} failed={report.failed}",
+        file=sys.stderr,
+    )
+
+
+async def import_users(path: str, batch_size: int) -> ImportReport:
+    """Импортирует пользователей из NDJSON-файла (``-`` - stdin).
+
+    Args:
+        path: Путь к файлу.
+        batch_size: Количество пользователей в пачке.
+
+    Returns:
+        ImportReport: Итоги импорта.
+    """
+    file = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        async with user_service_context() as user_service:
+            return await user_service.import_users(read_chunks(file), batch_size, print_progress)
+    finally:
+        if file is not sys.stdin.buffer:
+            file.close()
+        password_hasher.shutdown()
+
+
+async def purge_users(older_than: float) -> int:
+    """Окончательно удаляет помеченных удаленными дольше ``older_than`` секунд.
+
+    Args:
+        older_than: Минимальный возраст пометки, секунды.
+
+    Returns:
+        int: Количество удаленных пользователей.
+    """
+    job = PurgeJob(user_repository_context, older_than, chunk_size=settings.PURGE_CHUNK_SIZE)
+    return await job.run_once()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import-users", help="Импорт пользователей из NDJSON")
+    import_parser.add_argument("path", help="Путь к NDJSON-файлу или - для stdin")
+    import_parser.add_argument("--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE)
+
+    purge_parser = commands.add_parser("purge-users", help="Очистка пользователей, помеченных удаленными")
+    purge_parser.add_argument("--older-than", type=float, default=settings.PURGE_RETENTION, help="Секунды")
+
+    args = parser.parse_args()
+    if args.command == "import-users":
+        report = asyncio.run(import_users(args.path, args.batch_size))
+        print(msgspec.json.encode(report).decode())
+    elif args.command == "purge-users":
+        print(msgspec.json.encode({"purged": asyncio.run(purge_users(args.older_than))}).decode())
+
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,36 @@ from enum import Enum
 from typing import Dict, Any
 from dotenv import load_dotenv
 
-load_dotenv()
+# В production настройки приходят из окружения процесса: .env не читается
+if os.getenv("STARTUP_MODE", "development") != "production":
+    load_dotenv()
 
 
 class Settings:
     MODE: str = "development"
+    # development: создание схемы и тестовый пользователь при старте; production - без них
+    STARTUP_MODE: str = os.getenv("STARTUP_MODE", "development")
     API_VERSION: str = "v1"
     API_V1_STR: str = f"/api/{API_VERSION}"
     APP_HOST : str = os.getenv("APP_HOST", "localhost")
     APP_PORT : str = os.getenv("APP_PORT", "8000")
     APP_DOMAIN: str = os.getenv("APP_DOMAIN", "8000")
+
+    # Production-сервер granian (python -m app.server)
+    SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", "1"))
+    # Потоков Rust-рантайма на воркер (сеть и разбор HTTP)
+    SERVER_THREADS: int = int(os.getenv("SERVER_THREADS", "1"))
+    SERVER_BACKLOG: int = int(os.getenv("SERVER_BACKLOG", "1024"))
+    # Протокол: auto (HTTP/1.1 и HTTP/2), 1 или 2
+    SERVER_HTTP: str = os.getenv("SERVER_HTTP", "auto")
+    SERVER_KEEP_ALIVE: bool = os.getenv("SERVER_KEEP_ALIVE", "true").lower() in ("1", "true", "yes")
+    # Интервал HTTP/2 PING для keep-alive, секунды (0 - не отправлять)
+    SERVER_HTTP2_KEEP_ALIVE_INTERVAL: float = float(os.getenv("SERVER_HTTP2_KEEP_ALIVE_INTERVAL", "0"))
+    # Event loop воркера: auto, asyncio или uvloop
+    SERVER_LOOP: str = os.getenv("SERVER_LOOP", "auto")
+    # Сколько секунд воркер дорабатывает начатые запросы после SIGTERM, затем завершается принудительно
+    SERVER_GRACEFUL_TIMEOUT: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+    SERVER_ACCESS_LOG: bool = os.getenv("SERVER_ACCESS_LOG", "false").lower() in ("1", "true", "yes")
     
 
     DATABASE_USER: str = os.getenv("DATABASE_USER", "postgres")
@@ -23,11 +43,146 @@ class Settings:
     DATABASE_HOST: str = os.getenv("DATABASE_HOST", "localhost")
     DATABASE_PORT: int = os.getenv("DATABASE_PORT", "5432")
     DATABASE_NAME: str = os.getenv("DATABASE_NAME", "users_litestar")
+    # Полный URL подключения, перекрывает DATABASE_* (например, sqlite+aiosqlite:///users.db)
+    DATABASE_URL: str | None = os.getenv("DATABASE_URL")
+    # Реплики для чтения (через запятую); GET-маршруты пользователей читают с них
+    DATABASE_REPLICA_URLS: list[str] = [
+        url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+    ]
+    # Выбор реплики: round_robin или least_connections
+    DATABASE_REPLICA_STRATEGY: str = os.getenv("DATABASE_REPLICA_STRATEGY", "round_robin")
+    # Максимальное отставание реплики в секундах (0 - не проверять, только PostgreSQL)
+    DATABASE_REPLICA_MAX_LAG: float = float(os.getenv("DATABASE_REPLICA_MAX_LAG", "0"))
+    DATABASE_REPLICA_LAG_CHECK_INTERVAL: float = float(os.getenv("DATABASE_REPLICA_LAG_CHECK_INTERVAL", "5"))
+
+    # Пул соединений (SQLAlchemy и asyncpg)
+    DATABASE_POOL_SIZE: int = int(os.getenv("DATABASE_POOL_SIZE", "10"))
+    DATABASE_MAX_OVERFLOW: int = int(os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+    # Соединений, открываемых и прогреваемых в фоне после старта (0 - без прогрева)
+    DATABASE_POOL_WARMUP: int = int(os.getenv("DATABASE_POOL_WARMUP", str(DATABASE_POOL_SIZE)))
+    # Сколько секунд старт ждет прогрева, прежде чем принимать запросы (0 - прогрев только в фоне)
+    DATABASE_POOL_WARMUP_WAIT: float = float(os.getenv("DATABASE_POOL_WARMUP_WAIT", "0"))
+    DATABASE_POOL_TIMEOUT: float = float(os.getenv("DATABASE_POOL_TIMEOUT", "30"))
+    DATABASE_POOL_RECYCLE: int = int(os.getenv("DATABASE_POOL_RECYCLE", "1800"))
+    DATABASE_POOL_PRE_PING: bool = os.getenv("DATABASE_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+    # Кеш подготовленных запросов asyncpg на соединение (0 - выключен, нужно для pgbouncer)
+    DATABASE_STATEMENT_CACHE_SIZE: int = int(os.getenv("DATABASE_STATEMENT_CACHE_SIZE", "100"))
+    DATABASE_CONNECT_TIMEOUT: float = float(os.getenv("DATABASE_CONNECT_TIMEOUT", "10"))
+    DATABASE_COMMAND_TIMEOUT: float = float(os.getenv("DATABASE_COMMAND_TIMEOUT", "30"))
+
+    # Реализация репозитория пользователей: sqlalchemy или asyncpg (только PostgreSQL)
+    REPOSITORY_BACKEND: str = os.getenv("REPOSITORY_BACKEND", "sqlalchemy")
+
+    # Подсчет общего количества в списках: exact, cached или estimated
+    USER_COUNT_STRATEGY: str = os.getenv("USER_COUNT_STRATEGY", "cached")
+    USER_COUNT_CACHE_TTL: float = float(os.getenv("USER_COUNT_CACHE_TTL", "30"))
+
+    # Пакетное создание пользователей
+    BULK_CREATE_MAX_ITEMS: int = int(os.getenv("BULK_CREATE_MAX_ITEMS", "10000"))
+    BULK_INSERT_BATCH_SIZE: int = int(os.getenv("BULK_INSERT_BATCH_SIZE", "1000"))
+
+    # Объединение одновременных POST /users в пакеты (одна транзакция на пакет)
+    CREATE_BATCHING_ENABLED: bool = os.getenv("CREATE_BATCHING_ENABLED", "false").lower() in ("1", "true", "yes")
+    CREATE_BATCH_MAX_SIZE: int = int(os.getenv("CREATE_BATCH_MAX_SIZE", "100"))
+    # Максимальное ожидание пакета после первого запроса, секунды
+    CREATE_BATCH_MAX_DELAY: float = float(os.getenv("CREATE_BATCH_MAX_DELAY", "0.005"))
+    # При ошибке пакета повторять вставку поштучно, чтобы ошибку получили только виновные
+    CREATE_BATCH_ISOLATE_FAILURES: bool = (
+        os.getenv("CREATE_BATCH_ISOLATE_FAILURES", "true").lower() in ("1", "true", "yes")
+    )
+
+    # Удаление: soft - пометка deleted_at вместо DELETE (строки удаляет фоновая очистка)
+    USER_SOFT_DELETE: bool = os.getenv("USER_SOFT_DELETE", "false").lower() in ("1", "true", "yes")
+    # Пакетное удаление (POST /users/bulk-delete): ID в запросе и размер транзакции
+    BULK_DELETE_MAX_IDS: int = int(os.getenv("BULK_DELETE_MAX_IDS", "100000"))
+    BULK_DELETE_CHUNK_SIZE: int = int(os.getenv("BULK_DELETE_CHUNK_SIZE", "1000"))
+    # Очистка: помеченные удаленными дольше PURGE_RETENTION секунд удаляются каждые
+    # PURGE_INTERVAL секунд (0 - не запускать в процессе приложения)
+    PURGE_RETENTION: float = float(os.getenv("PURGE_RETENTION", str(7 * 24 * 3600)))
+    PURGE_INTERVAL: float = float(os.getenv("PURGE_INTERVAL", "3600"))
+    PURGE_CHUNK_SIZE: int = int(os.getenv("PURGE_CHUNK_SIZE", "1000"))
+
+    # Пакетное получение пользователей по ID
+    BATCH_GET_MAX_IDS: int = int(os.getenv("BATCH_GET_MAX_IDS", "5000"))
+
+    # Поиск по имени/фамилии: максимальный размер страницы
+    SEARCH_MAX_LIMIT: int = int(os.getenv("SEARCH_MAX_LIMIT", "100"))
+
+    # Лента изменений (GET /users/changes)
+    CHANGE_FEED_MAX_LIMIT: int = int(os.getenv("CHANGE_FEED_MAX_LIMIT", "1000"))
+    # Long-poll: максимальное ожидание и период перепроверки (записи других воркеров не будят)
+    CHANGE_FEED_MAX_WAIT: float = float(os.getenv("CHANGE_FEED_MAX_WAIT", "30"))
+    CHANGE_FEED_POLL_INTERVAL: float = float(os.getenv("CHANGE_FEED_POLL_INTERVAL", "5"))
+    # Журнал старше CHANGE_FEED_RETENTION секунд очищается вместе с пользователями
+    # (PURGE_INTERVAL), кроме последней записи каждого пользователя; 0 - хранить все
+    CHANGE_FEED_RETENTION: float = float(os.getenv("CHANGE_FEED_RETENTION", str(7 * 24 * 3600)))
+
+    # Потоковая выгрузка пользователей
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+    # Потоковый импорт пользователей из NDJSON
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+    IMPORT_MAX_ERRORS: int = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+
+    # Кеш пользователей по ID
+    USER_CACHE_ENABLED: bool = os.getenv("USER_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    USER_CACHE_MAX_SIZE: int = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+    USER_CACHE_TTL: float = float(os.getenv("USER_CACHE_TTL", "60"))
+
+    # Объединение одновременных одинаковых чтений (GET /users/{id}, первая страница GET /users)
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() in ("1", "true", "yes")
+    SINGLE_FLIGHT_TIMEOUT: float = float(os.getenv("SINGLE_FLIGHT_TIMEOUT", "5"))
+
+    # Контроль допуска: быстрый 503 вместо очереди к перегруженной БД
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "false").lower() in ("1", "true", "yes")
+    # Одновременно выполняемые чтения и записи (записи дороже: хеширование пароля)
+    ADMISSION_MAX_READS: int = int(os.getenv("ADMISSION_MAX_READS", "256"))
+    ADMISSION_MAX_WRITES: int = int(os.getenv("ADMISSION_MAX_WRITES", "64"))
+    # Ожидающие long-poll запросы ленты изменений (соединение БД при ожидании не держат)
+    ADMISSION_MAX_WATCHERS: int = int(os.getenv("ADMISSION_MAX_WATCHERS", "1000"))
+    # Порог недавнего ожидания соединения из пула, секунды: выше него запросов
+    # в работе не больше, чем соединений в пуле (0 - не учитывать пул)
+    ADMISSION_MAX_POOL_WAIT: float = float(os.getenv("ADMISSION_MAX_POOL_WAIT", "0.25"))
+    # Token bucket на клиента: запросов в секунду и размер всплеска (0 - без ограничения)
+    ADMISSION_RATE_LIMIT: float = float(os.getenv("ADMISSION_RATE_LIMIT", "0"))
+    ADMISSION_RATE_BURST: int = int(os.getenv("ADMISSION_RATE_BURST", "50"))
+    # Заголовок с адресом клиента за прокси (например, X-Forwarded-For); пусто - адрес соединения
+    ADMISSION_CLIENT_HEADER: str = os.getenv("ADMISSION_CLIENT_HEADER", "")
+    # Доверенных прокси перед приложением: каждый дописывает адрес справа, клиент -
+    # N-й адрес с конца цепочки (левее - то, что прислал сам клиент)
+    ADMISSION_TRUSTED_PROXIES: int = int(os.getenv("ADMISSION_TRUSTED_PROXIES", "1"))
+    ADMISSION_MAX_CLIENTS: int = int(os.getenv("ADMISSION_MAX_CLIENTS", "10000"))
+    ADMISSION_RETRY_AFTER: int = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+
+    # Метрики HTTP-запросов (GET /metrics)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # Хеширование паролей
+    PASSWORD_HASH_ALGORITHM: str = os.getenv("PASSWORD_HASH_ALGORITHM", "pbkdf2_sha256")
+    PASSWORD_HASH_ITERATIONS: int = int(os.getenv("PASSWORD_HASH_ITERATIONS", "100000"))
+    PASSWORD_SCRYPT_N: int = int(os.getenv("PASSWORD_SCRYPT_N", "16384"))
+    PASSWORD_SCRYPT_R: int = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+    PASSWORD_SCRYPT_P: int = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+    PASSWORD_HASH_EXECUTOR: str = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+    # Токены доступа (POST /auth/login). Без секрета он генерируется при старте:
+    # токены не переживут перезапуск и не подойдут другим воркерам
+    AUTH_TOKEN_SECRET: str = os.getenv("AUTH_TOKEN_SECRET", "")
+    AUTH_TOKEN_TTL: int = int(os.getenv("AUTH_TOKEN_TTL", "3600"))
 
     @property
     def database_url(self) -> str:
+        if self.DATABASE_URL:
+            return self.DATABASE_URL
         return f"postgresql+asyncpg://{self.DATABASE_USER}:{self.DATABASE_PASSWORD}@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
 
+    @property
+    def asyncpg_dsn(self) -> str:
+        """DSN для asyncpg: тот же URL без указания драйвера SQLAlchemy."""
+        return self.database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
 
 settings = Settings()
 
@@ -0,0 +1,51 @@
+from typing import Any
+
+from litestar_asyncpg import AsyncpgConfig, PoolConfig
+
+from app.config import settings
+from app.schemas.metrics_schema import AsyncpgPoolStats
+
+
+class UserAsyncpgConfig(AsyncpgConfig):
+    """AsyncpgConfig, передающий ``connect_kwargs`` в ``create_pool`` как именованные аргументы.
+
+    ``asyncpg.create_pool`` принимает параметры соединения через ``**kwargs``,
+    а ``litestar-asyncpg`` передает их вложенным словарем ``connect_kwargs``.
+    """
+
+    @property
+    def pool_config_dict(self) -> dict[str, Any]:
+        config = super().pool_config_dict
+        config.update(config.pop("connect_kwargs", None) or {})
+        return config
+
+
+# Пул соединений asyncpg для REPOSITORY_BACKEND=asyncpg.
+# Соединение запроса внедряется по ключу "db_connection", пул закрывается в lifespan.
+# Размер пула и таймауты - те же настройки DATABASE_*, что и у SQLAlchemy.
+asyncpg_config = UserAsyncpgConfig(
+    pool_config=PoolConfig(
+        dsn=settings.asyncpg_dsn,
+        min_size=settings.DATABASE_POOL_SIZE,
+        max_size=settings.DATABASE_POOL_SIZE + settings.DATABASE_MAX_OVERFLOW,
+        max_inactive_connection_lifetime=settings.DATABASE_POOL_RECYCLE,
+        connect_kwargs={
+            "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "timeout": settings.DATABASE_CONNECT_TIMEOUT,
+            "command_timeout": settings.DATABASE_COMMAND_TIMEOUT,
+        },
+    ),
+)
+
+
+def asyncpg_pool_stats() -> AsyncpgPoolStats | None:
+    """Состояние пула asyncpg или None, если пул не создан."""
+    pool = asyncpg_config.pool_instance
+    if pool is None:
+        return None
+    return AsyncpgPoolStats(
+        size=pool.get_size(),
+        idle=pool.get_idle_size(),
+        min_size=pool.get_min_size(),
+        max_size=pool.get_max_size(),
+    )
@@ -0,0 +1,200 @@
+import itertools
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.schemas.metrics_schema import PoolStats, PoolWaitBucket
+from app.services.metrics import MetricsWriter, register
+
+# Границы гистограммы ожидания соединения, секунды
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Вес нового значения в скользящих средних ожидания и удержания соединения
+RECENT_WAIT_WEIGHT = 0.1
+# Период полураспада среднего без новых ожиданий, секунды
+RECENT_WAIT_HALF_LIFE = 1.0
+
+
+class PoolMetrics:
+    """Счетчики пула соединений SQLAlchemy.
+
+    Выдача/возврат и создание соединений считаются по событиям пула
+    (``checkout``, ``checkin``, ``connect``). У пула нет события «начали ждать
+    соединение», поэтому время ожидания и таймауты измеряет
+    ``InstrumentedAsyncQueuePool`` вокруг получения соединения.
+    """
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.connections_created = 0
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        # Последний элемент - ожидания дольше WAIT_BUCKETS[-1]
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self._recent_wait = 0.0
+        self._recent_wait_at = time.monotonic()
+        # Скользящее среднее времени удержания соединения (от выдачи до возврата)
+        self.recent_hold_seconds = 0.0
+        # Начало ожиданий, которые еще не получили соединение (в порядке начала)
+        self._waiting: dict[int, float] = {}
+        self._wait_ids = itertools.count()
+        self._engine: AsyncEngine | None = None
+
+    def attach(self, engine: AsyncEngine) -> None:
+        """Подписывается на события пула движка.
+
+        Args:
+            engine: Асинхронный движок, пул которого нужно отслеживать.
+        """
+        self._engine = engine
+        event.listen(engine.sync_engine, "connect", self._on_connect)
+        event.listen(engine.sync_engine, "checkout", self._on_checkout)
+        event.listen(engine.sync_engine, "checkin", self._on_checkin)
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        self.connections_created += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        self.checkouts += 1
+        connection_record.info["checked_out_at"] = time.monotonic()
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        self.checkins += 1
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            hold = time.monotonic() - checked_out_at
+            self.recent_hold_seconds += (hold - self.recent_hold_seconds) * RECENT_WAIT_WEIGHT
+
+    def start_wait(self) -> int:
+        """Отмечает начало ожидания соединения; возвращает ключ для :meth:`finish_wait`."""
+        wait_id = next(self._wait_ids)
+        self._waiting[wait_id] = time.monotonic()
+        return wait_id
+
+    def finish_wait(self, wait_id: int) -> None:
+        """Отмечает конец ожидания (соединение получено или таймаут)."""
+        self._waiting.pop(wait_id, None)
+
+    def pressure_seconds(self) -> float:
+        """Давление на пул: большее из недавнего среднего ожидания и самого долгого текущего.
+
+        Текущие ожидания учитываются сразу, а не после получения соединения,
+        поэтому очередь к пулу видна, пока она растет.
+        """
+        now = time.monotonic()
+        oldest = now - next(iter(self._waiting.values()), now)
+        return max(self.recent_wait_seconds(now), oldest)
+
+    def record_wait(self, seconds: float) -> None:
+        """Учитывает время ожидания соединения из пула."""
+        self.wait_count += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        self.wait_buckets[bisect_left(WAIT_BUCKETS, seconds)] += 1
+        now = time.monotonic()
+        recent = self.recent_wait_seconds(now)
+        self._recent_wait = recent + (seconds - recent) * RECENT_WAIT_WEIGHT
+        self._recent_wait_at = now
+
+    def recent_wait_seconds(self, now: float | None = None) -> float:
+        """Скользящее среднее недавних ожиданий соединения, секунды.
+
+        Без новых выдач соединений среднее затухает, поэтому после сброса
+        нагрузки (когда новые запросы не доходят до пула) оно падает к нулю.
+        """
+        elapsed = (time.monotonic() if now is None else now) - self._recent_wait_at
+        return self._recent_wait * 0.5 ** (elapsed / RECENT_WAIT_HALF_LIFE)
+
+    def record_timeout(self) -> None:
+        """Учитывает таймаут ожидания соединения (``pool_timeout``)."""
+        self.timeouts += 1
+
+    def snapshot(self) -> PoolStats:
+        """Возвращает текущее состояние пула и накопленные счетчики.
+
+        Returns:
+            PoolStats: Метрики пула.
+        """
+        pool = self._engine.sync_engine.pool if self._engine is not None else None
+        queue_pool = pool if isinstance(pool, QueuePool) else None
+        uptime = time.monotonic() - self.started_at
+
+        cumulative, buckets = 0, []
+        for le, count in zip(WAIT_BUCKETS, self.wait_buckets):
+            cumulative += count
+            buckets.append(PoolWaitBucket(le=le, count=cumulative))
+
+        return PoolStats(
+            pool_class=type(pool).__name__ if pool is not None else "",
+            size=queue_pool.size() if queue_pool else 0,
+            checked_out=queue_pool.checkedout() if queue_pool else self.checkouts - self.checkins,
+            checked_in=queue_pool.checkedin() if queue_pool else 0,
+            overflow=max(queue_pool.overflow(), 0) if queue_pool else 0,
+            checkouts=self.checkouts,
+            checkins=self.checkins,
+            timeouts=self.timeouts,
+            connections_created=self.connections_created,
+            connections_created_per_sec=round(self.connections_created / uptime, 4) if uptime else 0.0,
+            wait_count=self.wait_count,
+            wait_seconds_total=round(self.wait_seconds_total, 6),
+            wait_seconds_max=round(self.wait_seconds_max, 6),
+            wait_buckets=buckets,
+            uptime_seconds=round(uptime, 3),
+        )
+
+
+pool_metrics = PoolMetrics()
+
+
+@register
+def _collect_pool_metrics(writer: MetricsWriter) -> None:
+    pool = pool_metrics.snapshot()
+    for name, kind, value, help_text in (
+        ("db_pool_size", "gauge", pool.size, "Configured pool size."),
+        ("db_pool_checked_out", "gauge", pool.checked_out, "Connections checked out."),
+        ("db_pool_checked_in", "gauge", pool.checked_in, "Idle connections in the pool."),
+        ("db_pool_overflow", "gauge", pool.overflow, "Overflow connections open."),
+        ("db_pool_checkouts_total", "counter", pool.checkouts, "Connection checkouts."),
+        ("db_pool_timeouts_total", "counter", pool.timeouts, "Checkout timeouts."),
+        ("db_pool_connections_created_total", "counter", pool.connections_created, "Connections opened."),
+    ):
+        writer.metric(name, kind, help_text, value)
+
+    writer.header("db_pool_wait_seconds", "histogram", "Time spent waiting for a pool connection.")
+    for bucket in pool.wait_buckets:
+        writer.sample("db_pool_wait_seconds_bucket", bucket.count, le=bucket.le)
+    writer.sample("db_pool_wait_seconds_bucket", pool.wait_count, le="+Inf")
+    writer.sample("db_pool_wait_seconds_sum", pool.wait_seconds_total)
+    writer.sample("db_pool_wait_seconds_count", pool.wait_count)
+
+    writer.metric(
+        "db_pool_pressure_seconds", "gauge", "Recent average or longest current connection wait.",
+        f"{pool_metrics.pressure_seconds():.6f}",
+    )
+    writer.metric(
+        "db_pool_hold_seconds", "gauge", "Moving average of connection hold time.",
+        f"{pool_metrics.recent_hold_seconds:.6f}",
+    )
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool``, измеряющий ожидание соединения и таймауты."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        wait_id = pool_metrics.start_wait()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        finally:
+            pool_metrics.finish_wait(wait_id)
+            pool_metrics.record_wait(time.perf_counter() - started)
@@ -0,0 +1,145 @@
+import itertools
+import logging
+import time
+
+from litestar.plugins.sqlalchemy import SQLAlchemyAsyncConfig
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.config import settings
+from app.db.session import get_engine_config
+from app.services.metrics import attach_query_metrics
+
+logger = logging.getLogger(__name__)
+
+ROUND_ROBIN = "round_robin"
+LEAST_CONNECTIONS = "least_connections"
+
+# Отставание реплики PostgreSQL от основной БД, секунды (0 - реплика догнала основную)
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaRouter:
+    """Выбор реплики для сессий только на чтение.
+
+    Реплики выбираются по кругу (``round_robin``) или по наименьшему числу
+    занятых соединений в пуле (``least_connections``). Если задано
+    ``max_lag``, реплика PostgreSQL с отставанием больше допустимого (или
+    недоступная) пропускается; отставание проверяется не чаще раза в
+    ``lag_check_interval`` секунд. Если подходящей реплики нет, чтение идет
+    в основную БД.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        strategy: str = ROUND_ROBIN,
+        max_lag: float = 0.0,
+        lag_check_interval: float = 5.0,
+    ):
+        """Инициализация маршрутизатора.
+
+        Args:
+            urls: URL реплик.
+            strategy: ``round_robin`` или ``least_connections``.
+            max_lag: Допустимое отставание в секундах (0 - не проверять).
+            lag_check_interval: Как часто обновлять отставание, секунды.
+        """
+        if strategy not in (ROUND_ROBIN, LEAST_CONNECTIONS):
+            raise ValueError(f"Unknown replica strategy: {strategy}")
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.engines: list[AsyncEngine] = []
+        for url in urls:
+            engine = SQLAlchemyAsyncConfig(
+                connection_string=url,
+                engine_config=get_engine_config(url, poolclass=AsyncAdaptedQueuePool),
+            ).get_engine()
+            attach_query_metrics(engine)
+            self.engines.append(engine)
+        self._session_makers = [async_sessionmaker(engine, expire_on_commit=False) for engine in self.engines]
+        self._round_robin = itertools.cycle(range(len(self.engines)))
+        self._lag = [0.0] * len(self.engines)
+        self._lag_checked_at = [float("-inf")] * len(self.engines)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def _candidates(self) -> list[int]:
+        """Индексы реплик в порядке предпочтения согласно стратегии."""
+        if self.strategy == LEAST_CONNECTIONS:
+            def checked_out(index: int) -> int:
+                pool = self.engines[index].sync_engine.pool
+                return pool.checkedout() if isinstance(pool, QueuePool) else 0
+            return sorted(range(len(self.engines)), key=checked_out)
+
+        start = next(self._round_robin)
+        return [(start + offset) % len(self.engines) for offset in range(len(self.engines))]
+
+    async def lag(self, index: int) -> float:
+        """Возвращает отставание реплики, обновляя его не чаще ``lag_check_interval``.
+
+        Args:
+            index: Индекс реплики.
+
+        Returns:
+            float: Отставание в секундах; ``inf``, если реплика недоступна.
+        """
+        engine = self.engines[index]
+        if engine.dialect.name != "postgresql":
+            return 0.0
+        if time.monotonic() - self._lag_checked_at[index] >= self.lag_check_interval:
+            try:
+                async with engine.connect() as connection:
+                    self._lag[index] = float((await connection.execute(REPLICA_LAG_SQL)).scalar_one())
+            except Exception:
+                logger.warning("Replica %s is unavailable", index, exc_info=True)
+                self._lag[index] = float("inf")
+            self._lag_checked_at[index] = time.monotonic()
+        return self._lag[index]
+
+    async def choose(self) -> int | None:
+        """Выбирает реплику для очередного чтения.
+
+        Returns:
+            int | None: Индекс реплики или None, если читать нужно из основной БД.
+        """
+        for index in self._candidates():
+            if self.max_lag <= 0 or await self.lag(index) <= self.max_lag:
+                return index
+        return None
+
+    async def session(self) -> AsyncSession | None:
+        """Открывает сессию на выбранной реплике.
+
+        Returns:
+            AsyncSession | None: Сессия реплики или None, если реплик нет или все отстают.
+        """
+        if not self.enabled:
+            return None
+        index = await self.choose()
+        return self._session_makers[index]() if index is not None else None
+
+    async def dispose(self) -> None:
+        """Закрывает пулы соединений реплик."""
+        for engine in self.engines:
+            await engine.dispose()
+
+
+replica_router = ReplicaRouter(
+    urls=settings.DATABASE_REPLICA_URLS,
+    strategy=settings.DATABASE_REPLICA_STRATEGY,
+    max_lag=settings.DATABASE_REPLICA_MAX_LAG,
+    lag_check_interval=settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL,
+)
+
+
+async def dispose_replicas() -> None:
+    """Хук on_shutdown: закрывает пулы реплик."""
+    await replica_router.dispose()
@@ -2,6 +2,7 @@
 from litestar.contrib.sqlalchemy.plugins import SQLAlchemyAsyncConfig, SQLAlchemyPlugin
 from litestar.plugins.sqlalchemy import (
     AsyncSessionConfig,
+    EngineConfig,
     SQLAlchemyAsyncConfig,
     SQLAlchemyInitPlugin,
     base,
@@ -17,26 +18,66 @@ from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user_model import User
 from app.config  import settings
+from app.db.pool_metrics import InstrumentedAsyncQueuePool, pool_metrics
+from app.services.metrics import attach_query_metrics
+from app.services.security import hash_password
 
 
 # Конфигурация асинхронной сессии SQLAlchemy с отключенным auto-expire
 session_config = AsyncSessionConfig(expire_on_commit=False)
 
+
+
+def get_engine_config(
+    url: str | None = None,
+    poolclass: type = InstrumentedAsyncQueuePool,
+) -> EngineConfig:
+    """Параметры движка и пула соединений из настроек.
+
+    Args:
+        url: URL БД, для которой строится движок. По умолчанию основная БД.
+        poolclass: Класс пула. По умолчанию пул с учетом ожидания в ``pool_metrics``.
+    """
+    connect_args = {}
+    if (url or settings.database_url).startswith("postgresql+asyncpg"):
+        connect_args = {
+            "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "timeout": settings.DATABASE_CONNECT_TIMEOUT,
+            "command_timeout": settings.DATABASE_COMMAND_TIMEOUT,
+        }
+    return EngineConfig(
+        poolclass=poolclass,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+
+
 # Настройки подключения к БД через SQLAlchemyAsyncConfig
 sqlalchemy_config = SQLAlchemyAsyncConfig(
     connection_string=settings.database_url,  # URL из настроек приложения
+    engine_config=get_engine_config(),      # Пул соединений
     session_dependency_key="db_session",     # Ключ для внедрения зависимостей
     session_config=session_config,          # Конфиг сессии
-    create_all=True,                        # Автосоздание таблиц при старте
+    # Автосоздание таблиц при старте; в production схема создается заранее
+    create_all=settings.STARTUP_MODE != "production",
 )
+# Один движок на процесс: без engine_instance get_engine() создает новый движок
+# (и новый пул) при каждом вызове, например в get_session() вне запроса
+sqlalchemy_config.engine_instance = sqlalchemy_config.get_engine()
+pool_metrics.attach(sqlalchemy_config.engine_instance)
+attach_query_metrics(sqlalchemy_config.engine_instance)
 
 async def on_startup() -> None:
-    """Добавляет некоторые фиктивные данные, если они отсутствуют."""
+    """Добавляет тестового пользователя, если таблица пуста (только STARTUP_MODE=development)."""
     async with sqlalchemy_config.get_session() as session:
-        statement = select(func.count()).select_from(User)
-        count = await session.execute(statement)
-        if not count.scalar():
+        # Проверка наличия строк без count(*) по всей таблице
+        exists = await session.execute(select(User.id).limit(1))
+        if exists.first() is None:
             session.add(
-                User(name="user", surname="test", password="123456", id=1)
+                User(name="user", surname="test", password=hash_password("123456"), id=1)
             )
-            await session.commit()
\ No newline at end of file
+            await session.commit()
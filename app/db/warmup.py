@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.asyncpg_pool import asyncpg_config
+from app.db.session import sqlalchemy_config
+from app.repositories.asyncpg_user_repo import AsyncpgUserRepository
+from app.repositories.contract import UserRepositoryContract
+from app.repositories.user_repo import UserRepository
+
+logger = logging.getLogger(__name__)
+
+# Пауза между попытками прогрева, пока БД недоступна, секунды
+RETRY_DELAYS = (0.5, 1, 2, 5)
+
+
+class StartupState:
+    """Готовность приложения принимать трафик (``GET /health/ready``).
+
+    Приложение готово, когда пул соединений прогрет: открыто
+    ``DATABASE_POOL_WARMUP`` соединений и на каждом выполнены частые запросы
+    (подготовленные выражения asyncpg и кеш компиляции SQLAlchemy заполнены).
+    """
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.ready_at: float | None = None
+        self.warmed_connections = 0
+        self.attempts = 0
+        self.error: str | None = None
+        self.task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    @property
+    def startup_seconds(self) -> float | None:
+        """Время от импорта до готовности или None, если прогрев не завершен."""
+        return None if self.ready_at is None else self.ready_at - self.started_at
+
+
+startup_state = StartupState()
+
+
+async def _warm_repository(repository: UserRepositoryContract) -> None:
+    """Выполняет частые запросы маршрутов пользователей (ID 0 не существует)."""
+    await repository.get_row(0)
+    await repository.get_version(0)
+    await repository.get_rows([0])
+    await repository.list_paginated(1, 1, with_total=False)
+    await repository.list_after(None, 1)
+
+
+async def _warm_sqlalchemy(connections: int) -> int:
+    engine = sqlalchemy_config.get_engine()
+    async with AsyncExitStack() as stack:
+        # Все соединения открываются одновременно, иначе пул вернет одно и то же
+        opened = await asyncio.gather(*(stack.enter_async_context(engine.connect()) for _ in range(connections)))
+        for connection in opened:
+            async with AsyncSession(bind=connection) as session:
+                await _warm_repository(UserRepository(session=session))
+        return len(opened)
+
+
+async def _warm_asyncpg(connections: int) -> int:
+    pool = await asyncpg_config.create_pool()
+    async with AsyncExitStack() as stack:
+        opened = await asyncio.gather(*(stack.enter_async_context(pool.acquire()) for _ in range(connections)))
+        for connection in opened:
+            await _warm_repository(AsyncpgUserRepository(connection))
+        return len(opened)
+
+
+async def warm_up(connections: int) -> None:
+    """Прогревает пул и отмечает приложение готовым; пока БД недоступна - повторяет.
+
+    Args:
+        connections: Количество соединений для прогрева.
+    """
+    warm = _warm_asyncpg if settings.REPOSITORY_BACKEND == "asyncpg" else _warm_sqlalchemy
+    # Соединения сверх размера пула закрылись бы сразу после прогрева
+    connections = min(connections, settings.DATABASE_POOL_SIZE)
+    while True:
+        startup_state.attempts += 1
+        try:
+            startup_state.warmed_connections = await warm(connections) if connections > 0 else 0
+        except Exception as exc:
+            # Первая строка: у ошибок SQLAlchemy дальше идут SQL и параметры
+            message = str(exc).splitlines()
+            startup_state.error = f"{type(exc).__name__}: {message[0]}" if message else type(exc).__name__
+            delay = RETRY_DELAYS[min(startup_state.attempts, len(RETRY_DELAYS)) - 1]
+            logger.warning("Pool warm-up failed (attempt %s), retrying in %ss", startup_state.attempts, delay)
+            await asyncio.sleep(delay)
+            continue
+        startup_state.error = None
+        startup_state.ready_at = time.monotonic()
+        logger.info(
+            "Ready in %.3fs, %s connections warmed",
+            startup_state.startup_seconds, startup_state.warmed_connections,
+        )
+        return
+
+
+async def start_warm_up() -> None:
+    """Хук on_startup: запускает прогрев в фоне.
+
+    При ``DATABASE_POOL_WARMUP_WAIT`` старт ждет прогрева до этого количества
+    секунд: сервер (granian, uvicorn) начинает принимать запросы только после
+    on_startup. Если БД не ответила за это время, прогрев продолжается в
+    фоне, а ``/health/ready`` отвечает 503 до его завершения.
+    """
+    startup_state.task = asyncio.create_task(warm_up(settings.DATABASE_POOL_WARMUP))
+    if settings.DATABASE_POOL_WARMUP_WAIT > 0:
+        await asyncio.wait({startup_state.task}, timeout=settings.DATABASE_POOL_WARMUP_WAIT)
+
+
+async def stop_warm_up() -> None:
+    """Хук on_shutdown: останавливает незавершенный прогрев."""
+    if startup_state.task is not None and not startup_state.task.done():
+        startup_state.task.cancel()
+        try:
+            await startup_state.task
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,27 @@
+from litestar.exceptions import NotAuthorizedException
+from litestar.params import Parameter
+
+from app.services.tokens import TokenClaims
+from app.services.user_service import UserService
+
+
+async def provide_token_claims(
+    user_service: UserService,
+    authorization: str | None = Parameter(header="Authorization", default=None),
+) -> TokenClaims:
+    """Провайдер содержимого токена из заголовка ``Authorization: Bearer <token>``.
+
+    Args:
+        user_service: Сервис пользователей (версия токенов читается из основной БД).
+        authorization: Значение заголовка Authorization.
+
+    Returns:
+        TokenClaims: Содержимое проверенного токена.
+
+    Raises:
+        NotAuthorizedException: Если токена нет или он недействителен.
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise NotAuthorizedException("Missing bearer token")
+    return await user_service.authenticate(token.strip())
@@ -1,7 +1,19 @@
 
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
+
+from asyncpg import Connection
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.db.asyncpg_pool import asyncpg_config
+from app.db.replicas import replica_router
+from app.db.session import sqlalchemy_config
+from app.repositories.asyncpg_user_repo import AsyncpgUserRepository
+from app.repositories.contract import UserRepositoryContract
 from app.repositories.user_repo import UserRepository
+from app.services.purge import PurgeJob
 from app.services.user_service import UserService
+from app.services.write_batcher import CreateBatcher
 from litestar.params import Parameter, Dependency
 from litestar.di import Provide
 
@@ -15,5 +27,144 @@ async def provide_user_service(db_session: AsyncSession) -> UserService:
     Returns:
         UserService: Сервис для работы с пользователями.
     """
-    return UserService(session=db_session)
+    return UserService(session=db_session, create_batcher=get_create_batcher())
+
+
+async def provide_read_session() -> AsyncGenerator[AsyncSession | None, None]:
+    """Открывает сессию реплики для маршрутов только на чтение.
+
+    Yields:
+        AsyncSession | None: Сессия реплики или None, если реплик нет или все отстают.
+    """
+    session = await replica_router.session()
+    if session is None:
+        yield None
+        return
+    async with session:
+        yield session
+
+
+async def provide_read_user_service(
+    db_session: AsyncSession,
+    db_read_session: AsyncSession | None,
+) -> UserService:
+    """Создает UserService, читающий с реплики (записи - в основную БД).
+
+    Args:
+        db_session (AsyncSession): Сессия основной БД.
+        db_read_session (AsyncSession | None): Сессия реплики или None.
+
+    Returns:
+        UserService: Сервис для работы с пользователями.
+    """
+    return UserService(session=db_session, read_session=db_read_session, create_batcher=get_create_batcher())
+
+
+async def provide_asyncpg_user_service(db_connection: Connection) -> UserService:
+    """Создает UserService поверх соединения asyncpg из пула (REPOSITORY_BACKEND=asyncpg).
+
+    Args:
+        db_connection (Connection): Соединение asyncpg, выданное плагином на время запроса.
+
+    Returns:
+        UserService: Сервис для работы с пользователями.
+    """
+    return UserService(repository=AsyncpgUserRepository(db_connection), create_batcher=get_create_batcher())
+
+
+def get_user_service_provider() -> Provide:
+    """Выбирает провайдер UserService по ``REPOSITORY_BACKEND``.
+
+    Returns:
+        Provide: Провайдер зависимости ``user_service``.
+    """
+    if settings.REPOSITORY_BACKEND == "asyncpg":
+        return Provide(provide_asyncpg_user_service)
+    return Provide(provide_user_service)
+
+
+def get_read_user_service_provider() -> dict[str, Provide]:
+    """Зависимости ``user_service`` для маршрутов только на чтение.
+
+    С SQLAlchemy и настроенными ``DATABASE_REPLICA_URLS`` чтение идет с реплики;
+    в остальных случаях провайдер не переопределяется (остается провайдер контроллера).
+
+    Returns:
+        dict[str, Provide]: Зависимости для ``dependencies`` обработчика.
+    """
+    if settings.REPOSITORY_BACKEND == "asyncpg" or not replica_router.enabled:
+        return {}
+    return {
+        "db_read_session": Provide(provide_read_session),
+        "user_service": Provide(provide_read_user_service),
+    }
+
+
+@asynccontextmanager
+async def user_service_context() -> AsyncIterator[UserService]:
+    """Открывает UserService с собственной сессией БД вне жизненного цикла запроса.
+
+    Нужен там, где сессия из DI уже закрыта или недоступна: потоковые ответы,
+    фоновые задачи и CLI.
+
+    Yields:
+        UserService: Сервис для работы с пользователями.
+    """
+    if settings.REPOSITORY_BACKEND == "asyncpg":
+        async with asyncpg_config.get_connection() as connection:
+            yield UserService(repository=AsyncpgUserRepository(connection))
+    else:
+        async with sqlalchemy_config.get_session() as session:
+            yield UserService(session=session)
+
+
+@asynccontextmanager
+async def user_repository_context() -> AsyncIterator[UserRepositoryContract]:
+    """Открывает репозиторий пользователей с собственным соединением (для фоновых записей).
+
+    Yields:
+        UserRepositoryContract: Репозиторий выбранного ``REPOSITORY_BACKEND``.
+    """
+    async with user_service_context() as user_service:
+        yield user_service.user_repository
+
+
+# Пакетная вставка для POST /users (CREATE_BATCHING_ENABLED)
+create_batcher = CreateBatcher(
+    user_repository_context,
+    max_size=settings.CREATE_BATCH_MAX_SIZE,
+    max_delay=settings.CREATE_BATCH_MAX_DELAY,
+    isolate_failures=settings.CREATE_BATCH_ISOLATE_FAILURES,
+)
+
+
+def get_create_batcher() -> CreateBatcher | None:
+    """Пакетная вставка, если она включена, иначе None (каждое создание - своя транзакция)."""
+    return create_batcher if settings.CREATE_BATCHING_ENABLED else None
+
+
+async def close_create_batcher() -> None:
+    """Хук on_shutdown: дописывает накопленные создания."""
+    await create_batcher.close()
+
+
+# Очистка помеченных удаленными (USER_SOFT_DELETE) и журнала изменений
+purge_job = PurgeJob(
+    user_repository_context,
+    older_than=settings.PURGE_RETENTION if settings.USER_SOFT_DELETE else None,
+    interval=settings.PURGE_INTERVAL,
+    chunk_size=settings.PURGE_CHUNK_SIZE,
+    change_retention=settings.CHANGE_FEED_RETENTION,
+)
+
+
+async def start_purge_job() -> None:
+    """Хук on_startup: запускает очистку при ``PURGE_INTERVAL`` > 0, если есть что
+    очищать (``USER_SOFT_DELETE`` или ``CHANGE_FEED_RETENTION`` > 0)."""
+    if settings.PURGE_INTERVAL > 0 and (settings.USER_SOFT_DELETE or settings.CHANGE_FEED_RETENTION > 0):
+        purge_job.start()
+
 
+async def stop_purge_job() -> None:
+    """Хук on_shutdown: останавливает очистку."""
+    await purge_job.stop()
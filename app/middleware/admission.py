@@ -0,0 +1,90 @@
+import msgspec
+from litestar.enums import ScopeType
+from litestar.middleware import ASGIMiddleware
+from litestar.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.services.admission import READ, WRITE, AdmissionController, Rejection, admission_controller
+
+# Методы, выполняемые в бюджете чтений
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class AdmissionMiddleware(ASGIMiddleware):
+    """Отклоняет запросы быстрым 503/429 с ``Retry-After`` при перегрузке.
+
+    Решение принимает ``AdmissionController``. Класс запроса - ``read`` для
+    GET/HEAD/OPTIONS и ``write`` для остальных методов; обработчик может
+    указать его явно через ``opt={"admission": "read"}``. Проверки
+    живости и метрики не ограничиваются.
+    """
+
+    scopes = (ScopeType.HTTP,)
+    exclude_path_pattern = ("^/health", "/metrics")
+
+    def __init__(
+        self,
+        controller: AdmissionController | None = None,
+        client_header: str | None = None,
+        trusted_proxies: int | None = None,
+    ):
+        """Инициализация.
+
+        Args:
+            controller: Контроллер допуска. По умолчанию общий для процесса.
+            client_header: Заголовок с адресом клиента за прокси. По умолчанию ``ADMISSION_CLIENT_HEADER``.
+            trusted_proxies: Доверенных прокси, дописывающих адрес в заголовок.
+                По умолчанию ``ADMISSION_TRUSTED_PROXIES``.
+        """
+        self.controller = controller if controller is not None else admission_controller
+        header = settings.ADMISSION_CLIENT_HEADER if client_header is None else client_header
+        self.client_header = header.lower().encode("latin-1")
+        self.trusted_proxies = max(
+            1, settings.ADMISSION_TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies
+        )
+
+    def _client(self, scope: Scope) -> str:
+        if self.client_header:
+            # Повторы заголовка - продолжение одной цепочки
+            chain = [
+                address.strip()
+                for name, value in scope["headers"] if name == self.client_header
+                for address in value.decode("latin-1").split(",") if address.strip()
+            ]
+            # Клиент может прислать любые адреса слева; доверять можно только
+            # дописанным справа нашими прокси: N-й с конца - адрес, с которого
+            # пришел запрос к первому доверенному прокси
+            if len(chain) >= self.trusted_proxies:
+                return chain[-self.trusted_proxies]
+        client = scope.get("client")
+        return client[0] if client else ""
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send, next_app: ASGIApp) -> None:
+        handler = scope.get("route_handler")
+        kind = handler.opt.get("admission") if handler is not None else None
+        if kind is None:
+            kind = READ if scope["method"] in READ_METHODS else WRITE
+
+        rejection = self.controller.admit(kind, self._client(scope))
+        if rejection is not None:
+            await self._reject(send, rejection)
+            return
+        try:
+            await next_app(scope, receive, send)
+        finally:
+            self.controller.release(kind)
+
+    @staticmethod
+    async def _reject(send: Send, rejection: Rejection) -> None:
+        """Отправляет отказ напрямую, не доходя до обработчика и сессии БД."""
+        body = msgspec.json.encode({"detail": rejection.detail})
+        await send({
+            "type": "http.response.start",
+            "status": rejection.status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(rejection.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1 +1 @@
-from .user_model import User
\ No newline at end of file
+from .user_model import User, UserChangeHorizon, UserChangeLog
\ No newline at end of file
@@ -1,23 +1,218 @@
 from advanced_alchemy.base import  BigIntAuditBase,  BigIntBase
-from advanced_alchemy.types import GUID
+from advanced_alchemy.types import GUID, BigIntIdentity
 
-from sqlalchemy import String, func, BigInteger
+from sqlalchemy import DDL, Boolean, Integer, String, event, func, BigInteger, Index, DateTime, text
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 
+# SQLite хранит даты строками: формат совпадает с CURRENT_TIMESTAMP из server_default,
+# иначе сравнение по (created_at, id) в keyset-запросах работает неверно
+TimestampType = DateTime().with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite",
+)
+
+
+def _folded(column: str):
+    """Значение по умолчанию для колонки поиска: ``casefold()`` колонки ``column`` вставляемой строки."""
+    def default(context) -> str | None:
+        value = context.get_current_parameters().get(column)
+        # Без значения колонки вставку отклонит NOT NULL, а не эта функция
+        return value.casefold() if value is not None else None
+    return default
+
 
 class User(BigIntBase):
     """Модель пользователя в базе данных."""
 
     __tablename__ = "user"
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    __table_args__ = (
+        # Индекс для keyset-пагинации: ORDER BY created_at DESC, id DESC.
+        # Частичный: списки читают только неудаленных (deleted_at IS NULL)
+        Index(
+            "ix_user_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+        # Очистка помеченных удаленными: индекс только по ним
+        Index(
+            "ix_user_deleted_at",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigIntIdentity, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(50))
     surname: Mapped[str] = mapped_column(String(50))
     password: Mapped[str] = mapped_column(String(255))
+    # Версия токенов доступа: токен действителен, пока совпадает с ней.
+    # Увеличивается при смене пароля и выходе (отзыв всех выданных токенов)
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    # Имя и фамилия для поиска без учета регистра: str.casefold() приложения,
+    # т.к. lower() SQLite переводит в нижний регистр только ASCII. casefold()
+    # может удлинить строку (ß -> ss), поэтому колонки шире исходных.
+    # При обновлении имени/фамилии пересчитываются репозиторием
+    name_folded: Mapped[str] = mapped_column(String(150), default=_folded("name"))
+    surname_folded: Mapped[str] = mapped_column(String(150), default=_folded("surname"))
     created_at: Mapped[datetime] = mapped_column(
+        TimestampType,
         server_default=func.now()
     )
     updated_at: Mapped[datetime] = mapped_column(
+        TimestampType,
         server_default=func.now(),
         onupdate=func.now()
-    )
\ No newline at end of file
+    )
+    # Версия данных пользователя для ETag: увеличивается при каждом изменении
+    # имени/фамилии (updated_at в SQLite хранится с точностью до секунды)
+    version: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    # Время мягкого удаления (USER_SOFT_DELETE); None - пользователь не удален
+    deleted_at: Mapped[datetime | None] = mapped_column(TimestampType, nullable=True, default=None)
+
+
+class UserChangeLog(BigIntBase):
+    """Журнал изменений пользователей для ленты изменений.
+
+    Строки пишут триггеры на "user" (см. ниже) при вставке, изменении
+    имени/фамилии/``updated_at``, мягком и окончательном удалении, поэтому
+    журнал пополняется в той же транзакции любым путем записи, включая COPY.
+    Позиция в ленте - ``(txid, id)``: ``id`` растет в порядке записи, ``txid`` -
+    номер транзакции PostgreSQL (в SQLite 0: записи там последовательны).
+    Записи старше ``CHANGE_FEED_RETENTION`` удаляет очистка, кроме последней
+    записи каждого неудаленного пользователя.
+    """
+
+    __tablename__ = "user_change"
+    __table_args__ = (
+        Index("ix_user_change_txid_id", "txid", "id"),
+        # Очистка журнала: есть ли у пользователя запись новее данной
+        Index("ix_user_change_user_id_id", "user_id", "id"),
+        # id не переиспользуются после удаления последней строки
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Mapped[int] = mapped_column(BigIntIdentity, primary_key=True, autoincrement=True)
+    txid: Mapped[int] = mapped_column(BigInteger, server_default=text("0"))
+    user_id: Mapped[int] = mapped_column(BigInteger)
+    deleted: Mapped[bool] = mapped_column(Boolean)
+    changed_at: Mapped[datetime] = mapped_column(
+        TimestampType,
+        server_default=func.now()
+    )
+
+
+class UserChangeHorizon(BigIntBase):
+    """Граница очистки журнала изменений.
+
+    Позиция ``(txid, change_id)`` последнего удаления, убранного из журнала
+    очисткой. Курсор ленты перед ней мог пропустить это удаление, поэтому
+    клиенту с таким курсором нужна полная пересинхронизация. Каждая очистка,
+    убравшая удаления, добавляет строку и удаляет предыдущие; граница -
+    наибольшая из строк.
+    """
+
+    __tablename__ = "user_change_horizon"
+
+    id: Mapped[int] = mapped_column(BigIntIdentity, primary_key=True, autoincrement=True)
+    txid: Mapped[int] = mapped_column(BigInteger)
+    change_id: Mapped[int] = mapped_column(BigInteger)
+
+# Индексы поиска по имени и фамилии (без учета регистра) - по колонкам *_folded.
+# PostgreSQL: btree с text_pattern_ops - для LIKE 'abc%' при любой collation;
+# GIN-индекс pg_trgm - для LIKE '%abc%'. SQLite: btree для префиксного поиска
+# диапазоном и FTS5-таблица с триграммами (см. ниже).
+for _column in ("name_folded", "surname_folded"):
+    Index(f"ix_user_{_column}", _column, postgresql_ops={_column: "text_pattern_ops"})
+    Index(
+        f"ix_user_{_column}_trgm",
+        _column,
+        postgresql_using="gin",
+        postgresql_ops={_column: "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql")
+
+event.listen(
+    User.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+# Триграммный полнотекстовый индекс SQLite (аналог pg_trgm): external content
+# таблица над "user", синхронизируемая триггерами
+SQLITE_SEARCH_TABLE = "user_search"
+for _statement in (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_SEARCH_TABLE}
+        USING fts5(name_folded, surname_folded, content='user', content_rowid='id', tokenize='trigram')""",
+    f"""CREATE TRIGGER IF NOT EXISTS user_search_ai AFTER INSERT ON "user" BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, name_folded, surname_folded)
+        VALUES (new.id, new.name_folded, new.surname_folded);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS user_search_ad AFTER DELETE ON "user" BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, name_folded, surname_folded)
+        VALUES ('delete', old.id, old.name_folded, old.surname_folded);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS user_search_au AFTER UPDATE OF name_folded, surname_folded ON "user" BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, name_folded, surname_folded)
+        VALUES ('delete', old.id, old.name_folded, old.surname_folded);
+        INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, name_folded, surname_folded)
+        VALUES (new.id, new.name_folded, new.surname_folded);
+    END""",
+):
+    event.listen(User.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+# Журнал изменений (UserChangeLog). Изменение только пароля без updated_at
+# (перехеширование при входе) изменением не считается; окончательное удаление
+# помеченного удаленным уже записано при пометке.
+for _statement in (
+    """CREATE TRIGGER IF NOT EXISTS user_change_ai AFTER INSERT ON "user" BEGIN
+        INSERT INTO user_change (user_id, deleted) VALUES (new.id, 0);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_change_au AFTER UPDATE ON "user"
+    WHEN old.name IS NOT new.name OR old.surname IS NOT new.surname
+        OR old.updated_at IS NOT new.updated_at OR old.deleted_at IS NOT new.deleted_at
+    BEGIN
+        INSERT INTO user_change (user_id, deleted) VALUES (new.id, new.deleted_at IS NOT NULL);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_change_ad AFTER DELETE ON "user" WHEN old.deleted_at IS NULL BEGIN
+        INSERT INTO user_change (user_id, deleted) VALUES (old.id, 1);
+    END""",
+):
+    event.listen(User.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+# PostgreSQL: триггеры уровня оператора с таблицами переходов - одна вставка в
+# журнал на оператор, а не на строку (пакетные вставки и удаления)
+USER_CHANGE_FUNCTION_SQL = """CREATE OR REPLACE FUNCTION user_change_log() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO user_change (user_id, deleted, txid)
+        SELECT id, false, txid_current() FROM new_rows ORDER BY id;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO user_change (user_id, deleted, txid)
+        SELECT n.id, n.deleted_at IS NOT NULL, txid_current()
+        FROM new_rows n JOIN old_rows o ON o.id = n.id
+        WHERE (o.name, o.surname, o.updated_at, o.deleted_at)
+            IS DISTINCT FROM (n.name, n.surname, n.updated_at, n.deleted_at)
+        ORDER BY n.id;
+    ELSE
+        INSERT INTO user_change (user_id, deleted, txid)
+        SELECT id, true, txid_current() FROM old_rows WHERE deleted_at IS NULL ORDER BY id;
+    END IF;
+    RETURN NULL;
+END $$"""
+for _statement in (
+    USER_CHANGE_FUNCTION_SQL,
+    """CREATE TRIGGER user_change_ai AFTER INSERT ON "user"
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION user_change_log()""",
+    """CREATE TRIGGER user_change_au AFTER UPDATE ON "user"
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION user_change_log()""",
+    """CREATE TRIGGER user_change_ad AFTER DELETE ON "user"
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION user_change_log()""",
+):
+    event.listen(User.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
@@ -1,2 +1,4 @@
 from .user_repo import UserRepository
-from .base_repo import BaseRepository
\ No newline at end of file
+from .base_repo import BaseRepository
+from .asyncpg_user_repo import AsyncpgUserRepository
+from .contract import UserRepositoryContract
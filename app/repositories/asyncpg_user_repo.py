@@ -0,0 +1,331 @@
+from datetime import datetime
+from typing import AsyncIterator
+
+from asyncpg import Connection, Record
+from asyncpg.transaction import Transaction
+
+from app.repositories.count_strategy import user_count_strategy
+from app.repositories.user_repo import escape_like, with_folded
+
+# Набор колонок UserOut в порядке полей схемы
+USER_OUT_SQL = "id, name, surname, created_at, updated_at, version"
+
+# Все чтения - только неудаленные (помеченные deleted_at ждут очистки); списки
+# идут по частичному индексу ix_user_created_at_id
+GET_SQL = f'SELECT {USER_OUT_SQL} FROM "user" WHERE id = $1 AND deleted_at IS NULL'
+GET_MANY_SQL = f'SELECT {USER_OUT_SQL} FROM "user" WHERE id = ANY($1::bigint[]) AND deleted_at IS NULL'
+VERSION_SQL = 'SELECT version, updated_at FROM "user" WHERE id = $1 AND deleted_at IS NULL'
+LIST_SQL = (
+    f'SELECT {USER_OUT_SQL} FROM "user" WHERE deleted_at IS NULL '
+    "ORDER BY created_at DESC, id DESC LIMIT $1 OFFSET $2"
+)
+LIST_FIRST_SQL = (
+    f'SELECT {USER_OUT_SQL} FROM "user" WHERE deleted_at IS NULL ORDER BY created_at DESC, id DESC LIMIT $1'
+)
+LIST_AFTER_SQL = (
+    f'SELECT {USER_OUT_SQL} FROM "user" WHERE deleted_at IS NULL AND (created_at, id) < ($1, $2) '
+    "ORDER BY created_at DESC, id DESC LIMIT $3"
+)
+INSERT_SQL = (
+    'INSERT INTO "user" (name, surname, password, name_folded, surname_folded) '
+    "SELECT * FROM unnest($1::varchar[], $2::varchar[], $3::varchar[], $4::varchar[], $5::varchar[]) "
+    f"RETURNING {USER_OUT_SQL}"
+)
+CREDENTIALS_SQL = 'SELECT password, token_version FROM "user" WHERE id = $1 AND deleted_at IS NULL'
+TOKEN_VERSION_SQL = 'SELECT token_version FROM "user" WHERE id = $1 AND deleted_at IS NULL'
+REVOKE_TOKENS_SQL = 'UPDATE "user" SET token_version = token_version + 1 WHERE id = $1 AND deleted_at IS NULL'
+REPLACE_PASSWORD_SQL = (
+    'UPDATE "user" SET password = $3 WHERE id = $1 AND password = $2 AND deleted_at IS NULL'
+)
+# Удаление (или пометка deleted_at) одним запросом; журнал изменений пишет триггер
+DELETE_MANY_SQL = 'DELETE FROM "user" WHERE id = ANY($1::bigint[]) AND deleted_at IS NULL RETURNING id'
+SOFT_DELETE_MANY_SQL = (
+    'UPDATE "user" SET deleted_at = now() WHERE id = ANY($1::bigint[]) AND deleted_at IS NULL RETURNING id'
+)
+# Очистка помеченных удаленными по частичному индексу ix_user_deleted_at: $1 - возраст в секундах
+PURGE_SQL = (
+    'DELETE FROM "user" WHERE id IN (SELECT id FROM "user" '
+    "WHERE deleted_at < localtimestamp - $1::float8 * interval '1 second' ORDER BY deleted_at LIMIT $2)"
+)
+# Очистка журнала изменений окнами по id: $1 - возраст в секундах. Остается
+# последняя запись неудаленного пользователя (проверка по ix_user_change_user_id_id)
+PURGE_CHANGES_WINDOW_SQL = (
+    "SELECT id FROM user_change WHERE changed_at < localtimestamp - $1::float8 * interval '1 second' "
+    "AND id > $2 ORDER BY id LIMIT $3"
+)
+PURGE_CHANGES_SQL = (
+    "DELETE FROM user_change c WHERE c.id BETWEEN $2 AND $3 "
+    "AND c.changed_at < localtimestamp - $1::float8 * interval '1 second' "
+    "AND (c.deleted OR EXISTS (SELECT 1 FROM user_change n WHERE n.user_id = c.user_id AND n.id > c.id)) "
+    "RETURNING c.txid, c.id, c.deleted"
+)
+# Граница очистки журнала: позиция последнего убранного удаления
+CHANGE_HORIZON_SQL = "SELECT txid, change_id FROM user_change_horizon ORDER BY txid DESC, change_id DESC LIMIT 1"
+ADVANCE_CHANGE_HORIZON_SQL = "INSERT INTO user_change_horizon (txid, change_id) VALUES ($1, $2)"
+TRIM_CHANGE_HORIZON_SQL = "DELETE FROM user_change_horizon WHERE (txid, change_id) < ($1, $2)"
+# Лента изменений: журнал user_change в порядке (txid, id) только по завершенным
+# транзакциям (старше самой старой незавершенной) с текущими строками пользователей
+_CHANGES_SQL = (
+    "SELECT c.txid, c.id AS change_id, c.changed_at, c.user_id, "
+    "u.id, u.name, u.surname, u.created_at, u.updated_at, u.version "
+    'FROM user_change c LEFT JOIN "user" u ON u.id = c.user_id AND u.deleted_at IS NULL '
+    "WHERE c.txid < txid_snapshot_xmin(txid_current_snapshot()) {after}"
+    "ORDER BY c.txid, c.id LIMIT $1"
+)
+CHANGES_SQL = _CHANGES_SQL.format(after="")
+CHANGES_AFTER_SQL = _CHANGES_SQL.format(after="AND (c.txid, c.id) > ($2, $3) ")
+STREAM_SQL = f'SELECT {USER_OUT_SQL} FROM "user" WHERE deleted_at IS NULL ORDER BY id'
+COUNT_SQL = 'SELECT count(*) FROM "user" WHERE deleted_at IS NULL'
+ESTIMATE_SQL = "SELECT reltuples::bigint FROM pg_class WHERE oid = '\"user\"'::regclass"
+
+# Колонки, которые разрешено обновлять (и пересчитываемые вместе с ними колонки поиска)
+UPDATABLE_COLUMNS = ("name", "surname", "password", "name_folded", "surname_folded")
+# Колонки, по которым разрешен поиск
+SEARCHABLE_COLUMNS = ("name", "surname")
+
+
+class AsyncpgUserRepository:
+    """Репозиторий пользователей на чистом asyncpg.
+
+    Реализует ``UserRepositoryContract`` без SQLAlchemy: запросы - постоянные
+    строки, поэтому asyncpg подготавливает каждый из них один раз на соединение
+    (statement cache) и дальше выполняет только bind/execute. Записи открывают
+    транзакцию лениво, :meth:`commit` ее фиксирует; незафиксированная
+    транзакция откатывается при возврате соединения в пул.
+    """
+
+    def __init__(self, connection: Connection):
+        """Инициализация репозитория.
+
+        Args:
+            connection: Соединение asyncpg (обычно из пула ``litestar-asyncpg``).
+        """
+        self.connection = connection
+        self._transaction: Transaction | None = None
+
+    async def _begin(self) -> None:
+        """Открывает транзакцию для записей, если она еще не открыта."""
+        if self._transaction is None:
+            self._transaction = self.connection.transaction()
+            await self._transaction.start()
+
+    async def commit(self) -> None:
+        if self._transaction is not None:
+            await self._transaction.commit()
+            self._transaction = None
+
+    async def get_row(self, user_id: int) -> Record | None:
+        return await self.connection.fetchrow(GET_SQL, user_id)
+
+    async def get_rows(self, user_ids: list[int]) -> list[Record]:
+        if not user_ids:
+            return []
+        return await self.connection.fetch(GET_MANY_SQL, user_ids)
+
+    async def get_version(self, user_id: int) -> tuple[int, datetime] | None:
+        row = await self.connection.fetchrow(VERSION_SQL, user_id)
+        return tuple(row) if row is not None else None
+
+    async def list_paginated(
+        self,
+        page: int = 1,
+        page_size: int = 100,
+        with_total: bool = True,
+    ) -> tuple[list[Record], int | None, bool]:
+        users = await self.connection.fetch(LIST_SQL, page_size, (page - 1) * page_size)
+        if not with_total:
+            return users, None, False
+        total, exact = await user_count_strategy.count(self)
+        return users, total, exact
+
+    async def list_after(
+        self,
+        after: tuple[datetime, int] | None = None,
+        limit: int = 100,
+    ) -> tuple[list[Record], tuple[datetime, int] | None]:
+        if after is None:
+            users = await self.connection.fetch(LIST_FIRST_SQL, limit + 1)
+        else:
+            users = await self.connection.fetch(LIST_AFTER_SQL, *after, limit + 1)
+
+        if len(users) <= limit:
+            return users, None
+        users = users[:limit]
+        return users, (users[-1]["created_at"], users[-1]["id"])
+
+    async def list_changes(
+        self,
+        after: tuple[int, int] | None = None,
+        limit: int = 100,
+    ) -> tuple[list[tuple[tuple[int, int], datetime, int, tuple | None]], bool]:
+        if after is None:
+            rows = await self.connection.fetch(CHANGES_SQL, limit + 1)
+        else:
+            rows = await self.connection.fetch(CHANGES_AFTER_SQL, limit + 1, *after)
+        changes = [
+            ((row["txid"], row["change_id"]), row["changed_at"], row["user_id"],
+             tuple(row)[4:] if row["id"] is not None else None)
+            for row in rows
+        ]
+        return changes[:limit], len(changes) > limit
+
+    async def insert_many(self, rows: list[dict], batch_size: int = 1000) -> list[Record]:
+        await self._begin()
+        inserted: list[Record] = []
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            result = await self.connection.fetch(
+                INSERT_SQL,
+                [row["name"] for row in batch],
+                [row["surname"] for row in batch],
+                [row["password"] for row in batch],
+                [row["name"].casefold() for row in batch],
+                [row["surname"].casefold() for row in batch],
+            )
+            # id выдаются последовательностью в порядке unnest, поэтому сортировка
+            # по id восстанавливает порядок входных строк
+            inserted.extend(sorted(result, key=lambda row: row["id"]))
+        return inserted
+
+    async def update_returning(self, user_id: int, values: dict) -> Record | None:
+        values = with_folded(values)
+        columns = [column for column in UPDATABLE_COLUMNS if column in values]
+        assignments = ", ".join(f"{column} = ${index}" for index, column in enumerate(columns, start=2))
+        if "password" in values:
+            # Смена пароля отзывает выданные токены
+            assignments += ", token_version = token_version + 1"
+        sql = (
+            f'UPDATE "user" SET {assignments}, updated_at = now(), version = version + 1 '
+            f"WHERE id = $1 AND deleted_at IS NULL RETURNING {USER_OUT_SQL}"
+        )
+        await self._begin()
+        return await self.connection.fetchrow(sql, user_id, *(values[column] for column in columns))
+
+    async def get_credentials(self, user_id: int) -> tuple[str, int] | None:
+        row = await self.connection.fetchrow(CREDENTIALS_SQL, user_id)
+        return tuple(row) if row is not None else None
+
+    async def get_token_version(self, user_id: int) -> int | None:
+        return await self.connection.fetchval(TOKEN_VERSION_SQL, user_id)
+
+    async def revoke_tokens(self, user_id: int) -> bool:
+        await self._begin()
+        return await self.connection.execute(REVOKE_TOKENS_SQL, user_id) == "UPDATE 1"
+
+    async def replace_password(self, user_id: int, current: str, password: str) -> bool:
+        await self._begin()
+        return await self.connection.execute(REPLACE_PASSWORD_SQL, user_id, current, password) == "UPDATE 1"
+
+    async def delete_returning(self, user_id: int, soft: bool = False) -> int | None:
+        deleted = await self.delete_many([user_id], soft)
+        return deleted[0] if deleted else None
+
+    async def delete_many(self, user_ids: list[int], soft: bool = False) -> list[int]:
+        if not user_ids:
+            return []
+        await self._begin()
+        rows = await self.connection.fetch(SOFT_DELETE_MANY_SQL if soft else DELETE_MANY_SQL, user_ids)
+        return [row["id"] for row in rows]
+
+    async def list_ids(
+        self,
+        created_before: datetime | None = None,
+        updated_before: datetime | None = None,
+        name: str | None = None,
+        surname: str | None = None,
+        after_id: int | None = None,
+        limit: int = 1000,
+    ) -> list[int]:
+        conditions = ["deleted_at IS NULL", "id > $1"]
+        args: list = [after_id or 0]
+        for condition, value in (
+            ("created_at < ${}", created_before),
+            ("updated_at < ${}", updated_before),
+            ("name = ${}", name),
+            ("surname = ${}", surname),
+        ):
+            if value is not None:
+                args.append(value)
+                conditions.append(condition.format(len(args)))
+        sql = f'SELECT id FROM "user" WHERE {" AND ".join(conditions)} ORDER BY id LIMIT ${len(args) + 1}'
+        return [row["id"] for row in await self.connection.fetch(sql, *args, limit)]
+
+    async def purge_deleted(self, older_than: float, limit: int = 1000) -> int:
+        await self._begin()
+        status = await self.connection.execute(PURGE_SQL, older_than, limit)
+        # Статус команды - "DELETE <количество>"
+        return int(status.split()[-1])
+
+    async def purge_changes(
+        self,
+        older_than: float,
+        after_id: int | None = None,
+        limit: int = 1000,
+    ) -> tuple[int, int | None]:
+        await self._begin()
+        ids = [
+            row["id"]
+            for row in await self.connection.fetch(PURGE_CHANGES_WINDOW_SQL, older_than, after_id or 0, limit)
+        ]
+        if not ids:
+            return 0, None
+        purged = await self.connection.fetch(PURGE_CHANGES_SQL, older_than, ids[0], ids[-1])
+        tombstones = [(row["txid"], row["id"]) for row in purged if row["deleted"]]
+        if tombstones:
+            horizon = max(tombstones)
+            await self.connection.execute(ADVANCE_CHANGE_HORIZON_SQL, *horizon)
+            await self.connection.execute(TRIM_CHANGE_HORIZON_SQL, *horizon)
+        return len(purged), ids[-1] if len(ids) == limit else None
+
+    async def get_change_horizon(self) -> tuple[int, int]:
+        horizon = await self.connection.fetchrow(CHANGE_HORIZON_SQL)
+        return tuple(horizon) if horizon is not None else (0, 0)
+
+    async def copy_many(self, rows: list[tuple[str, str, str]]) -> int:
+        if not rows:
+            return 0
+        await self._begin()
+        await self.connection.copy_records_to_table(
+            "user",
+            records=[(name, surname, password, name.casefold(), surname.casefold()) for name, surname, password in rows],
+            columns=["name", "surname", "password", "name_folded", "surname_folded"],
+        )
+        return len(rows)
+
+    async def stream_rows(self, batch_size: int = 1000) -> AsyncIterator[list[Record]]:
+        # Курсоры asyncpg работают только внутри транзакции
+        async with self.connection.transaction():
+            cursor = await self.connection.cursor(STREAM_SQL)
+            while rows := await cursor.fetch(batch_size):
+                yield rows
+
+    async def count_all(self) -> int:
+        return await self.connection.fetchval(COUNT_SQL)
+
+    async def estimate_count(self) -> int | None:
+        estimate = await self.connection.fetchval(ESTIMATE_SQL)
+        return estimate if estimate is not None and estimate >= 0 else None
+
+    async def search(
+        self,
+        query: str,
+        mode: str = "prefix",
+        fields: tuple[str, ...] = SEARCHABLE_COLUMNS,
+        after_id: int | None = None,
+        limit: int = 50,
+    ) -> tuple[list[Record], int | None]:
+        columns = [column for column in SEARCHABLE_COLUMNS if column in fields]
+        # Префикс - индекс text_pattern_ops, подстрока - GIN-индекс pg_trgm
+        condition = " OR ".join(f"{column}_folded LIKE $1 ESCAPE '\\'" for column in columns)
+        sql = (
+            f'SELECT {USER_OUT_SQL} FROM "user" '
+            f"WHERE ({condition}) AND id > $2 AND deleted_at IS NULL ORDER BY id LIMIT $3"
+        )
+        escaped = escape_like(query.casefold())
+        pattern = f"{escaped}%" if mode == "prefix" else f"%{escaped}%"
+
+        users = await self.connection.fetch(sql, pattern, after_id or 0, limit + 1)
+        if len(users) <= limit:
+            return users, None
+        users = users[:limit]
+        return users, users[-1]["id"]
@@ -0,0 +1,129 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Protocol, Sequence
+
+# Строка пользователя: (id, name, surname, created_at, updated_at, version) - порядок полей UserOut
+UserRow = Sequence[Any]
+
+
+class UserRepositoryContract(Protocol):
+    """Контракт репозитория пользователей, на который опирается UserService.
+
+    Реализации: ``UserRepository`` (SQLAlchemy) и ``AsyncpgUserRepository``
+    (asyncpg). Все методы чтения возвращают строки ``UserRow`` только
+    неудаленных пользователей (``deleted_at IS NULL``); записи выполняются в
+    текущей транзакции и фиксируются через :meth:`commit`.
+    """
+
+    async def get_row(self, user_id: int) -> UserRow | None:
+        """Пользователь по ID или None."""
+
+    async def get_rows(self, user_ids: list[int]) -> list[UserRow]:
+        """Пользователи по списку ID одним запросом (порядок не гарантирован)."""
+
+    async def get_version(self, user_id: int) -> tuple[int, datetime] | None:
+        """Версия и ``updated_at`` пользователя или None."""
+
+    async def list_paginated(
+        self,
+        page: int = 1,
+        page_size: int = 100,
+        with_total: bool = True,
+    ) -> tuple[list[UserRow], int | None, bool]:
+        """Страница по смещению, общее количество и признак его точности."""
+
+    async def list_after(
+        self,
+        after: tuple[datetime, int] | None = None,
+        limit: int = 100,
+    ) -> tuple[list[UserRow], tuple[datetime, int] | None]:
+        """Страница по курсору ``(created_at, id)`` и позиция следующей страницы."""
+
+    async def search(
+        self,
+        query: str,
+        mode: str = "prefix",
+        fields: tuple[str, ...] = ("name", "surname"),
+        after_id: int | None = None,
+        limit: int = 50,
+    ) -> tuple[list[UserRow], int | None]:
+        """Поиск по началу (``prefix``) или подстроке (``substring``) имени/фамилии
+        без учета регистра; страница по id и id для следующей страницы."""
+
+    async def list_changes(
+        self,
+        after: tuple[int, int] | None = None,
+        limit: int = 100,
+    ) -> tuple[list[tuple[tuple[int, int], datetime, int, UserRow | None]], bool]:
+        """Изменения из журнала после позиции ``(txid, id)`` только зафиксированных
+        транзакций, которые уже не могут оказаться перед ней: ``(позиция, время,
+        id пользователя, строка)``, для удаленных строка None; признак наличия следующих."""
+
+    async def insert_many(self, rows: list[dict], batch_size: int = 1000) -> list[UserRow]:
+        """Вставка пользователей с возвратом строк в порядке ``rows``."""
+
+    async def update_returning(self, user_id: int, values: dict) -> UserRow | None:
+        """Обновление переданных колонок одним запросом с увеличением версии;
+        с ``password`` увеличивает и версию токенов."""
+
+    async def get_credentials(self, user_id: int) -> tuple[str, int] | None:
+        """Хеш пароля и версия токенов пользователя или None."""
+
+    async def get_token_version(self, user_id: int) -> int | None:
+        """Версия токенов пользователя или None."""
+
+    async def revoke_tokens(self, user_id: int) -> bool:
+        """Увеличивает версию токенов (все выданные токены недействительны);
+        ``updated_at`` не меняется. True, если пользователь найден."""
+
+    async def replace_password(self, user_id: int, current: str, password: str) -> bool:
+        """Заменяет хеш пароля, если он все еще равен ``current``; ``updated_at`` не меняется."""
+
+    async def delete_returning(self, user_id: int, soft: bool = False) -> int | None:
+        """Удаление (``soft`` - пометка ``deleted_at``) одним запросом, возвращает ID или None."""
+
+    async def delete_many(self, user_ids: list[int], soft: bool = False) -> list[int]:
+        """Удаление (``soft`` - пометка ``deleted_at``) списка ID одним запросом,
+        возвращает ID удаленных."""
+
+    async def list_ids(
+        self,
+        created_before: datetime | None = None,
+        updated_before: datetime | None = None,
+        name: str | None = None,
+        surname: str | None = None,
+        after_id: int | None = None,
+        limit: int = 1000,
+    ) -> list[int]:
+        """ID пользователей по фильтру (все условия вместе) в порядке id после ``after_id``."""
+
+    async def purge_deleted(self, older_than: float, limit: int = 1000) -> int:
+        """Окончательное удаление не больше ``limit`` помеченных удаленными дольше
+        ``older_than`` секунд, возвращает количество."""
+
+    async def purge_changes(
+        self,
+        older_than: float,
+        after_id: int | None = None,
+        limit: int = 1000,
+    ) -> tuple[int, int | None]:
+        """Удаление из окна журнала изменений после ``after_id`` записей старше
+        ``older_than`` секунд, кроме последней записи неудаленного пользователя,
+        со сдвигом границы очистки; количество и ``after_id`` следующего окна."""
+
+    async def get_change_horizon(self) -> tuple[int, int]:
+        """Позиция последнего удаления, убранного из журнала очисткой, или ``(0, 0)``."""
+
+    async def copy_many(self, rows: list[tuple[str, str, str]]) -> int:
+        """Быстрая загрузка ``(name, surname, password)`` без возврата строк."""
+
+    def stream_rows(self, batch_size: int = 1000) -> AsyncIterator[list[UserRow]]:
+        """Чтение всех пользователей пачками в порядке id."""
+
+    async def count_all(self) -> int:
+        """Точное количество пользователей."""
+
+    async def estimate_count(self) -> int | None:
+        """Оценка количества по статистике или None, если ее нет."""
+
+    async def commit(self) -> None:
+        """Фиксирует текущую транзакцию."""
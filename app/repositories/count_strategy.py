@@ -0,0 +1,94 @@
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    from app.repositories.contract import UserRepositoryContract
+
+
+class CountStrategy(ABC):
+    """Стратегия подсчета общего количества пользователей для пагинации."""
+
+    @abstractmethod
+    async def count(self, repository: "UserRepositoryContract") -> tuple[int, bool]:
+        """Возвращает количество пользователей.
+
+        Args:
+            repository: Репозиторий пользователей (SQLAlchemy или asyncpg).
+
+        Returns:
+            tuple[int, bool]: Количество и признак того, что оно точное.
+        """
+
+    def invalidate(self) -> None:
+        """Сбрасывает сохраненное значение после изменения таблицы."""
+
+
+class ExactCount(CountStrategy):
+    """Точный ``SELECT count(*)`` на каждый запрос."""
+
+    async def count(self, repository: "UserRepositoryContract") -> tuple[int, bool]:
+        return await repository.count_all(), True
+
+
+class CachedCount(ExactCount):
+    """Точный подсчет, закешированный в процессе на ``ttl`` секунд.
+
+    Кеш сбрасывается сервисом при создании и удалении пользователей. Значение
+    из кеша помечается как неточное: другие воркеры могли изменить таблицу.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self._value: int | None = None
+        self._expires_at = 0.0
+
+    async def count(self, repository: "UserRepositoryContract") -> tuple[int, bool]:
+        if self._value is not None and time.monotonic() < self._expires_at:
+            return self._value, False
+        value, _ = await super().count(repository)
+        self._value = value
+        self._expires_at = time.monotonic() + self.ttl
+        return value, True
+
+    def invalidate(self) -> None:
+        self._value = None
+
+
+class EstimatedCount(ExactCount):
+    """Оценка количества по статистике планировщика.
+
+    Оценку дает репозиторий (``estimate_count``): на PostgreSQL это
+    ``pg_class.reltuples`` (обновляется autovacuum/ANALYZE), на SQLite -
+    ``max(id)`` по первичному ключу. Если статистика еще не собрана,
+    выполняется точный подсчет.
+    """
+
+    async def count(self, repository: "UserRepositoryContract") -> tuple[int, bool]:
+        estimate = await repository.estimate_count()
+        if estimate is None:
+            return await super().count(repository)
+        return int(estimate), False
+
+
+def get_count_strategy(name: str) -> CountStrategy:
+    """Создает стратегию подсчета по имени из настроек.
+
+    Args:
+        name: ``exact``, ``cached`` или ``estimated``.
+
+    Returns:
+        CountStrategy: Экземпляр стратегии.
+    """
+    if name == "exact":
+        return ExactCount()
+    if name == "cached":
+        return CachedCount(ttl=settings.USER_COUNT_CACHE_TTL)
+    if name == "estimated":
+        return EstimatedCount()
+    raise ValueError(f"Unknown count strategy: {name}")
+
+
+user_count_strategy = get_count_strategy(settings.USER_COUNT_STRATEGY)
@@ -1,9 +1,40 @@
-from typing import Generic, TypeVar
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Generic, TypeVar
 from litestar.plugins.sqlalchemy import repository
-from app.models.user_model import User
+from app.models.user_model import SQLITE_SEARCH_TABLE, User, UserChangeHorizon, UserChangeLog
 from app.repositories.base_repo import BaseRepository
-from sqlalchemy import func, select
+from app.repositories.count_strategy import user_count_strategy
+from sqlalchemy import (
+    BigInteger, Row, and_, any_, bindparam, delete, exists, func, insert, literal, or_, select, text, tuple_, update
+)
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import ARRAY
 
+# Колонки UserOut в порядке полей схемы: строки с ними читаются без ORM-объектов
+USER_OUT_COLUMNS = (User.id, User.name, User.surname, User.created_at, User.updated_at, User.version)
+# Неудаленные пользователи: условие всех чтений (помеченные deleted_at ждут очистки)
+ACTIVE = User.deleted_at.is_(None)
+
+# Минимальная длина подстроки, при которой работает триграммный индекс
+TRIGRAM_MIN_LENGTH = 3
+
+
+def escape_like(value: str) -> str:
+    """Экранирует спецсимволы LIKE (экранирующий символ - обратная косая черта)."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def with_folded(values: dict) -> dict:
+    """Добавляет к обновляемым колонкам пересчитанные колонки поиска ``*_folded``.
+
+    Args:
+        values (dict): Обновляемые колонки.
+
+    Returns:
+        dict: Те же колонки и ``name_folded``/``surname_folded`` для переданных имени и фамилии.
+    """
+    folded = {f"{column}_folded": values[column].casefold() for column in ("name", "surname") if column in values}
+    return {**values, **folded} if folded else values
 
 
 class UserRepository(BaseRepository[User]):
@@ -13,28 +44,107 @@ class UserRepository(BaseRepository[User]):
     id_type = int
 
 
+    async def commit(self) -> None:
+        """Фиксирует транзакцию сессии."""
+        await self.session.commit()
+
+    async def count_all(self) -> int:
+        """Точное количество пользователей (``SELECT count(*)``).
+
+        Returns:
+            int: Количество пользователей.
+        """
+        result = await self.session.execute(select(func.count()).select_from(User).where(ACTIVE))
+        return result.scalar_one()
+
+    async def estimate_count(self) -> int | None:
+        """Оценивает количество пользователей без полного сканирования.
+
+        На PostgreSQL читается ``pg_class.reltuples``, на остальных СУБД - ``max(id)``.
+
+        Returns:
+            int | None: Оценка или None, если статистика еще не собрана.
+        """
+        if self.session.bind.dialect.name == "postgresql":
+            result = await self.session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+                {"table": f'"{User.__tablename__}"'},
+            )
+            estimate = result.scalar_one_or_none()
+        else:
+            result = await self.session.execute(select(func.max(User.id)))
+            estimate = result.scalar_one_or_none() or 0
+        return estimate if estimate is not None and estimate >= 0 else None
+
+    async def get_row(self, user_id: int) -> Row | None:
+        """Получает пользователя по ID строкой ``USER_OUT_COLUMNS`` без ORM-объекта.
+
+        Args:
+            user_id (int): Идентификатор пользователя.
+
+        Returns:
+            Row | None: Строка пользователя или None, если он не найден.
+        """
+        result = await self.session.execute(select(*USER_OUT_COLUMNS).where(User.id == user_id, ACTIVE))
+        return result.one_or_none()
+
+    async def get_rows(self, user_ids: list[int]) -> list[Row]:
+        """Получает пользователей по списку ID одним запросом.
+
+        На PostgreSQL ID передаются одним параметром-массивом (``id = ANY(:ids)``),
+        поэтому запрос не зависит от количества ID; на остальных СУБД - ``IN``.
+
+        Args:
+            user_ids (list[int]): Идентификаторы пользователей (без повторов).
+
+        Returns:
+            list[Row]: Строки ``USER_OUT_COLUMNS`` найденных пользователей в произвольном порядке.
+        """
+        if not user_ids:
+            return []
+        result = await self.session.execute(select(*USER_OUT_COLUMNS).where(self._id_in(user_ids), ACTIVE))
+        return list(result.all())
+
+    async def get_version(self, user_id: int) -> tuple[int, datetime] | None:
+        """Читает только версию и ``updated_at`` пользователя для проверки условных запросов.
+
+        Args:
+            user_id (int): Идентификатор пользователя.
+
+        Returns:
+            tuple[int, datetime] | None: Версия и дата последнего изменения или None,
+                если пользователь не найден.
+        """
+        result = await self.session.execute(select(User.version, User.updated_at).where(User.id == user_id, ACTIVE))
+        row = result.one_or_none()
+        return tuple(row) if row is not None else None
+
     async def list_paginated(
         self,
         page: int = 1,
         page_size: int = 100,
-    ) -> tuple[list[User], int]:
+        with_total: bool = True,
+    ) -> tuple[list[Row], int | None, bool]:
         """Получает список пользователей с пагинацией.
         
         Возвращает кортеж из списка пользователей на указанной странице и общего количества пользователей.
-        Сортировка по дате создания (новые сначала).
+        Сортировка по дате создания (новые сначала). Общее количество считается
+        стратегией из ``USER_COUNT_STRATEGY`` (см. ``count_strategy``).
 
         Args:
             page (int, optional): Номер страницы (начинается с 1). По умолчанию 1.
             page_size (int, optional): Количество пользователей на странице. По умолчанию 100.
+            with_total (bool, optional): Считать ли общее количество. По умолчанию True.
 
         Returns:
-            tuple[list[User], int]: Кортеж из:
-                - Список пользователей на текущей странице.
-                - Общее количество пользователей (для расчета общего числа страниц).
+            tuple[list[Row], int | None, bool]: Кортеж из:
+                - Строки ``USER_OUT_COLUMNS`` пользователей на текущей странице.
+                - Общее количество пользователей (None, если with_total=False).
+                - Признак того, что количество точное.
 
         """
-        # Базовый запрос
-        stmt = select(User).order_by(User.created_at.desc())
+        # Базовый запрос (только колонки UserOut, без гидратации ORM)
+        stmt = select(*USER_OUT_COLUMNS).where(ACTIVE).order_by(User.created_at.desc(), User.id.desc())
         
         # Пагинация
         paginated_stmt = (
@@ -45,10 +155,532 @@ class UserRepository(BaseRepository[User]):
         
         # Получение результатов
         result = await self.session.execute(paginated_stmt)
-        users = result.scalars().all()
+        users = result.all()
         
         # Получение общего количества
-        count_result = await self.session.execute(select(func.count()).select_from(stmt))
-        total = count_result.scalar_one()
+        if not with_total:
+            return users, None, False
+        total, exact = await user_count_strategy.count(self)
         
-        return users, total
\ No newline at end of file
+        return users, total, exact
+
+    async def insert_many(
+        self,
+        rows: list[dict],
+        batch_size: int = 1000,
+    ) -> list[Row]:
+        """Вставляет пользователей пачками многострочных ``INSERT ... RETURNING``.
+
+        Не создает ORM-объекты и не фиксирует транзакцию: все пачки выполняются
+        в текущей транзакции сессии.
+
+        Args:
+            rows (list[dict]): Значения колонок ``name``, ``surname``, ``password``.
+            batch_size (int, optional): Количество строк в одном INSERT. По умолчанию 1000.
+
+        Returns:
+            list[Row]: Строки ``(id, name, surname, created_at, updated_at, version)`` в порядке ``rows``.
+        """
+        stmt = insert(User).returning(*USER_OUT_COLUMNS, sort_by_parameter_order=True)
+        inserted: list[Row] = []
+        for start in range(0, len(rows), batch_size):
+            result = await self.session.execute(stmt, rows[start:start + batch_size])
+            inserted.extend(result.all())
+        return inserted
+
+    async def update_returning(self, user_id: int, values: dict) -> Row | None:
+        """Обновляет пользователя одним ``UPDATE ... RETURNING``.
+
+        Версия пользователя увеличивается. Смена пароля в том же запросе
+        увеличивает ``token_version``: выданные до нее токены недействительны.
+
+        Args:
+            user_id (int): Идентификатор пользователя.
+            values (dict): Обновляемые колонки (только переданные клиентом).
+
+        Returns:
+            Row | None: Строка ``(id, name, surname, created_at, updated_at, version)``
+                или None, если пользователь не найден.
+        """
+        values = with_folded(values)
+        values["version"] = User.version + 1
+        if "password" in values:
+            values["token_version"] = User.token_version + 1
+        stmt = (
+            update(User)
+            .where(User.id == user_id, ACTIVE)
+            .values(**values)
+            .returning(*USER_OUT_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.one_or_none()
+
+    async def get_credentials(self, user_id: int) -> tuple[str, int] | None:
+        """Читает хеш пароля и версию токенов пользователя для входа.
+
+        Args:
+            user_id (int): Идентификатор пользователя.
+
+        Returns:
+            tuple[str, int] | None: Строка хеша и версия токенов или None, если пользователь не найден.
+        """
+        result = await self.session.execute(
+            select(User.password, User.token_version).where(User.id == user_id, ACTIVE)
+        )
+        row = result.one_or_none()
+        return tuple(row) if row is not None else None
+
+    async def get_token_version(self, user_id: int) -> int | None:
+        """Читает версию токенов пользователя для проверки токена.
+
+        Args:
+            user_id (int): Идентификатор пользователя.
+
+        Returns:
+            int | None: Версия или None, если пользователь не найден или удален.
+        """
+        result = await self.session.execute(select(User.token_version).where(User.id == user_id, ACTIVE))
+        return result.scalar_one_or_none()
+
+    async def revoke_tokens(self, user_id: int) -> bool:
+        """Отзывает все токены пользователя, увеличивая ``token_version``; ``updated_at`` не меняется.
+
+        Args:
+            user_id (int): Идентификатор пользователя.
+
+        Returns:
+            bool: True, если пользователь найден.
+        """
+        stmt = (
+            update(User)
+            .where(User.id == user_id, ACTIVE)
+            # Явное значение отключает onupdate: пользователь для клиентов не изменился
+            .values(token_version=User.token_version + 1, updated_at=User.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount == 1
+
+    async def replace_password(self, user_id: int, current: str, password: str) -> bool:
+        """Заменяет хеш пароля (перехеширование при входе), не меняя ``updated_at``.
+
+        Хеш заменяется, только если он не изменился с момента чтения: смена
+        пароля, выполненная одновременно со входом, не перезаписывается.
+
+        Args:
+            user_id (int): Идентификатор пользователя.
+            current (str): Прочитанный хеш.
+            password (str): Новый хеш.
+
+        Returns:
+            bool: True, если хеш заменен.
+        """
+        stmt = (
+            update(User)
+            .where(User.id == user_id, User.password == current, ACTIVE)
+            # Явное значение отключает onupdate: пользователь для клиентов не изменился
+            .values(password=password, updated_at=User.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount == 1
+
+    async def delete_returning(self, user_id: int, soft: bool = False) -> int | None:
+        """Удаляет пользователя одним ``DELETE ... RETURNING id`` (журнал изменений пишет триггер).
+
+        Args:
+            user_id (int): Идентификатор пользователя.
+            soft (bool, optional): Пометить ``deleted_at`` вместо удаления. По умолчанию False.
+
+        Returns:
+            int | None: Идентификатор удаленного пользователя или None, если он не найден.
+        """
+        deleted = await self.delete_many([user_id], soft)
+        return deleted[0] if deleted else None
+
+    async def delete_many(self, user_ids: list[int], soft: bool = False) -> list[int]:
+        """Удаляет пользователей одним запросом.
+
+        Удаление - ``DELETE ... WHERE id = ANY(:ids) RETURNING id``, мягкое -
+        ``UPDATE ... SET deleted_at = now()`` (дешевле: индексы, кроме
+        частичных, не меняются). Удаления в журнал изменений записывает
+        триггер в том же запросе. Транзакция не фиксируется.
+
+        Args:
+            user_ids (list[int]): Идентификаторы пользователей.
+            soft (bool, optional): Пометить ``deleted_at`` вместо удаления. По умолчанию False.
+
+        Returns:
+            list[int]: Идентификаторы удаленных пользователей (ненайденные пропускаются).
+        """
+        if not user_ids:
+            return []
+        if soft:
+            # Явное значение отключает onupdate: удаление не является изменением пользователя
+            stmt = update(User).values(deleted_at=func.now(), updated_at=User.updated_at)
+        else:
+            stmt = delete(User)
+        stmt = (
+            stmt.where(self._id_in(user_ids), ACTIVE)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars())
+
+    async def list_ids(
+        self,
+        created_before: datetime | None = None,
+        updated_before: datetime | None = None,
+        name: str | None = None,
+        surname: str | None = None,
+        after_id: int | None = None,
+        limit: int = 1000,
+    ) -> list[int]:
+        """Получает ID неудаленных пользователей по фильтру в порядке id.
+
+        Args:
+            created_before (datetime | None): Созданы раньше этого времени.
+            updated_before (datetime | None): Не изменялись с этого времени.
+            name (str | None): Точное имя.
+            surname (str | None): Точная фамилия.
+            after_id (int | None): Последний ID предыдущей порции.
+            limit (int, optional): Максимум ID. По умолчанию 1000.
+
+        Returns:
+            list[int]: Идентификаторы пользователей.
+        """
+        stmt = select(User.id).where(ACTIVE).order_by(User.id).limit(limit)
+        if created_before is not None:
+            stmt = stmt.where(User.created_at < literal(created_before, User.created_at.type))
+        if updated_before is not None:
+            stmt = stmt.where(User.updated_at < literal(updated_before, User.updated_at.type))
+        if name is not None:
+            stmt = stmt.where(User.name == name)
+        if surname is not None:
+            stmt = stmt.where(User.surname == surname)
+        if after_id is not None:
+            stmt = stmt.where(User.id > after_id)
+        result = await self.session.execute(stmt)
+        return list(result.scalars())
+
+    async def purge_deleted(self, older_than: float, limit: int = 1000) -> int:
+        """Окончательно удаляет пользователей, помеченных удаленными дольше ``older_than`` секунд.
+
+        Строки выбираются по частичному индексу ``ix_user_deleted_at``; за один
+        вызов удаляется не больше ``limit``. Удаление в журнале изменений уже
+        записано при мягком удалении. Транзакция не фиксируется.
+
+        Args:
+            older_than (float): Минимальный возраст пометки, секунды.
+            limit (int, optional): Максимум удаляемых строк. По умолчанию 1000.
+
+        Returns:
+            int: Количество удаленных строк.
+        """
+        expired = (
+            select(User.id)
+            .where(User.deleted_at < self._age_cutoff(older_than))
+            .order_by(User.deleted_at)
+            .limit(limit)
+        )
+        stmt = delete(User).where(User.id.in_(expired)).execution_options(synchronize_session=False)
+        result = await self.session.execute(stmt)
+        return result.rowcount
+
+    async def purge_changes(
+        self,
+        older_than: float,
+        after_id: int | None = None,
+        limit: int = 1000,
+    ) -> tuple[int, int | None]:
+        """Удаляет из журнала изменений записи старше ``older_than`` секунд.
+
+        Просматривается окно из ``limit`` записей после ``after_id`` в порядке
+        id. Удаляются удаления и записи, у пользователя которых есть запись
+        новее; последняя запись неудаленного пользователя остается, поэтому
+        лента с начала по-прежнему содержит всех пользователей. Если удалены
+        удаления, граница очистки (``user_change_horizon``) сдвигается на
+        последнее из них. Транзакция не фиксируется.
+
+        Args:
+            older_than (float): Минимальный возраст записи, секунды.
+            after_id (int | None, optional): id, после которого начинается окно.
+                None - с начала журнала.
+            limit (int, optional): Размер окна. По умолчанию 1000.
+
+        Returns:
+            tuple[int, int | None]: Кортеж из:
+                - Количество удаленных записей.
+                - ``after_id`` следующего окна или None, если окно последнее.
+        """
+        cutoff = self._age_cutoff(older_than)
+        window = select(UserChangeLog.id).where(UserChangeLog.changed_at < cutoff)
+        if after_id is not None:
+            window = window.where(UserChangeLog.id > after_id)
+        ids = (await self.session.execute(window.order_by(UserChangeLog.id).limit(limit))).scalars().all()
+        if not ids:
+            return 0, None
+
+        newer = aliased(UserChangeLog)
+        stmt = (
+            delete(UserChangeLog)
+            .where(
+                UserChangeLog.id.between(ids[0], ids[-1]),
+                UserChangeLog.changed_at < cutoff,
+                or_(
+                    UserChangeLog.deleted,
+                    exists().where(newer.user_id == UserChangeLog.user_id, newer.id > UserChangeLog.id),
+                ),
+            )
+            .returning(UserChangeLog.txid, UserChangeLog.id, UserChangeLog.deleted)
+            .execution_options(synchronize_session=False)
+        )
+        purged = (await self.session.execute(stmt)).all()
+        tombstones = [(txid, id) for txid, id, deleted in purged if deleted]
+        if tombstones:
+            txid, change_id = max(tombstones)
+            await self.session.execute(insert(UserChangeHorizon).values(txid=txid, change_id=change_id))
+            await self.session.execute(
+                delete(UserChangeHorizon).where(
+                    tuple_(UserChangeHorizon.txid, UserChangeHorizon.change_id) < tuple_(txid, change_id)
+                )
+            )
+        return len(purged), ids[-1] if len(ids) == limit else None
+
+    async def get_change_horizon(self) -> tuple[int, int]:
+        """Получает границу очистки журнала изменений.
+
+        Returns:
+            tuple[int, int]: Позиция ``(txid, id)`` последнего удаления, убранного
+                очисткой; ``(0, 0)``, если удаления не убирались.
+        """
+        stmt = (
+            select(UserChangeHorizon.txid, UserChangeHorizon.change_id)
+            .order_by(UserChangeHorizon.txid.desc(), UserChangeHorizon.change_id.desc())
+            .limit(1)
+        )
+        horizon = (await self.session.execute(stmt)).first()
+        return tuple(horizon) if horizon is not None else (0, 0)
+
+    def _id_in(self, user_ids: list[int]):
+        """Условие ``id`` из списка: на PostgreSQL - один параметр-массив (``id = ANY(:ids)``), иначе ``IN``."""
+        if self.session.bind.dialect.name == "postgresql":
+            return User.id == any_(bindparam("ids", user_ids, type_=ARRAY(BigInteger)))
+        return User.id.in_(user_ids)
+
+    async def list_changes(
+        self,
+        after: tuple[int, int] | None = None,
+        limit: int = 100,
+    ) -> tuple[list[tuple[tuple[int, int], datetime, int, Row | None]], bool]:
+        """Получает изменения пользователей из журнала после позиции.
+
+        Журнал ``user_change`` читается по индексу ``ix_user_change_txid_id`` в
+        порядке ``(txid, id)`` вместе с текущими строками пользователей. На
+        PostgreSQL отдаются только изменения транзакций старше самой старой
+        незавершенной (``txid_snapshot_xmin``): транзакция, зафиксированная
+        позже, не окажется перед уже выданной позицией, сколько бы она ни
+        длилась. В SQLite записи последовательны, и порядок id совпадает с
+        порядком фиксации.
+
+        Args:
+            after (tuple[int, int] | None): Позиция ``(txid, id)`` последнего
+                полученного изменения. None - с начала.
+            limit (int, optional): Максимум изменений. По умолчанию 100.
+
+        Returns:
+            tuple[list[tuple[tuple[int, int], datetime, int, Row | None]], bool]: Кортеж из:
+                - Изменения ``(позиция, время, id пользователя, строка USER_OUT_COLUMNS)``;
+                  для удаленных строка None.
+                - Есть ли изменения после последнего.
+        """
+        stmt = (
+            select(
+                UserChangeLog.txid, UserChangeLog.id, UserChangeLog.changed_at, UserChangeLog.user_id,
+                *USER_OUT_COLUMNS,
+            )
+            .outerjoin(User, and_(User.id == UserChangeLog.user_id, ACTIVE))
+            .order_by(UserChangeLog.txid, UserChangeLog.id)
+            .limit(limit + 1)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(UserChangeLog.txid, UserChangeLog.id) > tuple_(*after))
+        if self.session.bind.dialect.name == "postgresql":
+            stmt = stmt.where(UserChangeLog.txid < func.txid_snapshot_xmin(func.txid_current_snapshot()))
+        result = await self.session.execute(stmt)
+        changes = [
+            ((row[0], row[1]), row[2], row[3], row[4:] if row[4] is not None else None)
+            for row in result.all()
+        ]
+        return changes[:limit], len(changes) > limit
+
+    def _age_cutoff(self, seconds: float):
+        """Граница ``now() - seconds`` в часах и формате колонок времени (``deleted_at``, ``changed_at``)."""
+        if self.session.bind.dialect.name == "sqlite":
+            # CURRENT_TIMESTAMP в SQLite - UTC-строка того же формата, что и хранимые даты
+            return func.datetime("now", f"-{seconds} seconds")
+        # Даты - timestamp без зоны, заполняемые now() в зоне сессии
+        return func.localtimestamp() - literal(timedelta(seconds=seconds))
+
+    async def copy_many(self, rows: list[tuple[str, str, str]]) -> int:
+        """Быстро загружает пользователей без возврата созданных строк.
+
+        На PostgreSQL используется ``COPY`` через asyncpg, на остальных СУБД -
+        ``executemany``. Транзакция не фиксируется.
+
+        Args:
+            rows (list[tuple[str, str, str]]): Кортежи ``(name, surname, password)``.
+
+        Returns:
+            int: Количество загруженных строк.
+        """
+        if not rows:
+            return 0
+        if self.session.bind.dialect.name == "postgresql":
+            connection = await self.session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                User.__tablename__,
+                records=[(name, surname, password, name.casefold(), surname.casefold()) for name, surname, password in rows],
+                columns=["name", "surname", "password", "name_folded", "surname_folded"],
+            )
+        else:
+            await self.session.execute(
+                insert(User.__table__),
+                [{"name": name, "surname": surname, "password": password} for name, surname, password in rows],
+            )
+        return len(rows)
+
+    async def stream_rows(self, batch_size: int = 1000) -> AsyncIterator[list[Row]]:
+        """Читает всех пользователей пачками через серверный курсор.
+
+        Строки не загружаются в память целиком и не попадают в identity map:
+        одновременно в памяти находится только одна пачка.
+
+        Args:
+            batch_size (int, optional): Количество строк в пачке. По умолчанию 1000.
+
+        Yields:
+            list[Row]: Строки ``(id, name, surname, created_at, updated_at, version)`` в порядке id.
+        """
+        stmt = (
+            select(*USER_OUT_COLUMNS)
+            .where(ACTIVE)
+            .order_by(User.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
+
+    async def list_after(
+        self,
+        after: tuple[datetime, int] | None = None,
+        limit: int = 100,
+    ) -> tuple[list[Row], tuple[datetime, int] | None]:
+        """Получает страницу пользователей по курсору (keyset-пагинация).
+
+        В отличие от OFFSET, не пропускает строки, а продолжает чтение индекса
+        ``ix_user_created_at_id`` с позиции курсора, поэтому стоимость страницы
+        не зависит от ее глубины.
+
+        Args:
+            after (tuple[datetime, int] | None): Позиция ``(created_at, id)`` последнего
+                элемента предыдущей страницы. None - первая страница.
+            limit (int, optional): Количество пользователей на странице. По умолчанию 100.
+
+        Returns:
+            tuple[list[Row], tuple[datetime, int] | None]: Кортеж из:
+                - Строки ``USER_OUT_COLUMNS`` пользователей на текущей странице.
+                - Позиция для следующей страницы или None, если страница последняя.
+        """
+        stmt = select(*USER_OUT_COLUMNS).where(ACTIVE).order_by(User.created_at.desc(), User.id.desc())
+        if after is not None:
+            # Параметры типизируются по колонкам, чтобы дата сериализовалась в формате хранения
+            created_at, id = after
+            stmt = stmt.where(
+                tuple_(User.created_at, User.id)
+                < tuple_(literal(created_at, User.created_at.type), literal(id, User.id.type))
+            )
+
+        # Запрашиваем на одну строку больше, чтобы узнать, есть ли следующая страница
+        result = await self.session.execute(stmt.limit(limit + 1))
+        users = list(result.all())
+
+        if len(users) <= limit:
+            return users, None
+        users = users[:limit]
+        return users, (users[-1].created_at, users[-1].id)
+
+    async def search(
+        self,
+        query: str,
+        mode: str = "prefix",
+        fields: tuple[str, ...] = ("name", "surname"),
+        after_id: int | None = None,
+        limit: int = 50,
+    ) -> tuple[list[Row], int | None]:
+        """Ищет пользователей по началу или подстроке имени/фамилии без учета регистра.
+
+        Результаты упорядочены по id и читаются по курсору (последний id страницы).
+
+        Строка и колонки сравниваются после ``str.casefold()`` (колонки ``*_folded``),
+        поэтому регистр не учитывается и для не-ASCII имен.
+
+        - PostgreSQL: ``col_folded LIKE 'abc%'`` по индексу ``text_pattern_ops``,
+          ``col_folded LIKE '%abc%'`` по GIN-индексу pg_trgm.
+        - SQLite: от трех символов префикс ищется диапазоном по индексу
+          ``col_folded``, подстрока - в триграммной FTS5-таблице ``user_search``;
+          более короткие строки - обходом по id.
+
+        Args:
+            query (str): Строка поиска (непустая).
+            mode (str, optional): ``prefix`` или ``substring``. По умолчанию prefix.
+            fields (tuple[str, ...], optional): Колонки поиска. По умолчанию имя и фамилия.
+            after_id (int | None, optional): Последний id предыдущей страницы.
+            limit (int, optional): Количество пользователей на странице. По умолчанию 50.
+
+        Returns:
+            tuple[list[Row], int | None]: Строки ``USER_OUT_COLUMNS`` и id для
+                следующей страницы (None, если страница последняя).
+        """
+        query = query.casefold()
+        dialect = self.session.bind.dialect.name
+        columns = [User.__table__.c[f"{field}_folded"] for field in fields]
+
+        # Короткая строка совпадает с большой долей таблицы: обход по id с LIMIT
+        # дешевле, чем выбрать по индексу все совпадения и отсортировать их
+        indexed = len(query) >= TRIGRAM_MIN_LENGTH
+        after = User.id > after_id if after_id is not None else None
+        if mode == "prefix" and dialect == "sqlite" and indexed:
+            # LIKE по выражению SQLite индекс не использует, диапазон - использует
+            upper = query[:-1] + chr(ord(query[-1]) + 1)
+            condition = or_(*(and_(column >= query, column < upper) for column in columns))
+            if after_id is not None:
+                # "id + 0" не дает планировщику SQLite променять индекс поиска на обход по id
+                after = (User.id + 0) > after_id
+        elif mode == "substring" and dialect == "sqlite" and indexed:
+            # Фраза FTS5 из триграмм = вхождение подстроки; LIKE ... ESCAPE индекс не использует
+            phrase = '{%s}: "%s"' % (" ".join(column.name for column in columns), query.replace('"', '""'))
+            condition = User.id.in_(
+                select(text("rowid"))
+                .select_from(text(SQLITE_SEARCH_TABLE))
+                .where(text(f"{SQLITE_SEARCH_TABLE} MATCH :phrase").bindparams(phrase=phrase))
+            )
+        else:
+            pattern = f"{escape_like(query)}%" if mode == "prefix" else f"%{escape_like(query)}%"
+            condition = or_(*(column.like(pattern, escape="\\") for column in columns))
+
+        stmt = select(*USER_OUT_COLUMNS).where(condition, ACTIVE).order_by(User.id)
+        if after is not None:
+            stmt = stmt.where(after)
+
+        # Запрашиваем на одну строку больше, чтобы узнать, есть ли следующая страница
+        result = await self.session.execute(stmt.limit(limit + 1))
+        users = list(result.all())
+        if len(users) <= limit:
+            return users, None
+        users = users[:limit]
+        return users, users[-1].id
@@ -0,0 +1,14 @@
+import msgspec
+
+
+class LoginIn(msgspec.Struct):
+    """Данные для входа."""
+    user_id: int
+    password: str
+
+
+class TokenOut(msgspec.Struct):
+    """Выданный токен доступа (передается в заголовке ``Authorization: Bearer``)."""
+    access_token: str
+    expires_in: int
+    token_type: str = "bearer"
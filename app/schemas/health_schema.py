@@ -0,0 +1,16 @@
+from typing import Optional
+import msgspec
+
+
+class HealthOut(msgspec.Struct):
+    """Ответ проверки живости процесса."""
+    status: str
+
+
+class ReadinessOut(msgspec.Struct):
+    """Готовность принимать трафик: пул соединений прогрет."""
+    ready: bool
+    warmed_connections: int
+    attempts: int
+    startup_seconds: Optional[float] = None
+    error: Optional[str] = None
@@ -0,0 +1,41 @@
+from typing import Optional
+import msgspec
+
+
+class PoolWaitBucket(msgspec.Struct):
+    """Количество выдач соединения с ожиданием не дольше ``le`` секунд (накопительно)."""
+    le: float
+    count: int
+
+
+class PoolStats(msgspec.Struct):
+    """Состояние и счетчики пула соединений SQLAlchemy."""
+    pool_class: str
+    size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    checkins: int
+    timeouts: int
+    connections_created: int
+    connections_created_per_sec: float
+    wait_count: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+    wait_buckets: list[PoolWaitBucket]
+    uptime_seconds: float
+
+
+class AsyncpgPoolStats(msgspec.Struct):
+    """Состояние пула asyncpg (REPOSITORY_BACKEND=asyncpg)."""
+    size: int
+    idle: int
+    min_size: int
+    max_size: int
+
+
+class PoolMetricsOut(msgspec.Struct):
+    """Метрики пулов соединений приложения."""
+    sqlalchemy: PoolStats
+    asyncpg: Optional[AsyncpgPoolStats] = None
@@ -0,0 +1,138 @@
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Generic, List, Optional, TypeVar
+
+import msgspec
+
+T = TypeVar("T")
+
+
+@dataclass
+class OffsetPage(Generic[T]):
+    """Страница данных при пагинации по смещению.
+
+    Совместима по полям с ``OffsetPagination`` и дополнительно сообщает,
+    точное ли значение ``total``.
+    """
+
+    items: List[T]
+    """Элементы текущей страницы."""
+    limit: int
+    """Максимальное количество элементов на странице."""
+    offset: int
+    """Смещение от начала выборки."""
+    total: Optional[int]
+    """Общее количество элементов (None, если клиент отказался от подсчета)."""
+    total_exact: bool
+    """True, если ``total`` посчитан точно, а не оценен или взят из кеша."""
+
+
+@dataclass
+class CursorPage(Generic[T]):
+    """Страница данных при keyset-пагинации (по курсору)."""
+
+    items: List[T]
+    """Элементы текущей страницы."""
+    limit: int
+    """Максимальное количество элементов на странице."""
+    next_cursor: Optional[str]
+    """Непрозрачный курсор следующей страницы (None, если страница последняя)."""
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Кодирует позицию ``(created_at, id)`` в непрозрачный курсор.
+
+    Args:
+        created_at: Дата создания последнего элемента страницы.
+        id: Идентификатор последнего элемента страницы.
+
+    Returns:
+        str: Курсор в base64url без выравнивания.
+    """
+    raw = msgspec.json.encode((created_at, id))
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Декодирует курсор, полученный от клиента.
+
+    Args:
+        cursor: Курсор из :func:`encode_cursor`.
+
+    Returns:
+        tuple[datetime, int]: Позиция ``(created_at, id)``.
+
+    Raises:
+        ValueError: Если курсор поврежден.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return msgspec.json.decode(raw, type=tuple[datetime, int])
+    except (ValueError, msgspec.DecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def encode_id_cursor(id: int) -> str:
+    """Кодирует позицию по ``id`` в непрозрачный курсор (поиск, упорядоченный по id).
+
+    Args:
+        id: Идентификатор последнего элемента страницы.
+
+    Returns:
+        str: Курсор в base64url без выравнивания.
+    """
+    raw = msgspec.json.encode((id,))
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_id_cursor(cursor: str) -> int:
+    """Декодирует курсор из :func:`encode_id_cursor`.
+
+    Args:
+        cursor: Курсор, полученный от клиента.
+
+    Returns:
+        int: Идентификатор, после которого продолжается выборка.
+
+    Raises:
+        ValueError: Если курсор поврежден.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return msgspec.json.decode(raw, type=tuple[int])[0]
+    except (ValueError, msgspec.DecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def encode_change_cursor(txid: int, id: int) -> str:
+    """Кодирует позицию в ленте изменений ``(txid, id)`` в непрозрачный курсор.
+
+    Args:
+        txid: Номер транзакции последнего изменения (0 вне PostgreSQL).
+        id: Номер последнего изменения в журнале.
+
+    Returns:
+        str: Курсор в base64url без выравнивания.
+    """
+    raw = msgspec.json.encode((txid, id))
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_change_cursor(cursor: str) -> tuple[int, int]:
+    """Декодирует курсор из :func:`encode_change_cursor`.
+
+    Args:
+        cursor: Курсор, полученный от клиента.
+
+    Returns:
+        tuple[int, int]: Позиция ``(txid, id)``, после которой продолжается лента.
+
+    Raises:
+        ValueError: Если курсор поврежден.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return msgspec.json.decode(raw, type=tuple[int, int])
+    except (ValueError, msgspec.DecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
@@ -26,6 +26,100 @@ class UserOut(msgspec.Struct):
     surname: str
     created_at: datetime
     updated_at: datetime
+    version: int = 0
+    """Версия данных: увеличивается при каждом изменении пользователя."""
+
+
+class BulkCreateItem(msgspec.Struct):
+    """Результат создания одного пользователя в пакетном запросе."""
+    index: int
+    user: Optional[UserOut] = None
+    error: Optional[str] = None
+
+
+class BulkCreateResult(msgspec.Struct):
+    """Результат пакетного создания пользователей (в порядке запроса)."""
+    items: list[BulkCreateItem]
+    created: int
+    failed: int
+
+
+class ImportLineError(msgspec.Struct):
+    """Ошибка в строке файла импорта."""
+    line: int
+    error: str
+
+
+class ImportReport(msgspec.Struct):
+    """Итоги импорта пользователей."""
+    received: int = 0
+    imported: int = 0
+    failed: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    errors: list[ImportLineError] = msgspec.field(default_factory=list)
+
+
+class UserBatchRequest(msgspec.Struct):
+    """Запрос пакетного получения пользователей по ID."""
+    ids: list[int]
+
+
+class UserBatchItem(msgspec.Struct):
+    """Пользователь из пакетного запроса; ``user`` равен None, если ID не найден."""
+    id: int
+    user: Optional[UserOut] = None
+
+
+class UserBatchResult(msgspec.Struct):
+    """Результат пакетного получения пользователей (в порядке запроса)."""
+    items: list[UserBatchItem]
+    found: int
+    missing: list[int]
+
+
+class UserDeleteFilter(msgspec.Struct):
+    """Фильтр пакетного удаления: заданные условия объединяются через AND."""
+    created_before: Optional[datetime] = None
+    """Созданы раньше (время без зоны, как в БД)."""
+    updated_before: Optional[datetime] = None
+    """Не изменялись с этого времени (без зоны)."""
+    name: Optional[str] = None
+    surname: Optional[str] = None
+
+
+class UserBulkDelete(msgspec.Struct):
+    """Запрос пакетного удаления: список ID или фильтр (ровно одно из двух)."""
+    ids: Optional[list[int]] = None
+    filter: Optional[UserDeleteFilter] = None
+
+
+class BulkDeleteResult(msgspec.Struct):
+    """Результат пакетного удаления пользователей."""
+    deleted: int
+    chunks: int
+    """Выполненных порций (каждая - отдельная транзакция)."""
+    soft: bool
+    """Пользователи помечены удаленными (``USER_SOFT_DELETE``), а не удалены."""
+    missing: list[int] = msgspec.field(default_factory=list)
+    """ID из запроса, которых нет или которые уже удалены."""
+
+
+class UserChange(msgspec.Struct):
+    """Изменение в ленте: пользователь создан/обновлен или удален (``user`` равен None)."""
+    id: int
+    changed_at: datetime
+    deleted: bool = False
+    user: Optional[UserOut] = None
+
+
+class ChangeFeedPage(msgspec.Struct):
+    """Страница ленты изменений в порядке журнала ``(txid, id)``."""
+    items: list[UserChange]
+    next_cursor: Optional[str]
+    """Водяной знак для следующего запроса (прежний, если изменений нет)."""
+    has_more: bool
+    """Есть ли уже доступные изменения после этой страницы."""
 
 
 class UserCreateDTO(MsgspecDTO[UserCreate]):
@@ -0,0 +1,127 @@
+"""Production-запуск приложения на granian.
+
+Каждый воркер - отдельный процесс со своим event loop, пулом соединений и
+кешами; всего соединений с БД до ``SERVER_WORKERS * (DATABASE_POOL_SIZE +
+DATABASE_MAX_OVERFLOW)``. Воркер начинает принимать запросы после
+on_startup, то есть после прогрева пула (``DATABASE_POOL_WARMUP_WAIT``, по
+умолчанию здесь ``WARMUP_WAIT`` секунд). По SIGTERM/SIGINT воркеры перестают
+принимать соединения, дорабатывают начатые запросы (не дольше
+``SERVER_GRACEFUL_TIMEOUT``) и выполняют on_shutdown: пулы и фоновые задачи
+закрываются.
+
+Кеш пользователей, пробуждение long-poll ленты изменений, контроль допуска,
+пакетное создание, кеш количества и фоновая очистка живут в воркере, поэтому
+при ``SERVER_WORKERS`` > 1 сервер предупреждает об этом при запуске (см.
+:func:`per_process_state`). Без ``AUTH_TOKEN_SECRET`` каждый воркер подписывал
+бы токены своим случайным ключом, поэтому несколько воркеров без него не
+запускаются.
+
+Примеры::
+
+    python -m app.server
+    SERVER_WORKERS=4 SERVER_HTTP=1 python -m app.server
+"""
+import logging
+import os
+
+from granian import Granian
+from granian.constants import HTTPModes, Interfaces, Loops
+from granian.http import HTTP1Settings, HTTP2Settings
+
+from app.config import settings
+from app.repositories.count_strategy import CachedCount, user_count_strategy
+from app.services.cache import MemoryCacheBackend, user_cache
+
+logger = logging.getLogger(__name__)
+
+# Ожидание прогрева пула при старте воркера, если DATABASE_POOL_WARMUP_WAIT не задан, секунды
+WARMUP_WAIT = 30.0
+
+
+def per_process_state() -> list[str]:
+    """Состояние в памяти воркера, которое расходится между несколькими воркерами.
+
+    Returns:
+        list[str]: Описания расхождений; пусто, если общих хранилищ хватает.
+    """
+    state = []
+    if user_cache.enabled and isinstance(user_cache.backend, MemoryCacheBackend):
+        state.append(
+            f"user cache: other workers may serve a stale user for up to USER_CACHE_TTL={settings.USER_CACHE_TTL}s"
+        )
+    state.append(
+        "change feed: long-polls wake on writes of their own worker only, "
+        f"others every CHANGE_FEED_POLL_INTERVAL={settings.CHANGE_FEED_POLL_INTERVAL}s"
+    )
+    if settings.ADMISSION_ENABLED:
+        state.append("admission: concurrency budgets and rate limits are per worker")
+    if settings.CREATE_BATCHING_ENABLED:
+        state.append(
+            "create batching: each worker batches only its own requests, "
+            f"up to CREATE_BATCH_MAX_SIZE={settings.CREATE_BATCH_MAX_SIZE} per worker"
+        )
+    if isinstance(user_count_strategy, CachedCount):
+        state.append(
+            "user count: each worker caches its own total "
+            f"for up to USER_COUNT_CACHE_TTL={settings.USER_COUNT_CACHE_TTL}s"
+        )
+    if settings.PURGE_INTERVAL > 0 and (settings.USER_SOFT_DELETE or settings.CHANGE_FEED_RETENTION > 0):
+        state.append(
+            f"purge: every worker runs its own purge every PURGE_INTERVAL={settings.PURGE_INTERVAL}s"
+        )
+    return state
+
+
+def build_server(workers: int | None = None) -> Granian:
+    """Создает сервер granian по настройкам ``SERVER_*``.
+
+    Args:
+        workers: Количество воркеров. По умолчанию ``SERVER_WORKERS``.
+
+    Returns:
+        Granian: Сервер, запускаемый ``serve()``.
+
+    Raises:
+        RuntimeError: Если воркеров больше одного, а ``AUTH_TOKEN_SECRET`` не задан.
+    """
+    workers = workers or settings.SERVER_WORKERS
+    if workers > 1 and not settings.AUTH_TOKEN_SECRET:
+        logger.error("AUTH_TOKEN_SECRET is not set: each of %s workers would sign tokens with its own key", workers)
+        raise RuntimeError("AUTH_TOKEN_SECRET must be set when running more than one worker")
+    if workers > 1:
+        for state in per_process_state():
+            logger.warning("%s workers do not share in-process state: %s", workers, state)
+    keep_alive_interval = settings.SERVER_HTTP2_KEEP_ALIVE_INTERVAL
+    return Granian(
+        "app.asgi:create_app",
+        factory=True,
+        interface=Interfaces.ASGI,
+        address=settings.APP_HOST,
+        port=int(settings.APP_PORT),
+        workers=workers,
+        runtime_threads=settings.SERVER_THREADS,
+        loop=Loops(settings.SERVER_LOOP),
+        http=HTTPModes(settings.SERVER_HTTP),
+        http1_settings=HTTP1Settings(keep_alive=settings.SERVER_KEEP_ALIVE),
+        http2_settings=HTTP2Settings(
+            # granian ожидает миллисекунды
+            keep_alive_interval=int(keep_alive_interval * 1000) if keep_alive_interval > 0 else None,
+        ),
+        backlog=settings.SERVER_BACKLOG,
+        websockets=False,
+        log_access=settings.SERVER_ACCESS_LOG,
+        workers_kill_timeout=settings.SERVER_GRACEFUL_TIMEOUT,
+        respawn_failed_workers=True,
+    )
+
+
+def main() -> None:
+    if "DATABASE_POOL_WARMUP_WAIT" not in os.environ:
+        # Воркеры наследуют настройки при fork и читают окружение заново при spawn
+        os.environ["DATABASE_POOL_WARMUP_WAIT"] = str(WARMUP_WAIT)
+        settings.DATABASE_POOL_WARMUP_WAIT = WARMUP_WAIT
+    build_server().serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Callable
+
+import msgspec
+from litestar.status_codes import HTTP_429_TOO_MANY_REQUESTS, HTTP_503_SERVICE_UNAVAILABLE
+
+from app.config import settings
+from app.db.pool_metrics import pool_metrics
+from app.services.metrics import MetricsWriter, register
+
+# Классы запросов со своими бюджетами
+READ = "read"
+WRITE = "write"
+WATCH = "watch"
+
+
+class AdmissionStats(msgspec.Struct):
+    """Счетчики контроля допуска."""
+    admitted: int = 0
+    """Допущенных запросов."""
+    rejected_concurrency: int = 0
+    """Отклонено: исчерпан бюджет одновременных запросов класса."""
+    rejected_pool: int = 0
+    """Отклонено: пул соединений перегружен."""
+    rate_limited: int = 0
+    """Отклонено ограничением частоты клиента."""
+
+
+class Rejection(msgspec.Struct):
+    """Отказ в допуске: ответ, который получит клиент."""
+    status: int
+    retry_after: int
+    detail: str
+
+
+class AdmissionController:
+    """Контроль допуска и сброс нагрузки перед выполнением запроса.
+
+    Запрос отклоняется сразу, а не ждет в очереди к БД, если:
+
+    - клиент превысил свою частоту (token bucket) - 429;
+    - в работе уже ``max_reads`` чтений, ``max_writes`` записей или
+      ``max_watchers`` ожидающих ленту изменений - 503;
+    - запросов в работе не меньше, чем соединений в пуле, и ожидание
+      соединения превысит ``max_pool_wait`` - 503. Ожидание - большее из
+      фактического (недавнее среднее или самое долгое текущее) и ожидаемого
+      для нового запроса: лишние запросы сверх пула, деленные на размер пула,
+      умноженные на среднее время удержания соединения. Ожидающие ленту
+      изменений (long-poll) почти все время не держат соединение и пул не
+      нагружают.
+
+    В ответе есть ``Retry-After``. Ожидание пула измеряется только для
+    SQLAlchemy (``pool_metrics``); с asyncpg действуют остальные ограничения.
+
+    Работает в одном event loop, поэтому блокировки не нужны.
+    """
+
+    def __init__(
+        self,
+        max_reads: int = 256,
+        max_writes: int = 64,
+        max_watchers: int = 1000,
+        max_pool_wait: float = 0.25,
+        pool_capacity: int = 20,
+        rate: float = 0.0,
+        burst: int = 50,
+        max_clients: int = 10000,
+        retry_after: int = 1,
+        pool_wait: Callable[[], float] = pool_metrics.pressure_seconds,
+        pool_hold: Callable[[], float] = lambda: pool_metrics.recent_hold_seconds,
+    ):
+        """Инициализация.
+
+        Args:
+            max_reads: Максимум одновременных чтений (0 - без ограничения).
+            max_writes: Максимум одновременных записей (0 - без ограничения).
+            max_watchers: Максимум одновременных long-poll запросов ленты изменений (0 - без ограничения).
+            max_pool_wait: Порог недавнего ожидания соединения, секунды (0 - не учитывать).
+            pool_capacity: Соединений в пуле (с переполнением).
+            rate: Запросов в секунду на клиента (0 - без ограничения).
+            burst: Размер всплеска запросов клиента.
+            max_clients: Сколько клиентов помнить (самые давние забываются).
+            retry_after: ``Retry-After`` при перегрузке, секунды.
+            pool_wait: Источник давления на пул (секунды ожидания соединения).
+            pool_hold: Источник среднего времени удержания соединения, секунды.
+        """
+        self.limits = {READ: max_reads, WRITE: max_writes, WATCH: max_watchers}
+        self.max_pool_wait = max_pool_wait
+        self.pool_capacity = pool_capacity
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.retry_after = retry_after
+        self.pool_wait = pool_wait
+        self.pool_hold = pool_hold
+        self.in_flight = {READ: 0, WRITE: 0, WATCH: 0}
+        self.stats = AdmissionStats()
+        # Клиент -> [токены, время обновления]; порядок - давность обращения
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    def admit(self, kind: str, client: str) -> Rejection | None:
+        """Решает, допустить ли запрос; допущенный учитывается в работе до :meth:`release`.
+
+        Args:
+            kind: Класс запроса (``read``, ``write`` или ``watch``).
+            client: Ключ клиента для ограничения частоты.
+
+        Returns:
+            Rejection | None: Отказ или None, если запрос допущен.
+        """
+        if self.rate > 0:
+            wait = self._take_token(client)
+            if wait > 0:
+                self.stats.rate_limited += 1
+                return Rejection(HTTP_429_TOO_MANY_REQUESTS, math.ceil(wait), "Too many requests")
+
+        limit = self.limits[kind]
+        if limit and self.in_flight[kind] >= limit:
+            self.stats.rejected_concurrency += 1
+            return Rejection(HTTP_503_SERVICE_UNAVAILABLE, self.retry_after, "Server is busy")
+
+        in_flight = self.in_flight[READ] + self.in_flight[WRITE]
+        if kind != WATCH and self.max_pool_wait > 0 and in_flight >= self.pool_capacity:
+            queued = in_flight - self.pool_capacity + 1
+            expected_wait = queued / max(self.pool_capacity, 1) * self.pool_hold()
+            pool_wait = max(self.pool_wait(), expected_wait)
+            if pool_wait > self.max_pool_wait:
+                self.stats.rejected_pool += 1
+                retry_after = max(self.retry_after, math.ceil(pool_wait))
+                return Rejection(HTTP_503_SERVICE_UNAVAILABLE, retry_after, "Database is overloaded")
+
+        self.in_flight[kind] += 1
+        self.stats.admitted += 1
+        return None
+
+    def release(self, kind: str) -> None:
+        """Отмечает завершение допущенного запроса."""
+        self.in_flight[kind] -= 1
+
+    def _take_token(self, client: str) -> float:
+        """Берет токен из корзины клиента; возвращает 0 или секунды до следующего токена."""
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = [float(self.burst), now]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.rate
+
+
+admission_controller = AdmissionController(
+    max_reads=settings.ADMISSION_MAX_READS,
+    max_writes=settings.ADMISSION_MAX_WRITES,
+    max_watchers=settings.ADMISSION_MAX_WATCHERS,
+    max_pool_wait=settings.ADMISSION_MAX_POOL_WAIT,
+    pool_capacity=settings.DATABASE_POOL_SIZE + settings.DATABASE_MAX_OVERFLOW,
+    rate=settings.ADMISSION_RATE_LIMIT,
+    burst=settings.ADMISSION_RATE_BURST,
+    max_clients=settings.ADMISSION_MAX_CLIENTS,
+    retry_after=settings.ADMISSION_RETRY_AFTER,
+)
+
+
+@register
+def _collect_admission_metrics(writer: MetricsWriter) -> None:
+    admission = admission_controller.stats
+    for name, value, help_text in (
+        ("admission_admitted_total", admission.admitted, "Requests admitted."),
+        ("admission_rejected_concurrency_total", admission.rejected_concurrency, "Requests shed: in-flight budget exhausted."),
+        ("admission_rejected_pool_total", admission.rejected_pool, "Requests shed: connection pool overloaded."),
+        ("admission_rate_limited_total", admission.rate_limited, "Requests rejected by the per-client rate limit."),
+    ):
+        writer.metric(name, "counter", help_text, value)
+    writer.header("admission_in_flight", "gauge", "Admitted requests in flight by class.")
+    for kind, value in admission_controller.in_flight.items():
+        writer.sample("admission_in_flight", value, **{"class": kind})
@@ -0,0 +1,180 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import msgspec
+
+from app.config import settings
+from app.schemas.user_schema import UserOut
+from app.services.metrics import MetricsWriter, register
+
+
+class CacheStats(msgspec.Struct):
+    """Счетчики кеша для подбора его размера."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+
+
+class CacheBackend(ABC):
+    """Хранилище кеша: ключ -> закодированные байты.
+
+    Реализация в памяти используется по умолчанию и в тестах; общее хранилище
+    (например, Redis) подключается отдельной реализацией этого интерфейса.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Возвращает значение или None, если ключа нет или он устарел."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Сохраняет значение на ``ttl`` секунд."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Удаляет значение."""
+
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        """Возвращает текущие счетчики."""
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        """Возвращает значения для списка ключей (общие хранилища делают это одним запросом)."""
+        return [await self.get(key) for key in keys]
+
+    async def set_many(self, items: dict[str, bytes], ttl: float) -> None:
+        """Сохраняет несколько значений на ``ttl`` секунд."""
+        for key, value in items.items():
+            await self.set(key, value, ttl)
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Кеш в памяти процесса с LRU-вытеснением и TTL.
+
+    Работает в одном event loop, поэтому блокировки не нужны.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        """Инициализация кеша.
+
+        Args:
+            max_size: Максимальное количество записей.
+        """
+        self.max_size = max_size
+        self._data: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._stats = CacheStats()
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self._stats.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self._stats.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self._stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self._stats.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def stats(self) -> CacheStats:
+        self._stats.size = len(self._data)
+        return self._stats
+
+
+class UserCache:
+    """Read-through кеш пользователей по ID.
+
+    Хранит ``UserOut`` в виде готового msgspec JSON. Записи инвалидируются
+    сервисом при обновлении и удалении; изменения из других воркеров при
+    кеше в памяти становятся видны не позже чем через ``ttl`` секунд.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = 60.0, enabled: bool = True):
+        """Инициализация кеша.
+
+        Args:
+            backend: Хранилище кеша.
+            ttl: Время жизни записи в секундах.
+            enabled: Если False, кеш всегда промахивается и ничего не хранит.
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder(UserOut)
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"user:{user_id}"
+
+    async def get(self, user_id: int) -> UserOut | None:
+        """Возвращает пользователя из кеша или None."""
+        if not self.enabled:
+            return None
+        raw = await self.backend.get(self._key(user_id))
+        return self._decoder.decode(raw) if raw is not None else None
+
+    async def set(self, user: UserOut) -> None:
+        """Сохраняет пользователя в кеш."""
+        if self.enabled:
+            await self.backend.set(self._key(user.id), self._encoder.encode(user), self.ttl)
+
+    async def get_many(self, user_ids: list[int]) -> dict[int, UserOut]:
+        """Возвращает найденных в кеше пользователей по ID."""
+        if not self.enabled or not user_ids:
+            return {}
+        values = await self.backend.get_many([self._key(user_id) for user_id in user_ids])
+        return {
+            user_id: self._decoder.decode(raw)
+            for user_id, raw in zip(user_ids, values)
+            if raw is not None
+        }
+
+    async def set_many(self, users: list[UserOut]) -> None:
+        """Сохраняет пользователей в кеш."""
+        if self.enabled and users:
+            await self.backend.set_many(
+                {self._key(user.id): self._encoder.encode(user) for user in users}, self.ttl
+            )
+
+    async def invalidate(self, user_id: int) -> None:
+        """Удаляет пользователя из кеша."""
+        if self.enabled:
+            await self.backend.delete(self._key(user_id))
+
+    def stats(self) -> CacheStats:
+        """Возвращает счетчики попаданий, промахов и вытеснений."""
+        return self.backend.stats()
+
+
+user_cache = UserCache(
+    backend=MemoryCacheBackend(max_size=settings.USER_CACHE_MAX_SIZE),
+    ttl=settings.USER_CACHE_TTL,
+    enabled=settings.USER_CACHE_ENABLED,
+)
+
+
+@register
+def _collect_cache_metrics(writer: MetricsWriter) -> None:
+    cache = user_cache.stats()
+    for name, kind, value, help_text in (
+        ("user_cache_hits_total", "counter", cache.hits, "User cache hits."),
+        ("user_cache_misses_total", "counter", cache.misses, "User cache misses."),
+        ("user_cache_evictions_total", "counter", cache.evictions, "User cache evictions."),
+        ("user_cache_size", "gauge", cache.size, "Entries in the user cache."),
+    ):
+        writer.metric(name, kind, help_text, value)
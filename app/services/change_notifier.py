@@ -0,0 +1,56 @@
+import asyncio
+
+from app.services.metrics import MetricsWriter, register
+
+
+class ChangeNotifier:
+    """Пробуждение long-poll запросов ленты изменений после записей.
+
+    :meth:`notify` будит все ожидающие в этом процессе вызовы :meth:`wait`.
+    Записи других воркеров сюда не доходят, поэтому ожидающие дополнительно
+    перепроверяют ленту с периодом ``CHANGE_FEED_POLL_INTERVAL``.
+
+    Работает в одном event loop, поэтому блокировки не нужны.
+    """
+
+    def __init__(self):
+        self._waiters: set[asyncio.Future] = set()
+
+    def notify(self) -> None:
+        """Будит все ожидающие вызовы."""
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+
+    async def wait(self, timeout: float) -> bool:
+        """Ждет следующей записи не дольше ``timeout`` секунд.
+
+        Args:
+            timeout: Максимальное ожидание, секунды.
+
+        Returns:
+            bool: True, если была запись, False по таймауту.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except TimeoutError:
+            return False
+        finally:
+            self._waiters.discard(waiter)
+
+    @property
+    def waiting(self) -> int:
+        """Количество ожидающих вызовов."""
+        return len(self._waiters)
+
+
+change_notifier = ChangeNotifier()
+
+
+@register
+def _collect_change_notifier_metrics(writer: MetricsWriter) -> None:
+    writer.metric("change_feed_waiters", "gauge", "Change feed long-polls waiting for a write.", change_notifier.waiting)
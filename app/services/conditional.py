@@ -0,0 +1,101 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable
+
+from app.schemas.user_schema import UserOut
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Приводит дату к UTC; даты без зоны из БД считаются UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def make_etag(*parts: object) -> str:
+    """Строит сильный ETag из частей версии ресурса.
+
+    Args:
+        *parts: Значения, от которых зависит представление ресурса.
+
+    Returns:
+        str: ETag в кавычках, например ``"3f2a..."``.
+    """
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode("utf-8"), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def user_etag(user_id: int, version: int) -> str:
+    """ETag пользователя из его версии.
+
+    Версия увеличивается при каждом изменении, поэтому ETag проверяется по
+    одной колонке, без чтения и кодирования пользователя. ``updated_at`` не
+    подходит: в SQLite он хранится с точностью до секунды, и два изменения
+    за секунду дали бы один ETag.
+    """
+    return make_etag(user_id, version)
+
+
+def page_etag(items: Iterable[UserOut], total: int | None = None) -> str:
+    """ETag страницы пользователей: id и версии элементов в порядке выдачи
+    (плюс общее количество, если оно есть в ответе).
+
+    Last-Modified у страниц нет: удаление строки со страницы или сдвиг
+    страницы не меняют максимальный ``updated_at``.
+
+    Args:
+        items: Пользователи на странице.
+        total: Общее количество из ответа или None.
+
+    Returns:
+        str: ETag страницы.
+    """
+    return make_etag(*(f"{item.id}:{item.version}" for item in items), total)
+
+
+def http_date(value: datetime) -> str:
+    """Форматирует дату для заголовка Last-Modified."""
+    return format_datetime(_as_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def validator_headers(etag: str, last_modified: datetime | None) -> dict[str, str]:
+    """Заголовки ETag и Last-Modified для ответа."""
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def is_not_modified(
+    if_none_match: str | None,
+    if_modified_since: str | None,
+    etag: str,
+    last_modified: datetime | None,
+) -> bool:
+    """Проверяет условия ``If-None-Match`` / ``If-Modified-Since`` (RFC 9110).
+
+    ``If-None-Match`` сравнивается слабым сравнением и, если передан, имеет
+    приоритет; ``If-Modified-Since`` учитывается только без него.
+
+    Args:
+        if_none_match: Значение заголовка If-None-Match.
+        if_modified_since: Значение заголовка If-Modified-Since.
+        etag: Текущий ETag ресурса.
+        last_modified: Текущая дата изменения ресурса.
+
+    Returns:
+        bool: True, если можно ответить 304 Not Modified.
+    """
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # HTTP-даты имеют точность до секунды
+    return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
@@ -0,0 +1,222 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Границы гистограмм длительности, секунды
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Границы гистограммы количества запросов к БД на HTTP-запрос
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами в формате Prometheus.
+
+    Все счетчики - обычные числа: метрики изменяются только из event loop
+    своего воркера, поэтому блокировки не нужны, а каждый процесс отдает
+    собственные значения (суммирование по воркерам - на стороне Prometheus).
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        # Последний элемент - значения больше buckets[-1] (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestStats:
+    """Время и количество запросов к БД в рамках одного HTTP-запроса."""
+
+    __slots__ = ("db_seconds", "db_queries")
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.db_queries = 0
+
+
+class RouteMetrics:
+    """Метрики одного маршрута (метод + шаблон пути)."""
+
+    __slots__ = ("duration", "db_seconds", "db_queries", "in_flight", "statuses")
+
+    def __init__(self):
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.db_seconds = Histogram(DURATION_BUCKETS)
+        self.db_queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.in_flight = 0
+        self.statuses: dict[int, int] = {}
+
+    def observe(self, seconds: float, status: int, stats: RequestStats) -> None:
+        """Учитывает завершенный запрос."""
+        self.duration.observe(seconds)
+        self.db_seconds.observe(stats.db_seconds)
+        self.db_queries.observe(stats.db_queries)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+
+# Статистика текущего HTTP-запроса; None вне запроса (CLI, фоновые задачи)
+current_request_stats: ContextVar[RequestStats | None] = ContextVar("current_request_stats", default=None)
+
+
+class MetricsWriter:
+    """Текст метрик в формате Prometheus, который дополняют коллекторы."""
+
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def header(self, name: str, kind: str, help_text: str) -> None:
+        """Добавляет ``# HELP`` и ``# TYPE`` метрики (один раз перед ее значениями)."""
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value: object, **labels: object) -> None:
+        """Добавляет значение метрики с метками."""
+        self.lines.append(f"{name}{_labels(**labels) if labels else ''} {value}")
+
+    def metric(self, name: str, kind: str, help_text: str, value: object) -> None:
+        """Добавляет метрику без меток: заголовок и единственное значение."""
+        self.header(name, kind, help_text)
+        self.sample(name, value)
+
+    def histogram(self, name: str, histogram: Histogram, **labels: object) -> None:
+        """Добавляет значения гистограммы (заголовок - отдельно, общий для всех меток)."""
+        cumulative = 0
+        for le, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            self.sample(f"{name}_bucket", cumulative, **labels, le=le)
+        self.sample(f"{name}_bucket", histogram.count, **labels, le="+Inf")
+        self.lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+        self.lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+# Коллектор дописывает метрики своей подсистемы при каждом запросе /metrics
+Collector = Callable[[MetricsWriter], None]
+_collectors: list[Collector] = []
+
+
+def register(collector: Collector) -> Collector:
+    """Регистрирует коллектор метрик подсистемы (можно как декоратор).
+
+    Подсистема (кеш, пул, контроль допуска и т. д.) регистрирует коллектор
+    рядом со своими счетчиками, и ``/metrics`` выводит их без изменений в
+    этом модуле. Коллекторы вызываются в порядке регистрации.
+
+    Args:
+        collector: Функция, дописывающая метрики в ``MetricsWriter``.
+
+    Returns:
+        Collector: Тот же коллектор.
+    """
+    _collectors.append(collector)
+    return collector
+
+
+class RequestMetrics:
+    """Реестр метрик HTTP-запросов по маршрутам."""
+
+    def __init__(self):
+        self.routes: dict[tuple[str, str], RouteMetrics] = {}
+
+    def route(self, method: str, path_template: str) -> RouteMetrics:
+        """Возвращает (и при необходимости создает) метрики маршрута.
+
+        Args:
+            method: HTTP-метод.
+            path_template: Шаблон пути маршрута, например ``/api/v1/users/{user_id:int}``.
+
+        Returns:
+            RouteMetrics: Метрики маршрута.
+        """
+        key = (method, path_template)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            metrics = self.routes[key] = RouteMetrics()
+        return metrics
+
+    def render(self) -> str:
+        """Формирует метрики HTTP-запросов и всех зарегистрированных коллекторов
+        в текстовом формате Prometheus.
+
+        Returns:
+            str: Текст для ответа ``/metrics``.
+        """
+        writer = MetricsWriter()
+        routes = sorted(self.routes.items())
+
+        writer.header("http_requests_total", "counter", "HTTP requests by route and status.")
+        for (method, path), metrics in routes:
+            for status, count in sorted(metrics.statuses.items()):
+                writer.sample("http_requests_total", count, method=method, route=path, status=status)
+
+        writer.header("http_requests_in_flight", "gauge", "HTTP requests currently being processed.")
+        for (method, path), metrics in routes:
+            writer.sample("http_requests_in_flight", metrics.in_flight, method=method, route=path)
+
+        for name, attr, help_text in (
+            ("http_request_duration_seconds", "duration", "HTTP request latency."),
+            ("http_request_db_seconds", "db_seconds", "Database time per HTTP request."),
+            ("http_request_db_queries", "db_queries", "Database queries per HTTP request."),
+        ):
+            writer.header(name, "histogram", help_text)
+            for (method, path), metrics in routes:
+                writer.histogram(name, getattr(metrics, attr), method=method, route=path)
+
+        for collector in _collectors:
+            collector(writer)
+        return writer.text()
+
+
+request_metrics = RequestMetrics()
+
+
+def _labels(**labels: object) -> str:
+    """Форматирует метки Prometheus с экранированием значений."""
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if current_request_stats.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = current_request_stats.get()
+    if stats is not None and conn.info.get("query_started_at"):
+        stats.db_seconds += time.perf_counter() - conn.info["query_started_at"].pop()
+        stats.db_queries += 1
+
+
+def _handle_error(context) -> None:
+    # after_cursor_execute не вызывается для упавшего запроса
+    started = context.connection.info.get("query_started_at") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def attach_query_metrics(engine: AsyncEngine) -> None:
+    """Подписывается на выполнение запросов движка для учета времени БД в HTTP-запросе.
+
+    Args:
+        engine: Асинхронный движок SQLAlchemy.
+    """
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
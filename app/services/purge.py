@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from typing import AsyncContextManager, Callable
+
+import msgspec
+
+from app.repositories.contract import UserRepositoryContract
+from app.services.metrics import MetricsWriter, register
+
+logger = logging.getLogger(__name__)
+
+
+class PurgeStats(msgspec.Struct):
+    """Счетчики очистки помеченных удаленными пользователей и журнала изменений."""
+    runs: int = 0
+    """Завершенных проходов очистки."""
+    purged: int = 0
+    """Окончательно удаленных пользователей."""
+    changes_purged: int = 0
+    """Удаленных записей журнала изменений."""
+    errors: int = 0
+    """Проходов, завершившихся ошибкой."""
+
+
+# Счетчики процесса для /metrics
+purge_stats = PurgeStats()
+
+
+@register
+def _collect_purge_metrics(writer: MetricsWriter) -> None:
+    for name, value, help_text in (
+        ("purge_runs_total", purge_stats.runs, "Completed purges of soft-deleted users."),
+        ("purge_deleted_total", purge_stats.purged, "Soft-deleted users removed by the purge."),
+        ("purge_changes_deleted_total", purge_stats.changes_purged, "Change log entries removed by the purge."),
+        ("purge_errors_total", purge_stats.errors, "Purges that failed."),
+    ):
+        writer.metric(name, "counter", help_text, value)
+
+
+class PurgeJob:
+    """Фоновая очистка пользователей, помеченных удаленными (``USER_SOFT_DELETE``),
+    и журнала изменений.
+
+    Каждые ``interval`` секунд окончательно удаляет пользователей, помеченных
+    дольше ``older_than`` секунд назад, и записи журнала изменений старше
+    ``change_retention`` секунд (см. ``purge_changes`` репозитория) порциями
+    по ``chunk_size`` строк: каждая порция - отдельное соединение и короткая
+    транзакция. Удаления для ленты изменений записаны при мягком удалении.
+
+    При нескольких воркерах очистку выполняет каждый: одновременные проходы
+    удаляют каждую строку один раз, остальные ее уже не находят.
+    """
+
+    def __init__(
+        self,
+        repository_context: Callable[[], AsyncContextManager[UserRepositoryContract]],
+        older_than: float | None,
+        interval: float = 3600.0,
+        chunk_size: int = 1000,
+        stats: PurgeStats | None = None,
+        change_retention: float = 0.0,
+    ):
+        """Инициализация.
+
+        Args:
+            repository_context: Открывает репозиторий с собственным соединением.
+            older_than: Минимальный возраст пометки, секунды. None - пользователей не удалять.
+            interval: Пауза между проходами, секунды.
+            chunk_size: Строк в одной транзакции.
+            stats: Счетчики. По умолчанию общие счетчики процесса.
+            change_retention: Минимальный возраст удаляемых записей журнала
+                изменений, секунды. 0 - журнал не очищать.
+        """
+        self.repository_context = repository_context
+        self.older_than = older_than
+        self.change_retention = change_retention
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.stats = stats if stats is not None else purge_stats
+        self._task: asyncio.Task | None = None
+
+    async def run_once(self) -> int:
+        """Один проход очистки: порции удаляются, пока находятся строки.
+
+        Returns:
+            int: Количество окончательно удаленных пользователей.
+        """
+        purged = 0
+        while self.older_than is not None:
+            async with self.repository_context() as repository:
+                count = await repository.purge_deleted(self.older_than, self.chunk_size)
+                await repository.commit()
+            purged += count
+            self.stats.purged += count
+            if count < self.chunk_size:
+                break
+        if self.change_retention > 0:
+            await self._purge_changes()
+        self.stats.runs += 1
+        return purged
+
+    async def _purge_changes(self) -> None:
+        after_id = None
+        while True:
+            async with self.repository_context() as repository:
+                count, after_id = await repository.purge_changes(self.change_retention, after_id, self.chunk_size)
+                await repository.commit()
+            self.stats.changes_purged += count
+            if after_id is None:
+                break
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                purged = await self.run_once()
+                if purged:
+                    logger.info("Purged %s deleted users", purged)
+            except Exception:
+                self.stats.errors += 1
+                logger.exception("Purge of deleted users failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Запускает периодическую очистку в фоне текущего event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает фоновую очистку (незафиксированная порция откатывается)."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
@@ -1,13 +1,299 @@
+import asyncio
 import hashlib
+import hmac
 import secrets
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, TypeVar
 
-def hash_password(password: str, salt: bytes = None) -> str:
-    """Генерация безопасного хеша пароля"""
+from litestar.exceptions import ServiceUnavailableException
+
+from app.config import settings
+
+PBKDF2_ALGORITHM = "pbkdf2_sha256"
+SCRYPT_ALGORITHM = "scrypt"
+# Прежний формат ``<salt>:<hash>``: PBKDF2-SHA256 с фиксированным числом итераций
+LEGACY_PBKDF2_ITERATIONS = 100000
+
+T = TypeVar("T")
+
+
+def hash_password(
+    password: str,
+    salt: bytes = None,
+    algorithm: str | None = None,
+    iterations: int | None = None,
+    scrypt_params: tuple[int, int, int] | None = None,
+) -> str:
+    """Генерация безопасного хеша пароля.
+
+    Алгоритм и его параметры сохраняются в самой строке хеша, поэтому их можно
+    менять через настройки без поломки уже сохраненных паролей:
+
+    - ``pbkdf2_sha256$<iterations>$<salt>$<hash>``
+    - ``scrypt$<n>$<r>$<p>$<salt>$<hash>``
+
+    Args:
+        password: Пароль в открытом виде.
+        salt: Соль (по умолчанию генерируется случайно).
+        algorithm: ``pbkdf2_sha256`` или ``scrypt`` (по умолчанию из настроек).
+        iterations: Количество итераций PBKDF2 (по умолчанию из настроек).
+        scrypt_params: ``(n, r, p)`` для scrypt (по умолчанию из настроек).
+
+    Returns:
+        str: Строка хеша с алгоритмом и параметрами.
+    """
     salt = salt or secrets.token_bytes(16)
+    algorithm = algorithm or settings.PASSWORD_HASH_ALGORITHM
+
+    if algorithm == SCRYPT_ALGORITHM:
+        n, r, p = scrypt_params or (
+            settings.PASSWORD_SCRYPT_N, settings.PASSWORD_SCRYPT_R, settings.PASSWORD_SCRYPT_P,
+        )
+        key = hashlib.scrypt(
+            password.encode("utf-8"),
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=128 * n * r * p + 1024 * 1024,
+        )
+        return f"{SCRYPT_ALGORITHM}${n}${r}${p}${salt.hex()}${key.hex()}"
+
+    if algorithm != PBKDF2_ALGORITHM:
+        raise ValueError(f"Unsupported password hash algorithm: {algorithm}")
+
+    iterations = iterations or settings.PASSWORD_HASH_ITERATIONS
     key = hashlib.pbkdf2_hmac(
         "sha256",
         password.encode("utf-8"),
         salt,
-        100000  # Количество итераций
+        iterations
     )
-    return f"{salt.hex()}:{key.hex()}"
\ No newline at end of file
+    return f"{PBKDF2_ALGORITHM}${iterations}${salt.hex()}${key.hex()}"
+
+
+def _parse_hash(stored: str) -> tuple[str, tuple[int, ...], bytes, bytes] | None:
+    """Разбирает строку хеша на алгоритм, параметры, соль и ключ; None - формат неизвестен."""
+    try:
+        if stored.startswith(f"{PBKDF2_ALGORITHM}$"):
+            _, iterations, salt, key = stored.split("$")
+            return PBKDF2_ALGORITHM, (int(iterations),), bytes.fromhex(salt), bytes.fromhex(key)
+        if stored.startswith(f"{SCRYPT_ALGORITHM}$"):
+            _, n, r, p, salt, key = stored.split("$")
+            return SCRYPT_ALGORITHM, (int(n), int(r), int(p)), bytes.fromhex(salt), bytes.fromhex(key)
+        salt, key = stored.split(":")
+        return PBKDF2_ALGORITHM, (LEGACY_PBKDF2_ITERATIONS,), bytes.fromhex(salt), bytes.fromhex(key)
+    except ValueError:
+        return None
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """Проверяет пароль по сохраненному хешу.
+
+    Параметры берутся из самой строки хеша (см. :func:`hash_password`),
+    поддерживается и прежний формат ``<salt>:<hash>``. Ключи сравниваются
+    за постоянное время.
+
+    Args:
+        password: Пароль в открытом виде.
+        stored: Сохраненная строка хеша.
+
+    Returns:
+        bool: True, если пароль верный; False и для хеша неизвестного формата.
+    """
+    parsed = _parse_hash(stored)
+    if parsed is None:
+        return False
+    algorithm, params, salt, expected = parsed
+    if algorithm == SCRYPT_ALGORITHM:
+        n, r, p = params
+        key = hashlib.scrypt(
+            password.encode("utf-8"),
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=128 * n * r * p + 1024 * 1024,
+            dklen=len(expected),
+        )
+    else:
+        key = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, params[0], dklen=len(expected))
+    return hmac.compare_digest(key, expected)
+
+
+def needs_rehash(stored: str) -> bool:
+    """Проверяет, устарели ли алгоритм или параметры хеша относительно настроек.
+
+    Args:
+        stored: Сохраненная строка хеша.
+
+    Returns:
+        bool: True для другого алгоритма, других параметров или прежнего формата.
+    """
+    if not stored.startswith((f"{PBKDF2_ALGORITHM}$", f"{SCRYPT_ALGORITHM}$")):
+        return True
+    parsed = _parse_hash(stored)
+    if parsed is None or parsed[0] != settings.PASSWORD_HASH_ALGORITHM:
+        return True
+    if parsed[0] == SCRYPT_ALGORITHM:
+        return parsed[1] != (settings.PASSWORD_SCRYPT_N, settings.PASSWORD_SCRYPT_R, settings.PASSWORD_SCRYPT_P)
+    return parsed[1] != (settings.PASSWORD_HASH_ITERATIONS,)
+
+
+class PasswordHasherPool:
+    """Пул воркеров для хеширования паролей вне event loop.
+
+    PBKDF2/scrypt - CPU-bound операции, поэтому они выполняются в пуле потоков
+    (hashlib отпускает GIL) или процессов. Количество одновременно ожидающих
+    задач ограничено: при переполнении очереди запрос сразу получает 503,
+    а не копится в памяти.
+    """
+
+    def __init__(
+        self,
+        executor: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 64,
+    ):
+        """Инициализация пула.
+
+        Args:
+            executor: ``thread`` или ``process``.
+            max_workers: Количество воркеров.
+            max_queue: Максимальное число задач в работе и в очереди.
+        """
+        self.executor_type = executor
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        """Лениво создает исполнитель при первом обращении."""
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hasher",
+                )
+        return self._executor
+
+    async def hash(self, password: str) -> str:
+        """Хеширует пароль в пуле воркеров.
+
+        Args:
+            password: Пароль в открытом виде.
+
+        Returns:
+            str: Строка хеша.
+
+        Raises:
+            ServiceUnavailableException: Если очередь хеширования переполнена.
+        """
+        return await self._run(partial(hash_password, password, **self._hash_params()))
+
+    @staticmethod
+    def _hash_params() -> dict:
+        """Алгоритм и все его параметры из настроек процесса-владельца пула.
+
+        Передаются в задачу явно, т.к. в дочернем процессе настройки могут отличаться.
+        """
+        return {
+            "algorithm": settings.PASSWORD_HASH_ALGORITHM,
+            "iterations": settings.PASSWORD_HASH_ITERATIONS,
+            "scrypt_params": (settings.PASSWORD_SCRYPT_N, settings.PASSWORD_SCRYPT_R, settings.PASSWORD_SCRYPT_P),
+        }
+
+    async def verify(self, password: str, stored: str) -> bool:
+        """Проверяет пароль в пуле воркеров (та же очередь, что и у хеширования).
+
+        Args:
+            password: Пароль в открытом виде.
+            stored: Сохраненная строка хеша.
+
+        Returns:
+            bool: True, если пароль верный.
+
+        Raises:
+            ServiceUnavailableException: Если очередь хеширования переполнена.
+        """
+        return await self._run(partial(verify_password, password, stored))
+
+    async def _run(self, task: Callable[[], T]) -> T:
+        """Выполняет задачу в пуле, ограничивая число ожидающих задач."""
+        if self.pending >= self.max_queue:
+            raise ServiceUnavailableException("Password hashing queue is full")
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, task)
+        finally:
+            self.pending -= 1
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        """Хеширует список паролей параллельно, сохраняя порядок.
+
+        Пароли отправляются в пул окнами по ``max_workers`` штук, поэтому
+        большой список не занимает всю очередь и не вытесняет одиночные запросы.
+
+        Args:
+            passwords: Пароли в открытом виде.
+
+        Returns:
+            list[str]: Хеши в том же порядке.
+        """
+        # Один набор параметров на весь список
+        params = self._hash_params()
+        hashes: list[str] = []
+        for start in range(0, len(passwords), self.max_workers):
+            window = passwords[start:start + self.max_workers]
+            hashes.extend(await asyncio.gather(
+                *(self._run(partial(hash_password, password, **params)) for password in window)
+            ))
+        return hashes
+
+    def shutdown(self) -> None:
+        """Останавливает воркеры пула."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasherPool(
+    executor=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+async def hash_password_async(password: str) -> str:
+    """Асинхронно хеширует пароль, не блокируя event loop.
+
+    Args:
+        password: Пароль в открытом виде.
+
+    Returns:
+        str: Строка хеша.
+    """
+    return await password_hasher.hash(password)
+
+
+async def verify_password_async(password: str, stored: str) -> bool:
+    """Асинхронно проверяет пароль, не блокируя event loop.
+
+    Args:
+        password: Пароль в открытом виде.
+        stored: Сохраненная строка хеша.
+
+    Returns:
+        bool: True, если пароль верный.
+    """
+    return await password_hasher.verify(password, stored)
+
+
+async def shutdown_password_hasher() -> None:
+    """Хук on_shutdown: останавливает пул хеширования."""
+    password_hasher.shutdown()
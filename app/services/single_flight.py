@@ -0,0 +1,170 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+import msgspec
+
+from app.config import settings
+from app.services.metrics import MetricsWriter, register
+
+T = TypeVar("T")
+
+
+class SingleFlightStats(msgspec.Struct):
+    """Счетчики объединения запросов для одного вида ключей."""
+    calls: int = 0
+    """Всего вызовов."""
+    executions: int = 0
+    """Вызовов, действительно выполнивших запрос к БД."""
+    collapsed: int = 0
+    """Вызовов, дождавшихся уже выполняющегося запроса."""
+    errors: int = 0
+    """Выполнений, завершившихся ошибкой (ее получили все ожидающие)."""
+    timeouts: int = 0
+    """Выполнений, прерванных по таймауту."""
+
+
+class SingleFlight:
+    """Объединение одновременных одинаковых чтений (single-flight).
+
+    Первый вызов с ключом запускает функцию, остальные вызовы с тем же
+    ключом, пришедшие до ее завершения, ждут тот же результат. Результат не
+    кешируется: после завершения следующий вызов снова идет в БД. Ошибка,
+    в том числе таймаут, передается всем ожидающим.
+
+    Функция выполняется в сессии первого вызова, поэтому ее отмена (клиент
+    первого запроса отключился) отменяет и общий вызов; остальные вызовы
+    в этом случае повторяют запрос сами.
+
+    Работает в одном event loop, поэтому блокировки не нужны.
+    """
+
+    def __init__(self, timeout: float = 5.0, enabled: bool = True):
+        """Инициализация.
+
+        Args:
+            timeout: Таймаут общего вызова в секундах (0 - без таймаута).
+            enabled: Если False, каждый вызов выполняет функцию сам.
+        """
+        self.timeout = timeout
+        self.enabled = enabled
+        self._calls: dict[tuple[str, Hashable], asyncio.Task] = {}
+        self._stats: dict[str, SingleFlightStats] = {}
+
+    async def do(
+        self,
+        kind: str,
+        key: Hashable,
+        fn: Callable[[], Awaitable[T]],
+        timeout: float | None = None,
+    ) -> T:
+        """Выполняет ``fn`` или дожидается уже выполняющегося вызова с тем же ключом.
+
+        Args:
+            kind: Вид запроса (``user``, ``list``...): часть ключа и метка счетчиков.
+            key: Ключ запроса внутри вида.
+            fn: Функция без аргументов, выполняющая чтение.
+            timeout: Таймаут для этого ключа в секундах. По умолчанию ``self.timeout``.
+
+        Returns:
+            T: Результат ``fn``.
+
+        Raises:
+            TimeoutError: Если общий вызов не завершился за ``timeout``.
+            Exception: Исключение ``fn`` - каждому ожидающему.
+        """
+        if not self.enabled:
+            return await fn()
+
+        stats = self.stats_for(kind)
+        stats.calls += 1
+        full_key = (kind, key)
+        collapsed = False
+        while True:
+            task = self._calls.get(full_key)
+            leader = task is None
+            if leader:
+                stats.executions += 1
+                task = asyncio.create_task(self._run(stats, fn, self.timeout if timeout is None else timeout))
+                self._calls[full_key] = task
+                task.add_done_callback(lambda done, full_key=full_key: self._release(full_key, done))
+                # Первый вызов ждет без shield: его отмена отменяет общий вызов
+                return await task
+
+            if not collapsed:
+                stats.collapsed += 1
+                collapsed = True
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # Отменили первый вызов, а не этот: повторяем запрос
+                if task.cancelled() and not asyncio.current_task().cancelling():
+                    continue
+                raise
+
+    @staticmethod
+    async def _run(stats: SingleFlightStats, fn: Callable[[], Awaitable[Any]], timeout: float) -> Any:
+        try:
+            async with asyncio.timeout(timeout or None):
+                return await fn()
+        except TimeoutError:
+            stats.timeouts += 1
+            raise
+        except Exception:
+            stats.errors += 1
+            raise
+
+    def _release(self, full_key: tuple[str, Hashable], task: asyncio.Task) -> None:
+        if self._calls.get(full_key) is task:
+            del self._calls[full_key]
+
+    def forget(self, kind: str, key: Hashable) -> None:
+        """Отвязывает выполняющийся вызов от ключа: следующие вызовы выполнят запрос заново.
+
+        Вызывается после записи, чтобы новые чтения не получили результат,
+        начатый до нее.
+
+        Args:
+            kind: Вид запроса.
+            key: Ключ запроса.
+        """
+        self._calls.pop((kind, key), None)
+
+    def forget_kind(self, kind: str) -> None:
+        """Отвязывает все выполняющиеся вызовы вида ``kind``."""
+        for full_key in [full_key for full_key in self._calls if full_key[0] == kind]:
+            del self._calls[full_key]
+
+    def stats_for(self, kind: str) -> SingleFlightStats:
+        """Возвращает (и при необходимости создает) счетчики вида ``kind``."""
+        stats = self._stats.get(kind)
+        if stats is None:
+            stats = self._stats[kind] = SingleFlightStats()
+        return stats
+
+    def stats(self) -> dict[str, SingleFlightStats]:
+        """Счетчики по видам запросов."""
+        return self._stats
+
+    @property
+    def in_flight(self) -> int:
+        """Количество выполняющихся общих вызовов."""
+        return len(self._calls)
+
+
+single_flight = SingleFlight(timeout=settings.SINGLE_FLIGHT_TIMEOUT, enabled=settings.SINGLE_FLIGHT_ENABLED)
+
+
+@register
+def _collect_single_flight_metrics(writer: MetricsWriter) -> None:
+    coalescing = sorted(single_flight.stats().items())
+    for name, attr, help_text in (
+        ("single_flight_calls_total", "calls", "Coalescable reads."),
+        ("single_flight_executions_total", "executions", "Reads that ran a database query."),
+        ("single_flight_collapsed_total", "collapsed", "Reads that shared an in-flight query."),
+        ("single_flight_errors_total", "errors", "Shared queries that failed."),
+        ("single_flight_timeouts_total", "timeouts", "Shared queries that timed out."),
+    ):
+        writer.header(name, "counter", help_text)
+        for kind, stats in coalescing:
+            writer.sample(name, getattr(stats, attr), kind=kind)
+    writer.metric("single_flight_in_flight", "gauge", "Shared queries in flight.", single_flight.in_flight)
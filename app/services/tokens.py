@@ -0,0 +1,110 @@
+import base64
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+
+import msgspec
+from litestar.exceptions import NotAuthorizedException
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenClaims(msgspec.Struct):
+    """Содержимое токена доступа."""
+    sub: int
+    """ID пользователя."""
+    ver: int
+    """Версия токенов пользователя (``token_version``) на момент выдачи."""
+    iat: float
+    """Время выдачи (Unix time)."""
+    exp: float
+    """Время истечения (Unix time)."""
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+class TokenService:
+    """Подписанные токены доступа без хранения на сервере.
+
+    Токен - ``<claims>.<подпись>``: claims в msgspec JSON и HMAC-SHA256 от них,
+    обе части в base64url. Проверка токена - одна HMAC, без хеширования пароля.
+
+    Отзыв не хранится здесь: токен несет версию токенов пользователя
+    (``token_version`` в БД), и :meth:`UserService.authenticate` сверяет ее
+    с БД. Смена пароля и выход увеличивают версию - отзыв виден всем
+    воркерам и не теряется при вытеснении из кеша.
+    """
+
+    def __init__(self, secret: bytes, ttl: int):
+        """Инициализация.
+
+        Args:
+            secret: Ключ подписи.
+            ttl: Время жизни токена в секундах.
+        """
+        self.secret = secret
+        self.ttl = ttl
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder(TokenClaims)
+
+    def _sign(self, payload: bytes) -> bytes:
+        return hmac.new(self.secret, payload, hashlib.sha256).digest()
+
+    def issue(self, user_id: int, version: int) -> tuple[str, TokenClaims]:
+        """Выпускает токен пользователю.
+
+        Args:
+            user_id: ID пользователя.
+            version: Текущая версия токенов пользователя.
+
+        Returns:
+            tuple[str, TokenClaims]: Токен и его содержимое.
+        """
+        now = time.time()
+        claims = TokenClaims(sub=user_id, ver=version, iat=now, exp=now + self.ttl)
+        payload = _b64encode(self._encoder.encode(claims))
+        return (payload + b"." + _b64encode(self._sign(payload))).decode("ascii"), claims
+
+    def verify(self, token: str) -> TokenClaims:
+        """Проверяет подпись и срок действия токена (версию сверяет ``UserService.authenticate``).
+
+        Args:
+            token: Токен из :meth:`issue`.
+
+        Returns:
+            TokenClaims: Содержимое токена.
+
+        Raises:
+            NotAuthorizedException: Если токен поврежден или истек.
+        """
+        try:
+            payload, signature = token.encode("ascii").split(b".")
+            valid = hmac.compare_digest(_b64decode(signature), self._sign(payload))
+            claims = self._decoder.decode(_b64decode(payload)) if valid else None
+        except (ValueError, msgspec.DecodeError):
+            claims = None
+        if claims is None:
+            raise NotAuthorizedException("Invalid token")
+        if claims.exp <= time.time():
+            raise NotAuthorizedException("Token expired")
+        return claims
+
+
+def _secret() -> bytes:
+    if settings.AUTH_TOKEN_SECRET:
+        return settings.AUTH_TOKEN_SECRET.encode("utf-8")
+    logger.warning("AUTH_TOKEN_SECRET is not set, tokens are valid only for this process")
+    return secrets.token_bytes(32)
+
+
+token_service = TokenService(secret=_secret(), ttl=settings.AUTH_TOKEN_TTL)
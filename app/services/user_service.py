@@ -1,34 +1,87 @@
-from typing import Any
-from litestar.exceptions import NotFoundException, ValidationException
+import csv
+import io
+import time
+from datetime import datetime
+from typing import Any, AsyncContextManager, AsyncIterator, Callable
+from litestar.exceptions import (
+    HTTPException, NotAuthorizedException, NotFoundException, ServiceUnavailableException, ValidationException
+)
+from litestar.status_codes import HTTP_410_GONE
+from app.repositories.contract import UserRepositoryContract, UserRow
 from app.repositories.user_repo import UserRepository
 from app.models.user_model import User
-from sqlalchemy import select
+from sqlalchemy import Row, select
 from advanced_alchemy.repository import SQLAlchemyAsyncRepository
 from sqlalchemy.ext.asyncio import AsyncSession
 from litestar.pagination import OffsetPagination
 from litestar.dto import DTOData
-from app.schemas.user_schema import UserCreate, UserUpdate, UserOut
-from app.services.security import hash_password
+from app.schemas.user_schema import (
+    UserCreate, UserUpdate, UserOut, BulkCreateItem, BulkCreateResult, ImportLineError, ImportReport,
+    UserBatchItem, UserBatchResult, UserChange, ChangeFeedPage, UserBulkDelete, BulkDeleteResult
+)
+from app.schemas.pagination import (
+    CursorPage, OffsetPage, decode_change_cursor, decode_cursor, decode_id_cursor, encode_change_cursor,
+    encode_cursor, encode_id_cursor
+)
+from app.repositories.count_strategy import user_count_strategy
+from app.services.cache import UserCache, user_cache
+from app.services.change_notifier import change_notifier
+from app.services.security import hash_password_async, needs_rehash, password_hasher, verify_password_async
+from app.services.single_flight import SingleFlight, single_flight
+from app.services.tokens import TokenClaims, token_service
+from app.services.write_batcher import CreateBatcher
+from app.config import settings
 import msgspec
 
+# Суффикс вида single-flight для чтений с реплики
+REPLICA_KIND_SUFFIX = "_replica"
+
+
 class UserService:
     """Сервис для работы с пользователями.
     
     Предоставляет методы для CRUD-операций с пользователями, включая пагинацию.
     """
     
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession | None = None,
+        cache: UserCache | None = None,
+        repository: UserRepositoryContract | None = None,
+        read_session: AsyncSession | None = None,
+        coalescer: SingleFlight | None = None,
+        create_batcher: CreateBatcher | None = None,
+    ):
         """Инициализация сервиса.
         
         Args:
             session: Асинхронная сессия SQLAlchemy для работы с БД.
+            cache: Кеш пользователей по ID. По умолчанию общий кеш процесса.
+            repository: Готовый репозиторий (например, ``AsyncpgUserRepository``).
+                По умолчанию ``UserRepository`` поверх ``session``.
+            read_session: Сессия реплики для чтения. После первой записи сервис
+                читает из основной БД, чтобы видеть собственные изменения.
+            coalescer: Объединение одновременных одинаковых чтений. По умолчанию общее для процесса.
+            create_batcher: Пакетная вставка для :meth:`create_user`. None - вставка
+                в транзакции сервиса.
         """
         self.session = session
-        self.user_repository = UserRepository(session=session)
+        self.user_repository: UserRepositoryContract = (
+            repository if repository is not None else UserRepository(session=session)
+        )
+        self.read_repository: UserRepositoryContract = (
+            UserRepository(session=read_session) if read_session is not None else self.user_repository
+        )
+        self.cache = cache if cache is not None else user_cache
+        self.coalescer = coalescer if coalescer is not None else single_flight
+        self.create_batcher = create_batcher
 
     async def create_user(self, data: UserCreate) -> UserOut:
         """Создает нового пользователя с хешированием пароля.
         
+        С ``create_batcher`` вставка объединяется с одновременными созданиями
+        в один INSERT и одну транзакцию.
+        
         Args:
             data: Данные для создания пользователя (Pydantic-схема UserCreate).
             
@@ -40,25 +93,297 @@ class UserService:
             SQLAlchemyError: При ошибках работы с БД.
         """
         user_data = data.as_builtins()  # Преобразуем в dict
-        user = await self.user_repository.add(
-            self.user_repository.model_type(
-                name=user_data["name"],
-                surname=user_data["surname"],
-                password=hash_password(user_data["password"])
+        row = {
+            "name": user_data["name"],
+            "surname": user_data["surname"],
+            "password": await hash_password_async(user_data["password"]),
+        }
+        if self.create_batcher is not None:
+            # Пакет фиксируется в собственной транзакции пакетной вставки
+            created = await self.create_batcher.submit(row)
+            self._written()
+        else:
+            created = (await self.user_repository.insert_many([row]))[0]
+            await self._commit()
+        user_count_strategy.invalidate()
+        return self._to_out(created)
+
+    async def _commit(self) -> None:
+        """Фиксирует запись и переключает чтение на основную БД (read-after-write).
+
+        Объединенные чтения списка, начатые до записи, отвязываются: новые
+        запросы не получат страницу без только что записанных изменений.
+        """
+        await self.user_repository.commit()
+        self._written()
+
+    def _written(self) -> None:
+        """Отмечает зафиксированную запись: дальнейшие чтения - из основной БД, без старых объединенных.
+
+        Ожидающие ленту изменений (long-poll) просыпаются.
+        """
+        self.read_repository = self.user_repository
+        for kind in ("list", "list_cursor"):
+            self.coalescer.forget_kind(kind)
+            self.coalescer.forget_kind(f"{kind}{REPLICA_KIND_SUFFIX}")
+        change_notifier.notify()
+
+    @property
+    def _reads_primary(self) -> bool:
+        """True, если чтение идет из основной БД (реплики нет или уже была запись)."""
+        return self.read_repository is self.user_repository
+
+    async def _coalesce(self, kind: str, key: Any, fn: Callable[[], Any]) -> Any:
+        """Выполняет чтение через single-flight, превращая таймаут в 503.
+
+        Чтения с реплики объединяются отдельно от чтений из основной БД (вид
+        ``<kind>_replica``): чтение после записи не получит результат реплики.
+
+        Args:
+            kind: Вид запроса для ключа и счетчиков.
+            key: Ключ запроса.
+            fn: Функция чтения без аргументов.
+
+        Returns:
+            Any: Результат ``fn`` (общий для одновременных вызовов).
+
+        Raises:
+            ServiceUnavailableException: Если чтение не уложилось в ``SINGLE_FLIGHT_TIMEOUT``.
+        """
+        try:
+            if not self._reads_primary:
+                kind = f"{kind}{REPLICA_KIND_SUFFIX}"
+            return await self.coalescer.do(kind, key, fn)
+        except TimeoutError as exc:
+            raise ServiceUnavailableException("Database read timed out") from exc
+
+    @staticmethod
+    def _to_out(row: UserRow) -> UserOut:
+        """Строит UserOut напрямую из строки ``USER_OUT_COLUMNS``, минуя ORM.
+        
+        Args:
+            row: Строка ``(id, name, surname, created_at, updated_at, version)``.
+            
+        Returns:
+            UserOut: Схема с данными пользователя.
+        """
+        return UserOut(*row)
+
+    async def create_users(self, items: list[UserCreate]) -> BulkCreateResult:
+        """Создает пользователей пакетом в одной транзакции.
+        
+        Пароли хешируются параллельно в пуле, строки вставляются многострочными
+        ``INSERT ... RETURNING``. Невалидные элементы не прерывают пакет, а
+        возвращаются с описанием ошибки.
+        
+        Args:
+            items: Данные пользователей.
+            
+        Returns:
+            BulkCreateResult: Результаты в порядке запроса.
+            
+        Raises:
+            ValidationException: Если элементов больше ``BULK_CREATE_MAX_ITEMS``.
+        """
+        if len(items) > settings.BULK_CREATE_MAX_ITEMS:
+            raise ValidationException(
+                f"Too many items: {len(items)} > {settings.BULK_CREATE_MAX_ITEMS}"
             )
+
+        results = [BulkCreateItem(index=index) for index in range(len(items))]
+        valid: list[int] = []
+        for index, item in enumerate(items):
+            error = self._validate_create(item)
+            if error:
+                results[index].error = error
+            else:
+                valid.append(index)
+
+        hashes = await password_hasher.hash_many([items[index].password for index in valid])
+        rows = await self.user_repository.insert_many(
+            [
+                {"name": items[index].name, "surname": items[index].surname, "password": password}
+                for index, password in zip(valid, hashes)
+            ],
+            batch_size=settings.BULK_INSERT_BATCH_SIZE,
         )
-        await self.user_repository.session.commit()
-        return UserOut(
-            id=int(user.id),
-            name=user.name,
-            surname=user.surname,
-            created_at=user.created_at,
-            updated_at=user.updated_at
-        )
+        await self._commit()
+        user_count_strategy.invalidate()
+
+        for index, row in zip(valid, rows):
+            results[index].user = self._to_out(row)
+        return BulkCreateResult(items=results, created=len(rows), failed=len(items) - len(rows))
+
+    async def import_users(
+        self,
+        chunks: AsyncIterator[bytes],
+        batch_size: int = 5000,
+        on_progress: Callable[[ImportReport], None] | None = None,
+    ) -> ImportReport:
+        """Импортирует пользователей из потока NDJSON.
+        
+        Поток разбирается построчно по мере поступления. Строки копятся в пачку,
+        пароли пачки хешируются параллельно в пуле, пачка записывается
+        ``COPY``/``executemany`` и фиксируется, и только после этого читается
+        следующая часть потока. Так в памяти находится не больше одной пачки.
+        
+        Args:
+            chunks: Поток байтов NDJSON (по одному ``UserCreate`` на строку).
+            batch_size: Количество пользователей в пачке. Default: 5000.
+            on_progress: Вызывается после записи каждой пачки.
+            
+        Returns:
+            ImportReport: Итоги импорта и первые ``IMPORT_MAX_ERRORS`` ошибок.
+        """
+        started = time.perf_counter()
+        report = ImportReport()
+        decoder = msgspec.json.Decoder(UserCreate)
+        batch: list[UserCreate] = []
+
+        async def flush() -> None:
+            hashes = await password_hasher.hash_many([item.password for item in batch])
+            report.imported += await self.user_repository.copy_many(
+                [(item.name, item.surname, password) for item, password in zip(batch, hashes)]
+            )
+            await self._commit()
+            report.batches += 1
+            batch.clear()
+            if on_progress:
+                on_progress(report)
+
+        def fail(line: int, error: str) -> None:
+            report.failed += 1
+            if len(report.errors) < settings.IMPORT_MAX_ERRORS:
+                report.errors.append(ImportLineError(line=line, error=error))
+
+        async for line_number, line in self._iter_lines(chunks):
+            report.received += 1
+            try:
+                item = decoder.decode(line)
+            except msgspec.DecodeError as exc:
+                fail(line_number, str(exc))
+                continue
+            error = self._validate_create(item)
+            if error:
+                fail(line_number, error)
+                continue
+            batch.append(item)
+            if len(batch) >= batch_size:
+                await flush()
+
+        if batch:
+            await flush()
+        user_count_strategy.invalidate()
+        report.elapsed_seconds = round(time.perf_counter() - started, 3)
+        return report
+
+    @staticmethod
+    async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+        """Разбивает поток байтов на непустые строки с их номерами (с 1)."""
+        tail = b""
+        line_number = 0
+        async for chunk in chunks:
+            lines = (tail + chunk).split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                line_number += 1
+                if line.strip():
+                    yield line_number, line
+        if tail.strip():
+            yield line_number + 1, tail
+
+    @staticmethod
+    def _validate_create(data: UserCreate) -> str | None:
+        """Проверяет данные пользователя до вставки.
+        
+        Args:
+            data: Данные для создания пользователя.
+            
+        Returns:
+            str | None: Описание ошибки или None, если данные корректны.
+        """
+        for field in ("name", "surname"):
+            value = getattr(data, field)
+            if not value:
+                return f"{field} must not be empty"
+            if len(value) > 50:
+                return f"{field} must be at most 50 characters"
+        if not data.password:
+            return "password must not be empty"
+        return None
+
+    async def verify_credentials(self, user_id: int, password: str) -> int:
+        """Проверяет пароль пользователя для входа.
+        
+        Хеш с устаревшим алгоритмом или параметрами после успешной проверки
+        перехешируется с текущими настройками.
+        
+        Args:
+            user_id: Идентификатор пользователя.
+            password: Пароль в открытом виде.
+            
+        Returns:
+            int: Версия токенов пользователя для выдаваемого токена.
+            
+        Raises:
+            NotAuthorizedException: Если пользователь не найден или пароль неверный.
+        """
+        credentials = await self.user_repository.get_credentials(user_id)
+        if credentials is None:
+            # Столько же работы, сколько при проверке: время ответа не выдает существование ID
+            await hash_password_async(password)
+            raise NotAuthorizedException("Invalid credentials")
+        stored, token_version = credentials
+        if not await verify_password_async(password, stored):
+            raise NotAuthorizedException("Invalid credentials")
+        if not needs_rehash(stored):
+            return token_version
+        try:
+            rehashed = await hash_password_async(password)
+        except ServiceUnavailableException:
+            # Вход уже подтвержден; перехеширование повторится при следующем входе
+            return token_version
+        if await self.user_repository.replace_password(user_id, stored, rehashed):
+            await self.user_repository.commit()
+        return token_version
+
+    async def authenticate(self, token: str) -> TokenClaims:
+        """Проверяет токен доступа: подпись, срок и версию токенов пользователя в БД.
+
+        Версия читается из основной БД (не из кеша и не с реплики): токен,
+        отозванный сменой пароля или выходом, отклоняется сразу на всех воркерах.
+
+        Args:
+            token: Токен из заголовка ``Authorization``.
+
+        Returns:
+            TokenClaims: Содержимое токена.
+
+        Raises:
+            NotAuthorizedException: Если токен поврежден, истек или отозван
+                (либо пользователь удален).
+        """
+        claims = token_service.verify(token)
+        if await self.user_repository.get_token_version(claims.sub) != claims.ver:
+            raise NotAuthorizedException("Token revoked")
+        return claims
+
+    async def revoke_tokens(self, user_id: int) -> None:
+        """Отзывает все токены пользователя (выход).
+
+        Args:
+            user_id: Идентификатор пользователя.
+        """
+        if await self.user_repository.revoke_tokens(user_id):
+            await self.user_repository.commit()
 
     async def get_user(self, user_id: int) -> UserOut:
         """Получает пользователя по ID.
         
+        Сначала проверяется кеш, при промахе пользователь читается из БД и кешируется.
+        Одновременные промахи по одному ID выполняют один запрос к БД. Прочитанное
+        с реплики не кешируется: кеш общий, и отставшая строка пережила бы запись.
+        
         Args:
             user_id: Идентификатор пользователя.
             
@@ -68,48 +393,303 @@ class UserService:
         Raises:
             NotFoundException: Если пользователь не найден.
         """
-        user = await self.user_repository.get(user_id)
-        if not user:
+        cached = await self.cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        user_out = await self._coalesce("user", user_id, lambda: self._load_user(user_id))
+        if user_out is None:
             raise NotFoundException("User not found")
-        return UserOut(
-            id=int(user.id),
-            name=user.name,
-            surname=user.surname,
-            created_at=user.created_at,
-            updated_at=user.updated_at
-        )
+        return user_out
+
+    async def _load_user(self, user_id: int) -> UserOut | None:
+        """Читает пользователя из БД и кеширует прочитанное из основной БД (один раз на объединенный вызов)."""
+        row = await self.read_repository.get_row(user_id)
+        if row is None:
+            return None
+        user_out = self._to_out(row)
+        if self._reads_primary:
+            await self.cache.set(user_out)
+        return user_out
+
+    async def get_user_version(self, user_id: int) -> tuple[int, datetime]:
+        """Получает версию и дату изменения пользователя для условного запроса.
+
+        Читается одна строка индекса без кеша и построения ``UserOut``, поэтому
+        ответ 304 стоит только этого запроса.
+
+        Args:
+            user_id: Идентификатор пользователя.
+
+        Returns:
+            tuple[int, datetime]: Версия и ``updated_at``.
+
+        Raises:
+            NotFoundException: Если пользователь не найден.
+        """
+        version = await self.read_repository.get_version(user_id)
+        if version is None:
+            raise NotFoundException("User not found")
+        return version
     
+    async def get_users_batch(self, user_ids: list[int]) -> UserBatchResult:
+        """Получает пользователей по списку ID.
+        
+        Сначала проверяется кеш, а одним запросом к БД читаются только
+        недостающие ID; прочитанные из основной БД пользователи кешируются.
+        
+        Args:
+            user_ids: Идентификаторы пользователей (порядок и повторы сохраняются).
+            
+        Returns:
+            UserBatchResult: Пользователи в порядке запроса и список ненайденных ID.
+            
+        Raises:
+            ValidationException: Если ID больше ``BATCH_GET_MAX_IDS``.
+        """
+        if len(user_ids) > settings.BATCH_GET_MAX_IDS:
+            raise ValidationException(
+                f"Too many ids: {len(user_ids)} > {settings.BATCH_GET_MAX_IDS}"
+            )
+
+        unique_ids = list(dict.fromkeys(user_ids))
+        users = await self.cache.get_many(unique_ids)
+        missing_ids = [user_id for user_id in unique_ids if user_id not in users]
+        if missing_ids:
+            loaded = [self._to_out(row) for row in await self.read_repository.get_rows(missing_ids)]
+            if self._reads_primary:
+                await self.cache.set_many(loaded)
+            users.update((user.id, user) for user in loaded)
+
+        items = [UserBatchItem(id=user_id, user=users.get(user_id)) for user_id in user_ids]
+        return UserBatchResult(
+            items=items,
+            found=sum(1 for item in items if item.user is not None),
+            missing=[user_id for user_id in unique_ids if user_id not in users],
+        )
+
     async def get_list(
         self,
         page: int = 1,
-        page_size: int = 100
-    ) -> OffsetPagination[UserOut]:
+        page_size: int = 100,
+        with_total: bool = True
+    ) -> OffsetPage[UserOut]:
         """Получает список пользователей с пагинацией.
         
         Args:
             page: Номер страницы (начиная с 1). Default: 1.
             page_size: Количество элементов на странице. Default: 100.
+            with_total: Считать ли общее количество пользователей. Default: True.
             
         Returns:
-            OffsetPagination[UserOut]: Объект пагинации с пользователями.
+            OffsetPage[UserOut]: Объект пагинации с пользователями.
         """
-        users, total = await self.user_repository.list_paginated(page, page_size)
-        return OffsetPagination(
-            items=[UserOut(
-                id=int(user.id),
-                name=user.name,
-                surname=user.surname,
-                created_at=user.created_at,
-                updated_at=user.updated_at
-            ) for user in users],
+        if page == 1:
+            # Первую страницу запрашивают чаще всего: одновременные запросы делят один вызов
+            rows, total, exact = await self._coalesce(
+                "list",
+                (page_size, with_total),
+                lambda: self.read_repository.list_paginated(page, page_size, with_total),
+            )
+        else:
+            rows, total, exact = await self.read_repository.list_paginated(page, page_size, with_total)
+        return OffsetPage(
+            items=[self._to_out(row) for row in rows],
             total=total,
+            total_exact=exact,
             limit=page_size,
             offset=(page - 1) * page_size
         )
 
+    async def get_page(
+        self,
+        cursor: str | None = None,
+        page_size: int = 100
+    ) -> CursorPage[UserOut]:
+        """Получает страницу пользователей по курсору (keyset-пагинация).
+        
+        Args:
+            cursor: Курсор из ``next_cursor`` предыдущей страницы. None или пустая строка - первая страница.
+            page_size: Количество элементов на странице. Default: 100.
+            
+        Returns:
+            CursorPage[UserOut]: Страница пользователей с курсором следующей страницы.
+            
+        Raises:
+            ValidationException: Если курсор поврежден.
+        """
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as exc:
+            raise ValidationException(str(exc)) from exc
+
+        if after is None:
+            rows, next_key = await self._coalesce(
+                "list_cursor", page_size, lambda: self.read_repository.list_after(None, page_size)
+            )
+        else:
+            rows, next_key = await self.read_repository.list_after(after, page_size)
+        return CursorPage(
+            items=[self._to_out(row) for row in rows],
+            limit=page_size,
+            next_cursor=encode_cursor(*next_key) if next_key else None
+        )
+
+    async def search_users(
+        self,
+        query: str,
+        mode: str = "prefix",
+        field: str = "any",
+        cursor: str | None = None,
+        limit: int = 20
+    ) -> CursorPage[UserOut]:
+        """Ищет пользователей по началу или подстроке имени/фамилии без учета регистра.
+
+        Args:
+            query: Строка поиска.
+            mode: ``prefix`` или ``substring``. Default: prefix.
+            field: ``name``, ``surname`` или ``any`` (любое из них). Default: any.
+            cursor: Курсор из ``next_cursor`` предыдущей страницы. None или пустая строка - первая страница.
+            limit: Количество элементов на странице (не больше ``SEARCH_MAX_LIMIT``). Default: 20.
+
+        Returns:
+            CursorPage[UserOut]: Найденные пользователи в порядке ID с курсором следующей страницы.
+
+        Raises:
+            ValidationException: Если строка поиска пустая или курсор поврежден.
+        """
+        query = query.strip()
+        if not query:
+            raise ValidationException("Search query must not be empty")
+        try:
+            after_id = decode_id_cursor(cursor) if cursor else None
+        except ValueError as exc:
+            raise ValidationException(str(exc)) from exc
+
+        fields = ("name", "surname") if field == "any" else (field,)
+        limit = min(limit, settings.SEARCH_MAX_LIMIT)
+        rows, next_id = await self.read_repository.search(query, mode, fields, after_id, limit)
+        return CursorPage(
+            items=[self._to_out(row) for row in rows],
+            limit=limit,
+            next_cursor=encode_id_cursor(next_id) if next_id is not None else None
+        )
+
+    async def get_changes(self, cursor: str | None = None, limit: int = 100) -> ChangeFeedPage:
+        """Получает изменения пользователей после водяного знака.
+        
+        Изменения читаются из журнала ``user_change`` в порядке фиксации
+        транзакций; у каждого - текущее состояние пользователя. Граница очистки
+        журнала читается после изменений: удаление, убранное очисткой между
+        двумя чтениями, отсутствует в изменениях, но уже сдвинуло границу.
+        
+        Args:
+            cursor: ``next_cursor`` предыдущего ответа. None или пустая строка - с начала.
+            limit: Максимум изменений (не больше ``CHANGE_FEED_MAX_LIMIT``). Default: 100.
+            
+        Returns:
+            ChangeFeedPage: Изменения в порядке журнала и новый водяной знак.
+            
+        Raises:
+            ValidationException: Если курсор поврежден.
+            HTTPException: 410, если очистка журнала убрала удаление после
+                курсора: клиенту нужно прочитать ленту с начала.
+        """
+        try:
+            after = decode_change_cursor(cursor) if cursor else None
+        except ValueError as exc:
+            raise ValidationException(str(exc)) from exc
+
+        changes, has_more = await self.user_repository.list_changes(
+            after, min(limit, settings.CHANGE_FEED_MAX_LIMIT)
+        )
+        if after is not None and after < await self.user_repository.get_change_horizon():
+            raise HTTPException(
+                status_code=HTTP_410_GONE,
+                detail="Change feed cursor is older than the change log retention, resync from the beginning",
+            )
+        return ChangeFeedPage(
+            items=[
+                UserChange(
+                    id=id,
+                    changed_at=changed_at,
+                    deleted=row is None,
+                    user=self._to_out(row) if row is not None else None,
+                )
+                for _, changed_at, id, row in changes
+            ],
+            next_cursor=encode_change_cursor(*changes[-1][0]) if changes else cursor or None,
+            has_more=has_more,
+        )
+
+    @staticmethod
+    async def watch_changes(
+        open_service: Callable[[], AsyncContextManager["UserService"]],
+        cursor: str | None = None,
+        limit: int = 100,
+        wait: float = 0.0,
+    ) -> ChangeFeedPage:
+        """Получает изменения, при их отсутствии ожидая до ``wait`` секунд (long-poll).
+        
+        Каждая проверка открывает сервис через ``open_service`` и сразу
+        закрывает его, поэтому ожидание не держит соединение с БД. Ожидание
+        прерывается записью в этом процессе и перепроверяется каждые
+        ``CHANGE_FEED_POLL_INTERVAL`` секунд.
+        
+        Args:
+            open_service: Открывает UserService с собственным соединением.
+            cursor: ``next_cursor`` предыдущего ответа. None или пустая строка - с начала.
+            limit: Максимум изменений. Default: 100.
+            wait: Максимальное ожидание изменений, секунды. Default: 0 (без ожидания).
+            
+        Returns:
+            ChangeFeedPage: Изменения (пустая страница, если их не было за ``wait``).
+        """
+        deadline = time.monotonic() + wait
+        while True:
+            async with open_service() as user_service:
+                page = await user_service.get_changes(cursor, limit)
+            remaining = deadline - time.monotonic()
+            if page.items or remaining <= 0:
+                return page
+            await change_notifier.wait(min(remaining, settings.CHANGE_FEED_POLL_INTERVAL))
+
+    async def export_users(self, fmt: str = "ndjson", batch_size: int = 1000) -> AsyncIterator[bytes]:
+        """Выгружает всех пользователей потоком в NDJSON или CSV.
+        
+        Каждая пачка строк из серверного курсора кодируется и отдается сразу,
+        поэтому потребление памяти не зависит от размера таблицы.
+        
+        Args:
+            fmt: ``ndjson`` или ``csv``. Default: ndjson.
+            batch_size: Количество строк в пачке. Default: 1000.
+            
+        Yields:
+            bytes: Очередной фрагмент выгрузки.
+        """
+        if fmt == "csv":
+            yield b"id,name,surname,created_at,updated_at,version\r\n"
+        encoder = msgspec.json.Encoder()
+
+        async for rows in self.user_repository.stream_rows(batch_size):
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows(
+                    (id, name, surname, created_at.isoformat(), updated_at.isoformat(), version)
+                    for id, name, surname, created_at, updated_at, version in rows
+                )
+                yield buffer.getvalue().encode("utf-8")
+            else:
+                yield encoder.encode_lines([self._to_out(row) for row in rows])
+
     async def update_user(self, user_id: int, update_data: UserUpdate) -> UserOut:
         """Обновляет данные пользователя.
         
+        Обновляются только переданные поля (не None) одним запросом
+        ``UPDATE ... RETURNING``; отсутствие пользователя определяется по пустому результату.
+        Смена пароля тем же запросом отзывает выданные пользователю токены.
+        
         Args:
             user_id: Идентификатор пользователя.
             update_data: Данные для обновления (Pydantic-схема UserUpdate).
@@ -121,28 +701,30 @@ class UserService:
             NotFoundException: Если пользователь не найден.
             ValueError: Если данные не прошли валидацию.
         """
-        user = await self.user_repository.get(user_id)
-        if not user:
+        values = {
+            field: value
+            for field, value in msgspec.structs.asdict(update_data).items()
+            if value is not None
+        }
+        if not values:
+            return await self.get_user(user_id)
+        if "password" in values:
+            values["password"] = await hash_password_async(values["password"])
+
+        row = await self.user_repository.update_returning(user_id, values)
+        if row is None:
             raise NotFoundException("User not found")
-            
-        for field, value in msgspec.structs.asdict(update_data).items():
-            if field == "password" and value:
-                value = hash_password(value)
-            setattr(user, field, value)
-
-        updated_user = await self.user_repository.update(user)
-        await self.user_repository.session.commit()
-        return UserOut(
-            id=int(user.id),
-            name=updated_user.name,
-            surname=updated_user.surname,
-            created_at=updated_user.created_at,
-            updated_at=updated_user.updated_at
-        )
+        await self._commit()
+        await self.cache.invalidate(user_id)
+        self.coalescer.forget("user", user_id)
+        return self._to_out(row)
 
     async def delete_user(self, user_id: int) -> None:
         """Удаляет пользователя.
         
+        Выполняется одним запросом ``DELETE ... RETURNING id`` без предварительной загрузки
+        (при ``USER_SOFT_DELETE`` - ``UPDATE``, помечающим ``deleted_at``).
+        
         Args:
             user_id: Идентификатор пользователя.
             
@@ -150,9 +732,72 @@ class UserService:
             NotFoundException: Если пользователь не найден.
             SQLAlchemyError: При ошибках удаления.
         """
-        user = await self.user_repository.get(user_id)
-        if not user:
+        deleted_id = await self.user_repository.delete_returning(user_id, settings.USER_SOFT_DELETE)
+        if deleted_id is None:
             raise NotFoundException("User not found")
+        await self._commit()
+        await self._forget_deleted([user_id])
+
+    async def delete_users(self, data: UserBulkDelete) -> BulkDeleteResult:
+        """Удаляет пользователей по списку ID или по фильтру.
+        
+        Удаление идет порциями по ``BULK_DELETE_CHUNK_SIZE`` пользователей:
+        каждая порция - один запрос ``WHERE id = ANY(...)`` и своя короткая
+        транзакция, поэтому блокировки не копятся, а уже удаленные порции
+        остаются удаленными при ошибке в следующей. По фильтру ID выбираются
+        порциями по возрастанию. При ``USER_SOFT_DELETE`` пользователи
+        помечаются ``deleted_at``.
+        
+        Args:
+            data: Список ID или фильтр.
+            
+        Returns:
+            BulkDeleteResult: Количество удаленных, порций и ненайденные ID.
             
-        await self.user_repository.delete(user_id)
-        await self.user_repository.session.commit()
\ No newline at end of file
+        Raises:
+            ValidationException: Если задано не ровно одно из ``ids`` и ``filter``,
+                фильтр пустой или ID больше ``BULK_DELETE_MAX_IDS``.
+        """
+        if (data.ids is None) == (data.filter is None):
+            raise ValidationException("Exactly one of ids and filter is required")
+        chunk_size = settings.BULK_DELETE_CHUNK_SIZE
+        soft = settings.USER_SOFT_DELETE
+        deleted = chunks = 0
+
+        if data.ids is not None:
+            if len(data.ids) > settings.BULK_DELETE_MAX_IDS:
+                raise ValidationException(f"Too many ids: {len(data.ids)} > {settings.BULK_DELETE_MAX_IDS}")
+            unique_ids = list(dict.fromkeys(data.ids))
+            found: set[int] = set()
+            for start in range(0, len(unique_ids), chunk_size):
+                deleted_ids = await self.user_repository.delete_many(unique_ids[start:start + chunk_size], soft)
+                await self._commit()
+                await self._forget_deleted(deleted_ids)
+                found.update(deleted_ids)
+                chunks += 1
+            missing = [user_id for user_id in unique_ids if user_id not in found]
+            return BulkDeleteResult(deleted=len(found), chunks=chunks, soft=soft, missing=missing)
+
+        criteria = msgspec.structs.asdict(data.filter)
+        if all(value is None for value in criteria.values()):
+            raise ValidationException("Filter must have at least one condition")
+        after_id = None
+        while ids := await self.user_repository.list_ids(**criteria, after_id=after_id, limit=chunk_size):
+            deleted_ids = await self.user_repository.delete_many(ids, soft)
+            await self._commit()
+            await self._forget_deleted(deleted_ids)
+            deleted += len(deleted_ids)
+            chunks += 1
+            if len(ids) < chunk_size:
+                break
+            after_id = ids[-1]
+        return BulkDeleteResult(deleted=deleted, chunks=chunks, soft=soft)
+
+    async def _forget_deleted(self, user_ids: list[int]) -> None:
+        """Убирает удаленных пользователей из кешей (их токены отклоняет :meth:`authenticate`)."""
+        if not user_ids:
+            return
+        user_count_strategy.invalidate()
+        for user_id in user_ids:
+            await self.cache.invalidate(user_id)
+            self.coalescer.forget("user", user_id)
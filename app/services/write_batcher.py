@@ -0,0 +1,191 @@
+import asyncio
+import logging
+from typing import AsyncContextManager, Callable
+
+import msgspec
+
+from app.repositories.contract import UserRepositoryContract, UserRow
+from app.services.metrics import MetricsWriter, register
+
+logger = logging.getLogger(__name__)
+
+
+class CreateBatchStats(msgspec.Struct):
+    """Счетчики пакетной вставки пользователей."""
+    items: int = 0
+    """Пользователей, переданных в пакетную вставку."""
+    batches: int = 0
+    """Выполненных пакетов (многострочных INSERT)."""
+    commits: int = 0
+    """Зафиксированных транзакций, включая поштучные повторы."""
+    failed_batches: int = 0
+    """Пакетов, в которых многострочная вставка завершилась ошибкой."""
+    failed_items: int = 0
+    """Пользователей, получивших ошибку."""
+
+
+# Счетчики процесса для /metrics (все экземпляры CreateBatcher пишут сюда)
+create_batch_stats = CreateBatchStats()
+
+
+@register
+def _collect_create_batch_metrics(writer: MetricsWriter) -> None:
+    for name, value, help_text in (
+        ("create_batch_items_total", create_batch_stats.items, "Users submitted to batched inserts."),
+        ("create_batch_batches_total", create_batch_stats.batches, "Batched multi-row inserts."),
+        ("create_batch_commits_total", create_batch_stats.commits, "Transactions committed by batched inserts."),
+        ("create_batch_failed_batches_total", create_batch_stats.failed_batches, "Batches whose insert failed."),
+        ("create_batch_failed_items_total", create_batch_stats.failed_items, "Users whose batched insert failed."),
+    ):
+        writer.metric(name, "counter", help_text, value)
+
+
+class CreateBatcher:
+    """Объединение одновременных созданий пользователей в пакеты.
+
+    Вызовы :meth:`submit` копятся в очереди процесса; пакет записывается одним
+    многострочным INSERT в одной транзакции, когда набралось ``max_size``
+    элементов или прошло ``max_delay`` секунд с первого элемента. Пока пакет
+    пишется, следующие вызовы копятся в новый пакет. Каждый вызов получает
+    свою строку или ошибку.
+
+    Если пакет не записался, при ``isolate_failures`` его элементы пишутся
+    по одному в отдельных транзакциях, и ошибку получают только виновные;
+    иначе ошибку получают все элементы пакета.
+
+    Работает в одном event loop, поэтому блокировки не нужны.
+    """
+
+    def __init__(
+        self,
+        repository_context: Callable[[], AsyncContextManager[UserRepositoryContract]],
+        max_size: int = 100,
+        max_delay: float = 0.005,
+        isolate_failures: bool = True,
+        stats: CreateBatchStats | None = None,
+    ):
+        """Инициализация.
+
+        Args:
+            repository_context: Открывает репозиторий с собственным соединением.
+            max_size: Максимальный размер пакета.
+            max_delay: Максимальное ожидание пакета после первого элемента, секунды.
+            isolate_failures: Повторять неудачный пакет поштучно.
+            stats: Счетчики. По умолчанию общие счетчики процесса.
+        """
+        self.repository_context = repository_context
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.isolate_failures = isolate_failures
+        self.stats = stats if stats is not None else create_batch_stats
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._worker: asyncio.Task | None = None
+        self._has_items = asyncio.Event()
+        self._full = asyncio.Event()
+        self._closing = False
+
+    async def submit(self, row: dict) -> UserRow:
+        """Ставит пользователя в очередь и ждет записи его пакета.
+
+        Args:
+            row: Колонки ``name``, ``surname``, ``password`` (пароль уже захеширован).
+
+        Returns:
+            UserRow: Созданная строка.
+
+        Raises:
+            Exception: Ошибка записи этого пользователя (или всего пакета).
+        """
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((row, future))
+        self._has_items.set()
+        if len(self._pending) >= self.max_size:
+            self._full.set()
+        return await future
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and not self._worker.done():
+            if self._worker.get_loop() is asyncio.get_running_loop():
+                return
+            # Новый event loop (например, перезапуск приложения в тестах)
+            self._pending = []
+            self._has_items = asyncio.Event()
+            self._full = asyncio.Event()
+        self._closing = False
+        self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_items.wait()
+            if not self._pending and self._closing:
+                return
+            if len(self._pending) < self.max_size and not self._closing:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+                except TimeoutError:
+                    pass
+
+            batch, self._pending = self._pending[:self.max_size], self._pending[self.max_size:]
+            if len(self._pending) < self.max_size:
+                self._full.clear()
+            if not self._pending and not self._closing:
+                self._has_items.clear()
+            if batch:
+                await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        """Записывает пакет; при ошибке - поштучно или с ошибкой для всех."""
+        self.stats.items += len(batch)
+        self.stats.batches += 1
+        try:
+            async with self.repository_context() as repository:
+                rows = await repository.insert_many([row for row, _ in batch])
+                await repository.commit()
+        except Exception as exc:
+            self.stats.failed_batches += 1
+            if not self.isolate_failures or len(batch) == 1:
+                self.stats.failed_items += len(batch)
+                for _, future in batch:
+                    _set_exception(future, exc)
+                return
+            logger.warning("Create batch of %s failed, retrying one by one", len(batch), exc_info=True)
+            for row, future in batch:
+                await self._insert_one(row, future)
+            return
+
+        self.stats.commits += 1
+        for (_, future), created in zip(batch, rows):
+            if not future.done():
+                future.set_result(created)
+
+    async def _insert_one(self, row: dict, future: asyncio.Future) -> None:
+        try:
+            async with self.repository_context() as repository:
+                created = (await repository.insert_many([row]))[0]
+                await repository.commit()
+        except Exception as exc:
+            self.stats.failed_items += 1
+            _set_exception(future, exc)
+            return
+        self.stats.commits += 1
+        if not future.done():
+            future.set_result(created)
+
+    async def close(self) -> None:
+        """Записывает накопленные элементы и останавливает обработчик очереди."""
+        if self._worker is None or self._worker.done():
+            return
+        if self._worker.get_loop() is not asyncio.get_running_loop():
+            # Обработчик принадлежит другому event loop и дописывает пакеты сам
+            return
+        self._closing = True
+        self._has_items.set()
+        self._full.set()
+        await self._worker
+
+
+def _set_exception(future: asyncio.Future, exc: Exception) -> None:
+    # Вызывающий мог быть отменен (клиент отключился) - результат ему не нужен
+    if not future.done():
+        future.set_exception(exc)
@@ -0,0 +1,120 @@
+"""Бенчмарк: задержки под перегрузкой с контролем допуска и без него.
+
+Запросы приходят с постоянной частотой ``--rate`` в секунду (открытая
+нагрузка: новые запросы не ждут завершения старых) в течение ``--duration``
+секунд. Каждый запрос - медленный поиск по подстроке (полный просмотр
+таблицы из ``--rows`` строк), пул - ``--pool-size`` соединений, поэтому
+частота выше пропускной способности БД и запросы копятся в очереди к пулу.
+
+Для выключенного и включенного ``AdmissionMiddleware`` сравниваются p50/p99
+успешных ответов (всех и после ``--warmup`` секунд), количество и p99
+отказов (503) и ошибок (таймаут пула).
+
+БД выбирается как в ``benchmarks.api_suite``::
+
+    python -m benchmarks.admission --rows 200000 --rate 100 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import time
+
+from benchmarks.api_suite import choose_database, percentile
+from benchmarks.auth import call
+
+# Подстрока короче триграммы и без совпадений: полный просмотр таблицы
+SLOW_PATH = "/api/v1/users/search"
+SLOW_QUERY = b"q=zz&mode=substring&limit=20"
+
+
+async def overload(app, rate: float, duration: float, warmup: float) -> dict:
+    """Открытая нагрузка: ``rate`` запросов в секунду в течение ``duration`` секунд.
+
+    Кроме общих перцентилей считаются ``steady_*`` - по запросам, пришедшим
+    после первых ``warmup`` секунд (без очереди, накопленной до начала сброса).
+    """
+    latencies: dict[str, list[float]] = {"ok": [], "rejected": [], "error": [], "steady_ok": []}
+
+    async def one(arrived: float) -> None:
+        started = time.perf_counter()
+        status = await call(app, "GET", SLOW_PATH, query_string=SLOW_QUERY)
+        outcome = "ok" if status == 200 else "rejected" if status == 503 else "error"
+        latency = (time.perf_counter() - started) * 1000
+        latencies[outcome].append(latency)
+        if outcome == "ok" and arrived >= warmup:
+            latencies["steady_ok"].append(latency)
+
+    tasks = []
+    started = time.perf_counter()
+    for index in range(int(rate * duration)):
+        # Запросы запускаются по расписанию, а не по готовности предыдущих
+        delay = started + index / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(index / rate)))
+    await asyncio.gather(*tasks)
+
+    result = {"requests": len(tasks), "elapsed_s": round(time.perf_counter() - started, 2)}
+    for outcome, values in latencies.items():
+        result[outcome] = len(values)
+        if values:
+            result[f"{outcome}_p50_ms"] = round(statistics.median(values), 1)
+            result[f"{outcome}_p99_ms"] = round(percentile(values, 0.99), 1)
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--rate", type=float, default=100)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--pool-timeout", type=float, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    os.environ.update(
+        DATABASE_POOL_SIZE=str(args.pool_size),
+        DATABASE_MAX_OVERFLOW="0",
+        DATABASE_POOL_TIMEOUT=str(args.pool_timeout),
+        USER_CACHE_ENABLED="false",
+        SINGLE_FLIGHT_ENABLED="false",
+    )
+
+    await choose_database()
+    from litestar.testing import AsyncTestClient
+
+    from app.asgi import create_app
+    from app.config import settings
+    from app.deps.user_deps import user_service_context
+    from app.services.admission import admission_controller
+
+    results = {}
+    for enabled in (False, True):
+        settings.ADMISSION_ENABLED = enabled
+        app = create_app()
+        # Клиент нужен только для lifespan (on_startup/on_shutdown)
+        async with AsyncTestClient(app=app):
+            if not results:
+                async with user_service_context() as user_service:
+                    await user_service.user_repository.copy_many(
+                        [(f"name{i}", f"surname{i}", "x") for i in range(args.rows)]
+                    )
+                    await user_service.user_repository.commit()
+            result = await overload(app, args.rate, args.duration, args.warmup)
+            if enabled:
+                result["admission"] = {
+                    field: getattr(admission_controller.stats, field)
+                    for field in admission_controller.stats.__struct_fields__
+                }
+            results["admission" if enabled else "plain"] = result
+            # Очередь к пулу рассасывается до следующего прогона
+            await asyncio.sleep(args.pool_timeout)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
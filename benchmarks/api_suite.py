@@ -0,0 +1,226 @@
+"""Нагрузочный бенчмарк всех маршрутов UserController с сохранением результатов.
+
+Поднимает ``create_app()`` на локальной БД: ``DATABASE_URL``, если он задан,
+иначе локальный PostgreSQL из настроек ``DATABASE_*`` (если он доступен),
+иначе временная SQLite-база. Таблица заполняется ``--users`` пользователями,
+после чего каждый маршрут получает ``--requests`` запросов от
+``--concurrency`` параллельных клиентов.
+
+Для каждого маршрута сохраняются пропускная способность, p50/p95/p99
+задержки, число ошибок и память, выделенная на запрос (пик ``tracemalloc``
+сверх уровня до запроса, медиана по ``--alloc-samples`` последовательным
+запросам; измеряется отдельно, чтобы трассировка не искажала задержки).
+
+Запуск::
+
+    python -m benchmarks.api_suite --users 10000 --concurrency 32 --output results.json
+    python -m benchmarks.api_suite --baseline results.json --max-regression 0.15
+
+С ``--baseline`` прогон завершается с кодом 1, если у какого-либо маршрута
+пропускная способность упала или p95 вырос больше чем на ``--max-regression``.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable
+
+# Запрос маршрута: метод, путь и аргументы httpx
+RequestSpec = tuple[str, str, dict[str, Any]]
+
+API = "/api/v1/users"
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def choose_database() -> str:
+    """Выбирает БД до импорта движка (он создается при импорте ``app.db.session``)."""
+    from app.config import settings
+
+    if not settings.DATABASE_URL:
+        try:
+            import asyncpg
+
+            connection = await asyncpg.connect(settings.asyncpg_dsn, timeout=1)
+            await connection.close()
+        except (OSError, asyncio.TimeoutError):
+            settings.DATABASE_URL = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+    return settings.database_url
+
+
+def build_endpoints(ids: list[int], delete_ids: list[int]) -> dict[str, Callable[[int], RequestSpec]]:
+    """Запросы для каждого маршрута; удаляются только специально созданные пользователи."""
+    import_body = "".join(
+        json.dumps({"name": f"imp{i}", "surname": "bench", "password": "secret"}) + "\n" for i in range(100)
+    ).encode()
+    bulk_body = [{"name": f"bulk{i}", "surname": "bench", "password": "secret"} for i in range(10)]
+    return {
+        "get_user": lambda i: ("GET", f"{API}/{random.choice(ids)}", {}),
+        "list_offset": lambda i: ("GET", API, {"params": {"page": random.randint(1, 10), "page_size": 100}}),
+        "list_offset_no_total": lambda i: ("GET", API, {"params": {"page_size": 100, "with_total": "false"}}),
+        "list_cursor": lambda i: ("GET", API, {"params": {"cursor": "", "page_size": 100}}),
+        "export_ndjson": lambda i: ("GET", f"{API}/export", {}),
+        "update_user": lambda i: ("PUT", f"{API}/{random.choice(ids)}", {"json": {"name": f"upd{i}"}}),
+        "create_user": lambda i: ("POST", API, {"json": {"name": f"new{i}", "surname": "bench", "password": "secret"}}),
+        "create_bulk_10": lambda i: ("POST", f"{API}/bulk", {"json": bulk_body}),
+        "import_100": lambda i: ("POST", f"{API}/import", {"content": import_body}),
+        "delete_user": lambda i: ("DELETE", f"{API}/{delete_ids[i]}", {}),
+    }
+
+
+async def run_endpoint(client, make_request: Callable[[int], RequestSpec], requests: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    indexes = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in indexes:
+            method, url, kwargs = make_request(index)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+    }
+
+
+async def measure_allocations(client, make_request: Callable[[int], RequestSpec], samples: int, offset: int) -> float:
+    """Медиана пиковой памяти на запрос, КиБ."""
+    peaks: list[float] = []
+    tracemalloc.start()
+    try:
+        for index in range(offset, offset + samples):
+            method, url, kwargs = make_request(index)
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await client.request(method, url, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append((peak - before) / 1024)
+    finally:
+        tracemalloc.stop()
+    return round(statistics.median(peaks), 1)
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Сравнивает прогон с базовым и возвращает список регрессий."""
+    failures = []
+    for name, current in results["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(name)
+        if base is None:
+            continue
+        if current["rps"] < base["rps"] * (1 - max_regression):
+            failures.append(f"{name}: rps {base['rps']} -> {current['rps']}")
+        if current["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            failures.append(f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+    return failures
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=2000, help="Запросов на маршрут")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--alloc-samples", type=int, default=50)
+    parser.add_argument("--endpoints", nargs="*", help="Только перечисленные маршруты")
+    parser.add_argument("--output", help="Файл для результатов в JSON")
+    parser.add_argument("--baseline", help="JSON предыдущего прогона для сравнения")
+    parser.add_argument("--max-regression", type=float, default=0.10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    random.seed(args.seed)
+
+    database_url = await choose_database()
+    from litestar.testing import AsyncTestClient
+
+    from app.asgi import create_app
+    from app.deps.user_deps import user_service_context
+    from app.services.security import hash_password, password_hasher
+
+    total_requests = args.requests + args.alloc_samples
+    async with AsyncTestClient(app=create_app(), timeout=None) as client:
+        # Заполнение таблицы напрямую через репозиторий: один хеш на всех, без пула хеширования
+        async with user_service_context() as user_service:
+            repository = user_service.user_repository
+            password = hash_password("secret")
+            await repository.copy_many(
+                [(f"name{i}", "bench", password) for i in range(args.users + total_requests)]
+            )
+            await repository.commit()
+            rows, _, _ = await repository.list_paginated(1, args.users + total_requests, with_total=False)
+        all_ids = sorted(row[0] for row in rows)
+        ids, delete_ids = all_ids[:args.users], all_ids[args.users:]
+
+        endpoints = build_endpoints(ids, delete_ids)
+        selected = args.endpoints or list(endpoints)
+        results: dict[str, Any] = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "git_revision": git_revision(),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "database": database_url.split("://", 1)[0],
+                "users": args.users,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+            },
+            "endpoints": {},
+        }
+        for name in selected:
+            result = await run_endpoint(client, endpoints[name], args.requests, args.concurrency)
+            result["alloc_kib_per_request"] = await measure_allocations(
+                client, endpoints[name], args.alloc_samples, offset=args.requests
+            )
+            results["endpoints"][name] = result
+            print(json.dumps({"endpoint": name, **result}), file=sys.stderr)
+
+    password_hasher.shutdown()
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            failures = compare(results, json.load(file), args.max_regression)
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,129 @@
+"""Бенчмарк: аутентифицированные запросы в секунду.
+
+Сравниваются два способа аутентификации одного и того же пользователя
+при ``--concurrency`` одновременных клиентах:
+
+- ``password`` - пароль проверяется на каждом запросе (``POST /auth/login``,
+  PBKDF2 с ``PASSWORD_HASH_ITERATIONS`` итераций);
+- ``token`` - токен из ``/auth/login`` предъявляется в ``GET /auth/me``
+  (HMAC и версия токенов из БД по первичному ключу, пользователь из кеша).
+
+Также замеряется :meth:`UserService.authenticate` без HTTP. БД выбирается как в
+``benchmarks.api_suite``::
+
+    python -m benchmarks.auth --password-requests 200 --token-requests 20000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import time
+
+from benchmarks.api_suite import choose_database, percentile
+
+API = "/api/v1/auth"
+
+
+async def call(
+    app,
+    method: str,
+    path: str,
+    body: bytes = b"",
+    headers: list | None = None,
+    query_string: bytes = b"",
+) -> int:
+    """Вызывает ASGI-приложение напрямую (одновременные запросы в одном event loop)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": query_string,
+        "headers": [(b"content-type", b"application/json"), *(headers or [])],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def load(app, requests: int, concurrency: int, method: str, path: str, **kwargs) -> dict:
+    """``requests`` запросов от ``concurrency`` одновременных клиентов."""
+    latencies: list[float] = []
+    remaining = iter(range(requests))
+
+    async def client() -> None:
+        for _ in remaining:
+            started = time.perf_counter()
+            status = await call(app, method, path, **kwargs)
+            if status != 200:
+                raise RuntimeError(f"{method} {path}: HTTP {status}")
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--password-requests", type=int, default=200)
+    parser.add_argument("--token-requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    os.environ.setdefault("PASSWORD_HASH_MAX_QUEUE", str(args.concurrency))
+
+    await choose_database()
+    from litestar.testing import AsyncTestClient
+
+    from app.asgi import create_app
+    from app.config import settings
+    from app.deps.user_deps import user_service_context
+    from app.services.security import hash_password_async
+    from app.services.tokens import token_service
+
+    app = create_app()
+    # Клиент нужен только для lifespan (on_startup/on_shutdown)
+    async with AsyncTestClient(app=app):
+        async with user_service_context() as user_service:
+            row = {"name": "bench", "surname": "auth", "password": await hash_password_async("secret")}
+            user_id = (await user_service.user_repository.insert_many([row]))[0][0]
+            await user_service.user_repository.commit()
+        credentials = json.dumps({"user_id": user_id, "password": "secret"}).encode()
+        token, _ = token_service.issue(user_id, 0)
+        authorization = [(b"authorization", f"Bearer {token}".encode())]
+
+        results = {
+            "password_hash_iterations": settings.PASSWORD_HASH_ITERATIONS,
+            "password": await load(
+                app, args.password_requests, args.concurrency, "POST", f"{API}/login", body=credentials
+            ),
+            "token": await load(
+                app, args.token_requests, args.concurrency, "GET", f"{API}/me", headers=authorization
+            ),
+        }
+
+        async with user_service_context() as user_service:
+            started = time.perf_counter()
+            for _ in range(args.token_requests):
+                await user_service.authenticate(token)
+        results["token_verify_per_s"] = round(args.token_requests / (time.perf_counter() - started), 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,63 @@
+"""Бенчмарк: пакетное создание пользователей против одиночного.
+
+Поднимает приложение на временной SQLite-базе (или на ``DATABASE_URL``, если
+он задан) и сравнивает пользователей в секунду для ``POST /users`` и
+``POST /users/bulk``.
+
+Запуск::
+
+    PASSWORD_HASH_ITERATIONS=1000 python -m benchmarks.bulk_create --users 2000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+import httpx
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    db_dir = tempfile.mkdtemp()
+    os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{db_dir}/bench.db")
+    from app.asgi import create_app
+
+    app = create_app()
+    payload = [{"name": f"name{i}", "surname": "bench", "password": f"secret{i}"} for i in range(args.users)]
+
+    async with app.lifespan():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            queue = list(payload)
+
+            async def creator() -> None:
+                while queue:
+                    response = await client.post("/api/v1/users", json=queue.pop())
+                    response.raise_for_status()
+
+            started = time.perf_counter()
+            await asyncio.gather(*(creator() for _ in range(args.concurrency)))
+            single = time.perf_counter() - started
+
+            started = time.perf_counter()
+            response = await client.post("/api/v1/users/bulk", json=payload)
+            response.raise_for_status()
+            bulk = time.perf_counter() - started
+
+    print({
+        "users": args.users,
+        "single_users_per_sec": round(args.users / single, 1),
+        "bulk_users_per_sec": round(args.users / bulk, 1),
+        "speedup": round(single / bulk, 2),
+    })
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""Бенчмарк: удаление пользователей по одному, пакетом и мягкое пакетное.
+
+Для каждого способа загружается ``--users`` пользователей и удаляется:
+
+- ``single`` - ``DELETE /users/{id}`` на каждого, ``--concurrency`` клиентов;
+- ``bulk`` - ``POST /users/bulk-delete`` со списком ID (порции по
+  ``BULK_DELETE_CHUNK_SIZE``, ``DELETE ... WHERE id = ANY(...)``);
+- ``bulk_soft`` - то же при ``USER_SOFT_DELETE`` (``UPDATE ... SET deleted_at``);
+  отдельно замеряется очистка (``purge_ms``).
+
+БД выбирается как в ``benchmarks.api_suite``::
+
+    python -m benchmarks.bulk_delete --users 20000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+from benchmarks.api_suite import choose_database
+from benchmarks.auth import call
+
+API = "/api/v1/users"
+
+
+async def seed(count: int) -> list[int]:
+    """Загружает ``count`` пользователей и возвращает их ID."""
+    from app.deps.user_deps import user_repository_context
+
+    async with user_repository_context() as repository:
+        after_id = max(await repository.list_ids(surname="bulk-delete") or [0])
+        await repository.copy_many([(f"name{i}", "bulk-delete", "x") for i in range(count)])
+        await repository.commit()
+        return await repository.list_ids(surname="bulk-delete", after_id=after_id, limit=count)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    os.environ.update(BULK_DELETE_MAX_IDS=str(args.users), PURGE_INTERVAL="0")
+
+    await choose_database()
+    from litestar.testing import AsyncTestClient
+
+    from app.asgi import create_app
+    from app.config import settings
+    from app.deps.user_deps import user_repository_context
+    from app.services.purge import PurgeJob
+
+    app = create_app()
+    results = {"users": args.users, "chunk_size": settings.BULK_DELETE_CHUNK_SIZE}
+    # Клиент нужен только для lifespan (on_startup/on_shutdown)
+    async with AsyncTestClient(app=app):
+        ids = await seed(args.users)
+        remaining = iter(ids)
+
+        async def deleter() -> None:
+            for user_id in remaining:
+                status = await call(app, "DELETE", f"{API}/{user_id}")
+                if status != 200:
+                    raise RuntimeError(f"DELETE {user_id}: HTTP {status}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(deleter() for _ in range(args.concurrency)))
+        results["single_per_s"] = round(args.users / (time.perf_counter() - started), 1)
+
+        for mode, soft in (("bulk", False), ("bulk_soft", True)):
+            settings.USER_SOFT_DELETE = soft
+            body = json.dumps({"ids": await seed(args.users)}).encode()
+            started = time.perf_counter()
+            status = await call(app, "POST", f"{API}/bulk-delete", body=body)
+            if status != 200:
+                raise RuntimeError(f"bulk-delete: HTTP {status}")
+            results[f"{mode}_per_s"] = round(args.users / (time.perf_counter() - started), 1)
+
+        # SQLite хранит время с точностью до секунды
+        await asyncio.sleep(1.1)
+        started = time.perf_counter()
+        purged = await PurgeJob(user_repository_context, older_than=0).run_once()
+        results["purge_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        results["purged"] = purged
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""Бенчмарк: синхронизация копии пользователей полной выгрузкой и лентой изменений.
+
+В таблице ``--rows`` пользователей; между синхронизациями изменяется
+``--changed`` из них (обновления и удаления пополам). Сравниваются:
+
+- ``full`` - повторная выгрузка всей таблицы (``GET /users/export``);
+- ``incremental`` - ``GET /users/changes`` от водяного знака прошлой
+  синхронизации страницами по ``--limit``.
+
+Для каждого способа - время синхронизации и объем ответов. БД выбирается
+как в ``benchmarks.api_suite``::
+
+    python -m benchmarks.change_feed --rows 100000 --changed 100
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+
+from benchmarks.api_suite import choose_database
+
+API = "/api/v1/users"
+
+
+async def full_sync(client) -> dict:
+    """Выгружает всех пользователей."""
+    started = time.perf_counter()
+    response = await client.get(f"{API}/export")
+    return {
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+        "rows": response.text.count("\n"),
+        "bytes": len(response.content),
+    }
+
+
+async def incremental_sync(client, cursor: str | None, limit: int) -> tuple[dict, str | None]:
+    """Забирает изменения от водяного знака, пока ``has_more``."""
+    started = time.perf_counter()
+    changes = size = requests = 0
+    while True:
+        response = await client.get(f"{API}/changes", params={"since": cursor or "", "limit": limit})
+        page = response.json()
+        changes += len(page["items"])
+        size += len(response.content)
+        requests += 1
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            break
+    result = {
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+        "changes": changes,
+        "bytes": size,
+        "requests": requests,
+    }
+    return result, cursor
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--changed", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=1000)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    os.environ.update(USER_CACHE_ENABLED="false")
+
+    await choose_database()
+    from litestar.testing import AsyncTestClient
+
+    from app.asgi import create_app
+    from app.deps.user_deps import user_service_context
+
+    async with AsyncTestClient(app=create_app()) as client:
+        async with user_service_context() as user_service:
+            await user_service.user_repository.copy_many(
+                [(f"name{i}", f"surname{i}", "x") for i in range(args.rows)]
+            )
+            await user_service.user_repository.commit()
+        initial, cursor = await incremental_sync(client, None, args.limit)
+
+        response = await client.get(API, params={"page_size": 1000, "with_total": "false"})
+        ids = random.sample([user["id"] for user in response.json()["items"]], args.changed)
+        for user_id in ids[: args.changed // 2]:
+            await client.put(f"{API}/{user_id}", json={"name": "changed"})
+        for user_id in ids[args.changed // 2:]:
+            await client.delete(f"{API}/{user_id}")
+
+        results = {
+            "rows": args.rows,
+            "changed": args.changed,
+            "initial_feed": initial,
+            "full": await full_sync(client),
+            "incremental": (await incremental_sync(client, cursor, args.limit))[0],
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
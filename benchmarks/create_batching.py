@@ -0,0 +1,110 @@
+"""Бенчмарк: пакетная вставка одновременных ``POST /users``.
+
+``--rounds`` волн по ``--concurrency`` одновременных созданий пользователей
+с выключенной и включенной пакетной вставкой (``CREATE_BATCHING_ENABLED``).
+Сравниваются созданий в секунду, фиксаций транзакций в секунду и p50/p95
+задержки. Хеширование пароля ослаблено (``PASSWORD_HASH_ITERATIONS``), а его
+очередь расширена до ``--concurrency``, чтобы измерять запись, а не PBKDF2.
+
+БД выбирается как в ``benchmarks.api_suite``::
+
+    python -m benchmarks.create_batching --rounds 20 --concurrency 200 --max-size 100
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import time
+
+from benchmarks.api_suite import API, choose_database, percentile
+
+
+async def post(app, path: str, body: bytes) -> int:
+    """Вызывает ASGI-приложение напрямую (одновременные запросы в одном event loop)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def burst(app, rounds: int, concurrency: int, prefix: str) -> dict:
+    """``rounds`` волн по ``concurrency`` одновременных созданий."""
+    latencies: list[float] = []
+
+    async def one(number: int) -> None:
+        body = json.dumps({"name": f"{prefix}{number}", "surname": "bench", "password": "secret"}).encode()
+        started = time.perf_counter()
+        status = await post(app, API, body)
+        if status != 201:
+            raise RuntimeError(f"POST {API}: HTTP {status}")
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    for wave in range(rounds):
+        await asyncio.gather(*(one(wave * concurrency + i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "creates_per_s": round(len(latencies) / elapsed, 1),
+        "elapsed_s": elapsed,
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--max-size", type=int, default=100)
+    parser.add_argument("--max-delay", type=float, default=0.005)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    os.environ.setdefault("PASSWORD_HASH_ITERATIONS", "1000")
+    # Очередь хеширования не должна отклонять волну запросов
+    os.environ.setdefault("PASSWORD_HASH_MAX_QUEUE", str(args.concurrency))
+
+    await choose_database()
+    from litestar.testing import AsyncTestClient
+
+    from app.asgi import create_app
+    from app.config import settings
+    from app.deps.user_deps import create_batcher
+    from app.services.write_batcher import create_batch_stats
+
+    create_batcher.max_size = args.max_size
+    create_batcher.max_delay = args.max_delay
+    results = {}
+    app = create_app()
+    # Клиент нужен только для lifespan (on_startup/on_shutdown)
+    async with AsyncTestClient(app=app):
+        for enabled in (False, True):
+            settings.CREATE_BATCHING_ENABLED = enabled
+            commits_before = create_batch_stats.commits
+            mode = "batched" if enabled else "plain"
+            result = await burst(app, args.rounds, args.concurrency, prefix=mode)
+            # Без пакетов каждое создание фиксирует свою транзакцию
+            commits = create_batch_stats.commits - commits_before if enabled else args.rounds * args.concurrency
+            result["commits"] = commits
+            result["commits_per_s"] = round(commits / result.pop("elapsed_s"), 1)
+            results[mode] = result
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""Бенчмарк: задержка GET-запросов во время параллельного хеширования паролей.
+
+Поднимает минимальное Litestar-приложение с двумя маршрутами: ``GET /ping`` и
+``POST /users``, который хеширует пароль либо синхронно в event loop (как раньше),
+либо через пул воркеров (``hash_password_async``). Во время потока создания
+пользователей измеряется p50/p99 задержки ``GET /ping``.
+
+Запуск::
+
+    python -m benchmarks.hashing_latency --creates 200 --concurrency 16
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+import httpx
+from litestar import Litestar, get, post
+
+from app.services.security import hash_password, hash_password_async, password_hasher
+
+# Интервал между GET-запросами фонового читателя, секунды
+GET_INTERVAL = 0.005
+
+
+@get("/ping", sync_to_thread=False)
+def ping() -> dict:
+    return {"status": "ok"}
+
+
+@post("/users/sync")
+async def create_sync() -> dict:
+    return {"hash": hash_password("password")}
+
+
+@post("/users/async")
+async def create_async() -> dict:
+    return {"hash": await hash_password_async("password")}
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def run(mode: str, creates: int, concurrency: int) -> dict:
+    app = Litestar(route_handlers=[ping, create_sync, create_async])
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue = list(range(creates))
+        done = asyncio.Event()
+
+        async def creator() -> None:
+            while queue:
+                queue.pop()
+                await client.post(f"/users/{mode}")
+
+        async def timed_get(scheduled: float) -> None:
+            await client.get("/ping")
+            # Задержка считается от запланированного момента (open-loop),
+            # чтобы учесть время, которое запрос простоял в заблокированном loop
+            latencies.append((time.perf_counter() - scheduled) * 1000)
+
+        async def reader() -> None:
+            requests: list[asyncio.Task] = []
+            scheduled = time.perf_counter()
+            while not done.is_set():
+                scheduled += GET_INTERVAL
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                requests.append(asyncio.create_task(timed_get(scheduled)))
+            await asyncio.gather(*requests)
+
+        reader_task = asyncio.create_task(reader())
+        started = time.perf_counter()
+        await asyncio.gather(*(creator() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await reader_task
+
+    return {
+        "mode": mode,
+        "creates_per_sec": round(creates / elapsed, 1),
+        "get_requests": len(latencies),
+        "get_p50_ms": round(statistics.median(latencies), 2),
+        "get_p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--creates", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    for mode in ("sync", "async"):
+        print(await run(mode, args.creates, args.concurrency))
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""Бенчмарк: накладные расходы MetricsMiddleware.
+
+Поднимает минимальное Litestar-приложение с ``GET /ping`` без middleware и с
+``MetricsMiddleware`` и сравнивает среднее время запроса при прямом вызове
+ASGI-приложения. Отдельно измеряется стоимость учета одного запроса (``RouteMetrics.observe``)
+и формирования ответа ``/metrics``.
+
+Запуск::
+
+    python -m benchmarks.metrics_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import time
+import timeit
+
+from litestar import Litestar, get
+
+from app.middleware.metrics import MetricsMiddleware
+from app.services.metrics import RequestMetrics, RequestStats
+
+
+@get("/ping", sync_to_thread=False)
+def ping() -> dict:
+    return {"status": "ok"}
+
+
+async def per_request_us(app: Litestar, requests: int) -> float:
+    """Среднее время запроса при прямом вызове ASGI-приложения (без HTTP-клиента)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/ping", "raw_path": b"/ping", "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    for _ in range(500):
+        await app(dict(scope), receive, send)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    # Чередуем прогоны, чтобы шум машины одинаково влиял на оба варианта
+    plain, instrumented = [], []
+    for _ in range(5):
+        plain.append(await per_request_us(Litestar(route_handlers=[ping]), args.requests))
+        instrumented.append(await per_request_us(
+            Litestar(route_handlers=[ping], middleware=[MetricsMiddleware()]), args.requests
+        ))
+
+    registry = RequestMetrics()
+    route = registry.route("GET", "/ping")
+    stats = RequestStats()
+    observe_us = min(timeit.repeat(lambda: route.observe(0.0012, 200, stats), number=100000, repeat=3)) * 10
+    for index in range(50):
+        registry.route("GET", f"/route/{index}").observe(0.01, 200, stats)
+    render_ms = min(timeit.repeat(registry.render, number=100, repeat=3)) * 10
+
+    print({
+        "request_us_plain": round(min(plain), 1),
+        "request_us_with_metrics": round(min(instrumented), 1),
+        "middleware_overhead_us": round(min(instrumented) - min(plain), 1),
+        "observe_us": round(observe_us, 2),
+        "render_50_routes_ms": round(render_ms, 2),
+    })
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
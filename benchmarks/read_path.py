@@ -0,0 +1,79 @@
+"""Микробенчмарк: строки в секунду для ORM- и Core-пути чтения страницы.
+
+Старый путь: ``select(User)`` -> ORM-объекты в identity map -> копирование в
+``UserOut`` -> JSON. Новый путь: ``select(*USER_OUT_COLUMNS)`` -> ``UserOut(*row)``
+-> JSON. Оба пути читают страницу из 1000 строк на временной SQLite-базе
+(или на ``DATABASE_URL``).
+
+Запуск::
+
+    python -m benchmarks.read_path --rows 1000 --iterations 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import msgspec
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp()
+    os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{db_dir}/bench.db")
+    from sqlalchemy import insert, select
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.config import settings
+    from app.models.user_model import User
+    from app.repositories.user_repo import USER_OUT_COLUMNS
+    from app.schemas.user_schema import UserOut
+
+    engine = create_async_engine(settings.database_url)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(User.metadata.create_all)
+        await conn.execute(
+            insert(User),
+            [{"name": f"name{i}", "surname": "bench", "password": "x"} for i in range(args.rows)],
+        )
+
+    encoder = msgspec.json.Encoder()
+
+    async def orm_path() -> bytes:
+        async with session_maker() as session:
+            result = await session.execute(select(User).order_by(User.id).limit(args.rows))
+            users = result.scalars().all()
+            return encoder.encode([
+                UserOut(
+                    id=int(user.id),
+                    name=user.name,
+                    surname=user.surname,
+                    created_at=user.created_at,
+                    updated_at=user.updated_at
+                ) for user in users
+            ])
+
+    async def core_path() -> bytes:
+        async with session_maker() as session:
+            result = await session.execute(select(*USER_OUT_COLUMNS).order_by(User.id).limit(args.rows))
+            return encoder.encode([UserOut(*row) for row in result.all()])
+
+    for name, path in (("orm", orm_path), ("core", core_path)):
+        await path()  # прогрев
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            await path()
+        elapsed = time.perf_counter() - started
+        print({"path": name, "rows_per_sec": round(args.rows * args.iterations / elapsed)})
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,183 @@
+"""Бенчмарк: пропускная способность и p99 granian (``python -m app.server``) и uvicorn.
+
+Для каждого сервера и количества воркеров из ``--workers`` запускается
+отдельный процесс сервера с ``STARTUP_MODE=production``; после готовности
+(``/health/ready``) и разогрева ``--processes`` процессов нагрузки держат
+``--connections`` keep-alive соединений HTTP/1.1 и ``--duration`` секунд
+запрашивают ``GET /api/v1/users/<случайный id>``. Сравниваются запросы в
+секунду, p50/p99 и время остановки по SIGTERM.
+
+uvicorn запускается как сейчас, с ``--workers``. БД - ``DATABASE_URL`` со
+схемой, созданной заранее, иначе временная SQLite-база. Нагрузка и сервер
+делят процессор: на машине с N ядрами осмысленны до N/2 воркеров::
+
+    python -m benchmarks.server --workers 1 2 4 8 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.api_suite import percentile
+from benchmarks.startup import prepare_database
+
+API = "/api/v1/users"
+HOST = "127.0.0.1"
+
+
+def server_command(server: str, workers: int, port: int) -> list[str]:
+    if server == "granian":
+        return [sys.executable, "-m", "app.server"]
+    return [
+        sys.executable, "-m", "uvicorn", "--factory", "app.asgi:create_app",
+        "--host", HOST, "--port", str(port), "--workers", str(workers),
+        "--no-access-log", "--log-level", "warning",
+    ]
+
+
+async def fetch(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, path: str) -> int:
+    """Отправляет GET по keep-alive соединению и читает ответ; возвращает статус."""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\n\r\n".encode())
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(head.split(b" ", 2)[1])
+
+
+async def load(port: int, connections: int, duration: float, ids: list[int]) -> tuple[list[float], int]:
+    """``connections`` соединений запрашивают случайных пользователей ``duration`` секунд."""
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def connection() -> None:
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(HOST, port)
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                if await fetch(reader, writer, f"{API}/{random.choice(ids)}") == 200:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors += 1
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(connection() for _ in range(connections)))
+    return latencies, errors
+
+
+def load_process(port: int, connections: int, duration: float, ids: list[int]) -> tuple[list[float], int]:
+    return asyncio.run(load(port, connections, duration, ids))
+
+
+def run_load(port: int, processes: int, connections: int, duration: float, ids: list[int]) -> dict:
+    """Нагрузка из нескольких процессов, чтобы клиент не упирался в одно ядро."""
+    per_process = [connections // processes + (index < connections % processes) for index in range(processes)]
+    with ProcessPoolExecutor(processes) as pool:
+        results = list(pool.map(load_process, *zip(*((port, count, duration, ids) for count in per_process))))
+    latencies = [latency for result in results for latency in result[0]]
+    return {
+        "rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "errors": sum(result[1] for result in results),
+    }
+
+
+def wait_ready(port: int, workers: int, timeout: float = 60) -> None:
+    """Ждет ``/health/ready`` 200 подряд несколько раз: запросы попадают в разные воркеры."""
+    import urllib.error
+    import urllib.request
+
+    deadline = time.monotonic() + timeout
+    streak = 0
+    while streak < workers * 4:
+        if time.monotonic() > deadline:
+            raise TimeoutError("server is not ready")
+        try:
+            with urllib.request.urlopen(f"http://{HOST}:{port}/health/ready", timeout=1) as response:
+                streak = streak + 1 if response.status == 200 else 0
+        except (urllib.error.URLError, ConnectionError):
+            streak = 0
+            time.sleep(0.1)
+
+
+def seed(database_url: str, rows: int) -> list[int]:
+    """Добавляет пользователей, если их меньше ``rows``; возвращает их ID."""
+    from sqlalchemy import create_engine, func, select
+
+    from app.models.user_model import User
+
+    engine = create_engine(database_url.replace("+aiosqlite", "").replace("+asyncpg", "+psycopg2"))
+    with engine.begin() as connection:
+        missing = rows - connection.scalar(select(func.count()).select_from(User))
+        if missing > 0:
+            connection.execute(
+                User.__table__.insert(),
+                [{"name": f"name{i}", "surname": "bench", "password": "x"} for i in range(missing)],
+            )
+        ids = list(connection.scalars(select(User.id).limit(rows)))
+    engine.dispose()
+    return ids
+
+
+def bench(server: str, workers: int, args, env: dict[str, str], ids: list[int]) -> dict:
+    env = {**env, "SERVER_WORKERS": str(workers), "APP_PORT": str(args.port)}
+    process = subprocess.Popen(
+        server_command(server, workers, args.port), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(args.port, workers)
+        run_load(args.port, args.processes, args.connections, args.warmup, ids)
+        result = run_load(args.port, args.processes, args.connections, args.duration, ids)
+    finally:
+        started = time.perf_counter()
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+        stop_ms = round((time.perf_counter() - started) * 1000, 1)
+    return {**result, "stop_ms": stop_ms}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--servers", nargs="+", default=["uvicorn", "granian"], choices=["uvicorn", "granian"])
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--processes", type=int, default=max(1, min(4, (os.cpu_count() or 1) // 2)))
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--port", type=int, default=18088)
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "STARTUP_MODE": "production",
+        "APP_HOST": HOST,
+        "AUTH_TOKEN_SECRET": os.environ.get("AUTH_TOKEN_SECRET", "bench"),
+    }
+    prepare_database(env)
+    ids = seed(env["DATABASE_URL"], args.rows)
+
+    results = {
+        server: {str(workers): bench(server, workers, args, env, ids) for workers in args.workers}
+        for server in args.servers
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Бенчмарк: объединение одновременных одинаковых чтений (single-flight).
+
+``--concurrency`` клиентов одновременно запрашивают один и тот же
+``GET /users/{id}`` (кеш пользователей отключен) и первую страницу
+``GET /users``. Каждый сценарий выполняется с выключенным и включенным
+объединением; сравниваются запросы в секунду, p95 и количество запросов к
+БД (счетчики ``single_flight``).
+
+БД выбирается как в ``benchmarks.api_suite``::
+
+    python -m benchmarks.single_flight --rounds 50 --concurrency 200
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import time
+
+from benchmarks.api_suite import choose_database, percentile
+
+
+async def request(app, path: str) -> int:
+    """Вызывает ASGI-приложение напрямую и возвращает статус ответа.
+
+    Тестовый клиент выполняет запросы по одному, а здесь нужны действительно
+    одновременные запросы в одном event loop.
+    """
+    url, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": url, "raw_path": url.encode(), "root_path": "",
+        "query_string": query.encode(), "headers": [], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def burst(app, path: str, rounds: int, concurrency: int) -> dict:
+    """``rounds`` волн по ``concurrency`` одновременных одинаковых запросов."""
+    latencies: list[float] = []
+
+    async def one() -> None:
+        started = time.perf_counter()
+        status = await request(app, path)
+        if status != 200:
+            raise RuntimeError(f"{path}: HTTP {status}")
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*(one() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    os.environ["USER_CACHE_ENABLED"] = "false"
+
+    await choose_database()
+    from litestar.testing import AsyncTestClient
+
+    from app.asgi import create_app
+    from app.deps.user_deps import user_service_context
+    from app.services.single_flight import single_flight
+
+    results = {}
+    app = create_app()
+    # Клиент нужен только для lifespan (on_startup/on_shutdown)
+    async with AsyncTestClient(app=app):
+        async with user_service_context() as user_service:
+            await user_service.user_repository.copy_many([(f"name{i}", "bench", "x") for i in range(args.rows)])
+            await user_service.user_repository.commit()
+            user_id = (await user_service.user_repository.list_paginated(1, 1, with_total=False))[0][0][0]
+
+        for name, url, kind in (
+            ("get_user", f"/api/v1/users/{user_id}", "user"),
+            ("list_first_page", "/api/v1/users?page_size=100&with_total=false", "list"),
+        ):
+            for enabled in (False, True):
+                single_flight.enabled = enabled
+                stats = single_flight.stats_for(kind)
+                executions_before = stats.executions
+                result = await burst(app, url, args.rounds, args.concurrency)
+                requests = args.rounds * args.concurrency
+                # Без объединения каждый запрос выполняет свой запрос к БД
+                result["db_calls"] = stats.executions - executions_before if enabled else requests
+                results[f"{name}_{'coalesced' if enabled else 'plain'}"] = result
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
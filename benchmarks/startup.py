@@ -0,0 +1,128 @@
+"""Бюджет времени старта: импорт приложения и время до первого запроса.
+
+Каждый прогон - отдельный процесс с ``STARTUP_MODE=production``:
+
+- ``import_ms`` - ``import app.asgi``;
+- ``create_app_ms`` - ``create_app()``;
+- ``first_request_ms`` - от начала импорта до первого ответа ``GET /health``;
+- ``ready_ms`` - от начала импорта до 200 от ``GET /health/ready`` (пул прогрет);
+- ``process_ms`` - от запуска интерпретатора до готовности (снаружи процесса).
+
+Берется медиана по ``--runs`` прогонам. БД - ``DATABASE_URL`` со схемой,
+созданной заранее, иначе временная SQLite-база (схема создается здесь).
+
+Запуск::
+
+    python -m benchmarks.startup                    # сравнить с startup_budget.json
+    python -m benchmarks.startup --update-budget    # записать текущие значения как бюджет
+
+Код выхода 1, если какое-либо значение превысило бюджет больше чем на
+``--tolerance`` (по умолчанию 25%). Бюджет зависит от машины: после смены
+окружения CI его нужно перезаписать.
+"""
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BUDGET_FILE = pathlib.Path(__file__).with_name("startup_budget.json")
+METRICS = ("import_ms", "create_app_ms", "first_request_ms", "ready_ms", "process_ms")
+
+
+async def child() -> None:
+    """Замеры внутри процесса приложения; результат - JSON в stdout."""
+    started = time.perf_counter()
+    import app.asgi
+    imported = time.perf_counter()
+    application = app.asgi.create_app()
+    created = time.perf_counter()
+
+    from litestar.testing import AsyncTestClient
+
+    async with AsyncTestClient(app=application) as client:
+        (await client.get("/health")).raise_for_status()
+        first_request = time.perf_counter()
+        while (await client.get("/health/ready")).status_code != 200:
+            await asyncio.sleep(0.005)
+        ready = time.perf_counter()
+
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "create_app_ms": (created - imported) * 1000,
+        "first_request_ms": (first_request - started) * 1000,
+        "ready_ms": (ready - started) * 1000,
+    }))
+
+
+def run_once(env: dict[str, str]) -> dict[str, float]:
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child"],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    # Время процесса включает запуск интерпретатора, но не завершение
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def prepare_database(env: dict[str, str]) -> None:
+    """Создает схему во временной SQLite-базе: в production create_all не выполняется."""
+    if env.get("DATABASE_URL"):
+        return
+    path = os.path.join(tempfile.mkdtemp(), "startup.db")
+    env["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    from sqlalchemy import create_engine
+
+    from app.models.user_model import User
+
+    engine = create_engine(f"sqlite:///{path}")
+    User.metadata.create_all(engine)
+    engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--budget", default=str(BUDGET_FILE))
+    parser.add_argument("--update-budget", action="store_true")
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(child())
+        return 0
+
+    env = {**os.environ, "STARTUP_MODE": "production"}
+    prepare_database(env)
+    runs = [run_once(env) for _ in range(args.runs)]
+    result = {metric: round(statistics.median(run[metric] for run in runs), 1) for metric in METRICS}
+    print(json.dumps(result, indent=2))
+
+    if args.update_budget:
+        with open(args.budget, "w") as file:
+            json.dump(result, file, indent=2)
+            file.write("\n")
+        return 0
+
+    with open(args.budget) as file:
+        budget = json.load(file)
+    failures = [
+        f"{metric}: {result[metric]}ms > {budget[metric]}ms + {args.tolerance:.0%}"
+        for metric in METRICS
+        if metric in budget and result[metric] > budget[metric] * (1 + args.tolerance)
+    ]
+    for failure in failures:
+        print(f"OVER BUDGET {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Общие фикстуры тестов.
+
+Тесты идут на временной SQLite-базе; варианты для PostgreSQL запускаются, если
+задан ``TEST_POSTGRES_URL`` (``postgresql+asyncpg://...``, база очищается), и
+иначе пропускаются.
+"""
+import os
+
+import asyncpg
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.models.user_model import User
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL", "")
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+async def create_engine(url: str) -> AsyncEngine:
+    """Движок с пустой схемой приложения."""
+    engine = create_async_engine(url)
+    async with engine.begin() as connection:
+        await connection.run_sync(User.metadata.drop_all)
+        await connection.run_sync(User.metadata.create_all)
+    return engine
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+async def engine(request, tmp_path) -> AsyncEngine:
+    """Движок SQLAlchemy с пустой схемой: SQLite и PostgreSQL (если доступен)."""
+    if request.param == "sqlite":
+        url = f"sqlite+aiosqlite:///{tmp_path / 'users.db'}"
+    elif POSTGRES_URL:
+        url = POSTGRES_URL
+    else:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = await create_engine(url)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_maker(engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+@pytest.fixture
+async def postgres_connection() -> asyncpg.Connection:
+    """Соединение asyncpg с пустой схемой приложения."""
+    if not POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = await create_engine(POSTGRES_URL)
+    await engine.dispose()
+    connection = await asyncpg.connect(POSTGRES_URL.replace("postgresql+asyncpg://", "postgresql://", 1))
+    yield connection
+    await connection.close()
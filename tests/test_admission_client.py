@@ -0,0 +1,35 @@
+import pytest
+
+from app.middleware.admission import AdmissionMiddleware
+
+
+def scope(*forwarded: bytes) -> dict:
+    return {
+        "headers": [(b"x-forwarded-for", value) for value in forwarded],
+        "client": ("10.0.0.1", 50000),
+    }
+
+
+@pytest.mark.parametrize(
+    ("trusted_proxies", "forwarded", "client"),
+    [
+        # Клиент подделал левую часть, прокси дописал реальный адрес справа
+        (1, [b"1.1.1.1, 203.0.113.7"], "203.0.113.7"),
+        (1, [b"203.0.113.7"], "203.0.113.7"),
+        # Два доверенных прокси: второй дописал адрес первого
+        (2, [b"1.1.1.1, 203.0.113.7, 10.0.0.2"], "203.0.113.7"),
+        # Повторы заголовка - одна цепочка
+        (2, [b"1.1.1.1, 203.0.113.7", b"10.0.0.2"], "203.0.113.7"),
+        # Цепочка короче числа прокси или пустая: адрес соединения
+        (2, [b"203.0.113.7"], "10.0.0.1"),
+        (1, [b" "], "10.0.0.1"),
+        (1, [], "10.0.0.1"),
+    ],
+)
+def test_client_is_nth_address_from_the_right(trusted_proxies, forwarded, client):
+    middleware = AdmissionMiddleware(client_header="X-Forwarded-For", trusted_proxies=trusted_proxies)
+    assert middleware._client(scope(*forwarded)) == client
+
+
+def test_client_without_header_setting_is_connection_address():
+    assert AdmissionMiddleware(client_header="")._client(scope(b"1.1.1.1")) == "10.0.0.1"
@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+from litestar.exceptions import HTTPException
+from litestar.status_codes import HTTP_410_GONE
+
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.anyio
+
+
+def new_user(name: str) -> dict:
+    return {"name": name, "surname": "feed", "password": "x"}
+
+
+async def read_feed(session_maker, cursor: str | None) -> tuple[list[str], str | None]:
+    """Дочитывает ленту от ``cursor``; возвращает имена и новый водяной знак."""
+    names = []
+    async with session_maker() as session:
+        service = UserService(session=session)
+        while True:
+            page = await service.get_changes(cursor, limit=2)
+            names.extend(change.user.name for change in page.items if change.user is not None)
+            cursor = page.next_cursor
+            if not page.has_more:
+                return names, cursor
+
+
+async def test_changes_are_read_in_write_order(session_maker):
+    async with session_maker() as session:
+        service = UserService(session=session)
+        created = await service.user_repository.insert_many([new_user("a"), new_user("b"), new_user("c")])
+        await service.user_repository.commit()
+        await service.user_repository.update_returning(created[0][0], {"name": "a2"})
+        await service.user_repository.delete_returning(created[1][0])
+        await service.user_repository.commit()
+
+    async with session_maker() as session:
+        page = await UserService(session=session).get_changes(None, limit=100)
+    assert [(change.id, change.deleted) for change in page.items] == [
+        (created[0][0], False), (created[1][0], True), (created[2][0], False),
+        (created[0][0], False), (created[1][0], True),
+    ]
+    assert not page.has_more
+
+
+async def test_password_rehash_is_not_a_change(session_maker):
+    async with session_maker() as session:
+        repository = UserService(session=session).user_repository
+        user_id = (await repository.insert_many([new_user("a")]))[0][0]
+        await repository.commit()
+        _, cursor = await read_feed(session_maker, None)
+        assert await repository.replace_password(user_id, "x", "y")
+        await repository.commit()
+    assert await read_feed(session_maker, cursor) == ([], cursor)
+
+
+async def test_slow_transaction_is_not_skipped(engine, session_maker):
+    async with session_maker() as session:
+        repository = UserService(session=session).user_repository
+        await repository.insert_many([new_user("first")])
+        await repository.commit()
+    names, cursor = await read_feed(session_maker, None)
+    assert names == ["first"]
+
+    async with session_maker() as slow:
+        slow_repository = UserService(session=slow).user_repository
+        await slow_repository.insert_many([new_user("slow")])
+        # Дольше прежнего окна в секунду по updated_at
+        await asyncio.sleep(1.5)
+        if engine.dialect.name == "postgresql":
+            # Более поздняя транзакция фиксируется раньше долгой
+            async with session_maker() as fast:
+                fast_repository = UserService(session=fast).user_repository
+                await fast_repository.insert_many([new_user("fast")])
+                await fast_repository.commit()
+        # Пока долгая транзакция не завершена, водяной знак не уходит дальше нее
+        names, cursor = await read_feed(session_maker, cursor)
+        assert names == []
+        await slow_repository.commit()
+
+    names, _ = await read_feed(session_maker, cursor)
+    expected = ["slow", "fast"] if engine.dialect.name == "postgresql" else ["slow"]
+    assert names == expected
+
+
+async def test_purge_keeps_latest_change_of_each_live_user(session_maker):
+    async with session_maker() as session:
+        repository = UserService(session=session).user_repository
+        created = await repository.insert_many([new_user("a"), new_user("b"), new_user("c")])
+        await repository.commit()
+        await repository.update_returning(created[0][0], {"name": "a2"})
+        await repository.delete_returning(created[1][0])
+        await repository.commit()
+        # Журнал хранит время с точностью до секунды
+        await asyncio.sleep(1.1)
+
+        purged, after_id = 0, None
+        while True:
+            count, after_id = await repository.purge_changes(0, after_id, limit=2)
+            await repository.commit()
+            purged += count
+            if after_id is None:
+                break
+
+    assert purged == 3
+    async with session_maker() as session:
+        page = await UserService(session=session).get_changes(None, limit=100)
+    assert [(change.id, change.user.name) for change in page.items] == [
+        (created[2][0], "c"), (created[0][0], "a2"),
+    ]
+
+
+async def test_cursor_behind_purged_delete_requires_resync(session_maker):
+    async with session_maker() as session:
+        repository = UserService(session=session).user_repository
+        created = await repository.insert_many([new_user("a"), new_user("b")])
+        await repository.commit()
+        _, stale = await read_feed(session_maker, None)
+        await repository.delete_returning(created[1][0])
+        await repository.commit()
+        _, current = await read_feed(session_maker, stale)
+        await asyncio.sleep(1.1)
+        await repository.purge_changes(0)
+        await repository.commit()
+        assert await repository.get_change_horizon() > (0, 0)
+
+    # Курсор после убранного удаления читается как прежде
+    assert await read_feed(session_maker, current) == ([], current)
+    with pytest.raises(HTTPException) as exc_info:
+        await read_feed(session_maker, stale)
+    assert exc_info.value.status_code == HTTP_410_GONE
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from app.schemas.user_schema import UserOut
+from app.services.conditional import is_not_modified, page_etag, user_etag
+
+CREATED = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def user(id: int = 1, version: int = 0) -> UserOut:
+    # Изменения в пределах одной секунды: updated_at совпадает
+    return UserOut(id=id, name="ann", surname="lee", created_at=CREATED, updated_at=CREATED, version=version)
+
+
+def test_user_etag_changes_with_version_within_a_second():
+    before, after = user_etag(1, 1), user_etag(1, 2)
+    assert before != after
+    assert user_etag(1, 1) != user_etag(2, 1)
+    assert not is_not_modified(before, None, after, CREATED)
+    assert is_not_modified(after, None, user_etag(1, 2), CREATED)
+
+
+def test_page_etag_changes_when_rows_leave_the_page():
+    page = [user(1), user(2), user(3)]
+    assert page_etag(page) != page_etag([page[0], page[2]])
+    assert page_etag(page) != page_etag(page[1:])
+    assert page_etag(page, 3) != page_etag(page, 4)
+    assert page_etag(page) == page_etag(list(page))
+
+
+def test_page_etag_changes_when_a_row_changes():
+    assert page_etag([user(1), user(2)]) != page_etag([user(1), user(2, version=1)])
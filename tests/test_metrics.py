@@ -0,0 +1,36 @@
+import pytest
+
+from app.services import metrics
+from app.services.metrics import MetricsWriter, RequestMetrics
+
+
+@pytest.fixture
+def collectors(monkeypatch):
+    registered: list = []
+    monkeypatch.setattr(metrics, "_collectors", registered)
+    return registered
+
+
+def test_registered_collectors_render_after_http_series(collectors):
+    @metrics.register
+    def collect(writer: MetricsWriter) -> None:
+        writer.metric("widgets_total", "counter", "Widgets.", 3)
+        writer.header("widgets_in_flight", "gauge", "Widgets by class.")
+        writer.sample("widgets_in_flight", 1, **{"class": 'a"b'})
+
+    text = RequestMetrics().render()
+    assert collectors == [collect]
+    assert text.index("# TYPE http_requests_total counter") < text.index("# TYPE widgets_total counter")
+    assert "widgets_total 3\n" in text
+    assert 'widgets_in_flight{class="a\\"b"} 1\n' in text
+
+
+def test_subsystems_register_their_own_series():
+    import app.asgi  # noqa: F401 - подключает все подсистемы
+
+    text = metrics.request_metrics.render()
+    for name in (
+        "db_pool_checked_out", "db_pool_wait_seconds", "user_cache_hits_total", "single_flight_calls_total",
+        "admission_admitted_total", "change_feed_waiters", "create_batch_items_total", "purge_runs_total",
+    ):
+        assert text.count(f"# TYPE {name} ") == 1
@@ -0,0 +1,96 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.models.user_model import User
+from app.schemas.user_schema import UserBulkDelete, UserDeleteFilter
+from app.services.purge import PurgeJob, PurgeStats
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.anyio
+
+
+def new_users(*names: str) -> list[dict]:
+    return [{"name": name, "surname": "purge", "password": "x"} for name in names]
+
+
+async def create(session_maker, *names: str) -> list[int]:
+    async with session_maker() as session:
+        repository = UserService(session=session).user_repository
+        rows = await repository.insert_many(new_users(*names))
+        await repository.commit()
+    return [row[0] for row in rows]
+
+
+async def stored_ids(session_maker) -> set[int]:
+    """ID всех строк таблицы, включая помеченные удаленными."""
+    async with session_maker() as session:
+        return set((await session.execute(select(User.id))).scalars())
+
+
+@pytest.fixture
+def repository_context(session_maker):
+    @asynccontextmanager
+    async def open_repository():
+        async with session_maker() as session:
+            yield UserService(session=session).user_repository
+    return open_repository
+
+
+async def test_purge_removes_soft_deleted_past_retention(session_maker, repository_context, monkeypatch):
+    monkeypatch.setattr(settings, "USER_SOFT_DELETE", True)
+    old, recent, kept = await create(session_maker, "old", "recent", "kept")
+    async with session_maker() as session:
+        await UserService(session=session).delete_user(old)
+    # Пометка хранится с точностью до секунды: old старше older_than=1, recent моложе
+    await asyncio.sleep(2.1)
+    async with session_maker() as session:
+        await UserService(session=session).delete_user(recent)
+    assert await stored_ids(session_maker) >= {old, recent, kept}
+
+    stats = PurgeStats()
+    job = PurgeJob(repository_context, older_than=1, chunk_size=1, stats=stats)
+    assert await job.run_once() == 1
+    ids = await stored_ids(session_maker)
+    assert old not in ids
+    assert {recent, kept} <= ids
+    assert (stats.runs, stats.purged) == (1, 1)
+
+    # Без soft delete пользователей задание не трогает
+    assert await PurgeJob(repository_context, older_than=None, stats=stats).run_once() == 0
+    assert recent in await stored_ids(session_maker)
+
+
+@pytest.mark.parametrize("soft", [False, True])
+async def test_bulk_delete_by_ids_in_chunks(session_maker, monkeypatch, soft):
+    monkeypatch.setattr(settings, "USER_SOFT_DELETE", soft)
+    monkeypatch.setattr(settings, "BULK_DELETE_CHUNK_SIZE", 2)
+    ids = await create(session_maker, "a", "b", "c")
+    async with session_maker() as session:
+        result = await UserService(session=session).delete_users(
+            UserBulkDelete(ids=[ids[0], ids[1], ids[0], ids[2], 10 ** 9])
+        )
+    assert (result.deleted, result.chunks, result.soft, result.missing) == (3, 2, soft, [10 ** 9])
+    async with session_maker() as session:
+        repository = UserService(session=session).user_repository
+        assert await repository.get_rows(ids) == []
+    assert (await stored_ids(session_maker) >= set(ids)) is soft
+
+
+async def test_bulk_delete_by_filter(session_maker, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_DELETE_CHUNK_SIZE", 2)
+    doomed = await create(session_maker, "x", "x", "x")
+    survivor, = await create(session_maker, "y")
+    async with session_maker() as session:
+        result = await UserService(session=session).delete_users(
+            UserBulkDelete(filter=UserDeleteFilter(name="x"))
+        )
+    assert (result.deleted, result.chunks) == (3, 2)
+    async with session_maker() as session:
+        count = (await session.execute(select(func.count()).select_from(User))).scalar_one()
+    assert count == 1
+    assert await stored_ids(session_maker) == {survivor}
+    assert not set(doomed) & await stored_ids(session_maker)
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.replicas import ReplicaRouter
+from app.schemas.user_schema import UserUpdate
+from app.services.cache import MemoryCacheBackend, UserCache
+from app.services.single_flight import SingleFlight
+from app.services.user_service import UserService
+from tests.conftest import create_engine
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def databases(tmp_path):
+    """Основная БД и реплика (два файла SQLite); реплика отстает - в ней прежнее имя."""
+    primary = await create_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica_url = f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"
+    await (await create_engine(replica_url)).dispose()
+    router = ReplicaRouter([replica_url], max_lag=1.0)
+
+    row = {"name": "ann", "surname": "lee", "password": "x"}
+    for maker, name in ((async_sessionmaker(primary), "ann"), (router._session_makers[0], "old")):
+        async with maker() as session:
+            await UserService(session=session).user_repository.insert_many([{**row, "name": name}])
+            await session.commit()
+    yield async_sessionmaker(primary, expire_on_commit=False), router
+    await router.dispose()
+    await primary.dispose()
+
+
+def make_service(session, read_session) -> UserService:
+    return UserService(
+        session=session,
+        read_session=read_session,
+        cache=UserCache(MemoryCacheBackend(max_size=100), ttl=60),
+        coalescer=SingleFlight(),
+    )
+
+
+async def test_replica_reads_are_not_cached_and_writes_switch_to_primary(databases):
+    primary, router = databases
+    async with primary() as session, await router.session() as read_session:
+        service = make_service(session, read_session)
+        assert (await service.get_user(1)).name == "old"
+        assert (await service.get_users_batch([1])).items[0].user.name == "old"
+        assert service.cache.stats().size == 0
+
+        await service.update_user(1, UserUpdate(surname="kim"))
+        # Read-your-writes: после записи чтение из основной БД и снова кешируется
+        user = await service.get_user(1)
+        assert (user.name, user.surname) == ("ann", "kim")
+        assert service.cache.stats().size == 1
+
+
+async def test_lagging_replica_falls_back_to_primary(databases, monkeypatch):
+    primary, router = databases
+
+    async def lag(index: int) -> float:
+        return 5.0
+
+    monkeypatch.setattr(router, "lag", lag)
+    assert await router.session() is None
+
+    async with primary() as session:
+        service = make_service(session, None)
+        assert (await service.get_user(1)).name == "ann"
+        assert service.cache.stats().size == 1
+
+
+@pytest.mark.parametrize("method", ["get_page", "get_list"])
+async def test_primary_read_does_not_join_pending_replica_read(databases, method):
+    primary, router = databases
+    coalescer = SingleFlight()
+    release = asyncio.Event()
+
+    async with primary() as session, await router.session() as read_session, primary() as writer_session:
+        replica_service = make_service(session, read_session)
+        replica_service.coalescer = coalescer
+        repository = replica_service.read_repository
+        for name in ("list_after", "list_paginated"):
+            original = getattr(repository, name)
+
+            async def gated(*args, original=original):
+                await release.wait()
+                return await original(*args)
+
+            setattr(repository, name, gated)
+        writer = make_service(writer_session, read_session)
+        writer.coalescer = coalescer
+        await writer.update_user(1, UserUpdate(surname="kim"))
+
+        # Другой запрос начал чтение с реплики уже после записи
+        pending = asyncio.create_task(getattr(replica_service, method)())
+        await asyncio.sleep(0)
+        # Чтение после записи идет в основную БД, не присоединяясь к чтению реплики
+        page = await asyncio.wait_for(getattr(writer, method)(), 1)
+        assert [(user.name, user.surname) for user in page.items] == [("ann", "kim")]
+
+        release.set()
+        assert [user.name for user in (await pending).items] == ["old"]
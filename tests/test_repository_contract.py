@@ -0,0 +1,170 @@
+"""Контрактные тесты репозиториев пользователей (``UserRepositoryContract``).
+
+Одни и те же ожидания проверяются для ``UserRepository`` (SQLite и PostgreSQL)
+и ``AsyncpgUserRepository`` (PostgreSQL); варианты для PostgreSQL без
+``TEST_POSTGRES_URL`` пропускаются.
+"""
+import asyncpg
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.repositories.asyncpg_user_repo import AsyncpgUserRepository
+from app.repositories.contract import UserRepositoryContract
+from app.repositories.user_repo import UserRepository
+from tests.conftest import POSTGRES_URL, create_engine
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(params=["sqlalchemy-sqlite", "sqlalchemy-postgresql", "asyncpg"])
+async def repository(request, tmp_path) -> UserRepositoryContract:
+    if request.param == "sqlalchemy-sqlite":
+        engine = await create_engine(f"sqlite+aiosqlite:///{tmp_path / 'users.db'}")
+    elif not POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    elif request.param == "sqlalchemy-postgresql":
+        engine = await create_engine(POSTGRES_URL)
+    else:
+        connection = request.getfixturevalue("postgres_connection")
+        yield AsyncpgUserRepository(connection)
+        return
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield UserRepository(session=session)
+    await engine.dispose()
+
+
+def users(*names: str) -> list[dict]:
+    return [{"name": name, "surname": f"{name}-surname", "password": "x"} for name in names]
+
+
+async def test_get_row(repository):
+    created = (await repository.insert_many(users("ann")))[0]
+    await repository.commit()
+
+    row = await repository.get_row(created[0])
+    assert tuple(row) == tuple(created)
+    assert tuple(row)[:3] == (created[0], "ann", "ann-surname")
+    assert await repository.get_row(created[0] + 1000) is None
+
+
+async def test_get_rows(repository):
+    created = await repository.insert_many(users("a", "b", "c"))
+    await repository.commit()
+
+    rows = await repository.get_rows([created[2][0], created[0][0], 10 ** 9])
+    assert sorted(row[0] for row in rows) == [created[0][0], created[2][0]]
+    assert await repository.get_rows([]) == []
+
+
+async def test_list_after_orders_newest_first(repository):
+    created = await repository.insert_many(users(*"abcde"))
+    await repository.commit()
+
+    pages, after = [], None
+    while True:
+        rows, after = await repository.list_after(after, limit=2)
+        pages.append([row[0] for row in rows])
+        if after is None:
+            break
+    # created_at у пакета одинаков: порядок задает id
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [id for page in pages for id in page] == sorted((row[0] for row in created), reverse=True)
+
+
+async def test_insert_many_keeps_input_order(repository):
+    names = ["e", "b", "d", "a", "c"]
+    created = await repository.insert_many(users(*names), batch_size=2)
+    await repository.commit()
+
+    assert [row[1] for row in created] == names
+    assert [row[0] for row in created] == sorted(row[0] for row in created)
+    assert await repository.insert_many([]) == []
+
+
+async def test_insert_many_rejects_invalid_rows(repository):
+    with pytest.raises((IntegrityError, asyncpg.IntegrityConstraintViolationError)):
+        await repository.insert_many([*users("ok"), {"name": None, "surname": "x", "password": "x"}])
+
+
+async def test_update_returning(repository):
+    created = (await repository.insert_many(users("ann")))[0]
+    await repository.commit()
+
+    row = await repository.update_returning(created[0], {"name": "bob"})
+    await repository.commit()
+    assert tuple(row)[:3] == (created[0], "bob", "ann-surname")
+    assert row[4] >= created[4]
+    assert row[5] == created[5] + 1
+    assert tuple(await repository.get_row(created[0])) == tuple(row)
+    assert tuple(await repository.get_version(created[0])) == (row[5], row[4])
+
+
+async def test_update_returning_missing(repository):
+    assert await repository.update_returning(10 ** 9, {"name": "bob"}) is None
+
+
+@pytest.mark.parametrize("soft", [False, True])
+async def test_delete_returning(repository, soft):
+    created = (await repository.insert_many(users("ann")))[0]
+    await repository.commit()
+
+    assert await repository.delete_returning(created[0], soft) == created[0]
+    await repository.commit()
+    assert await repository.get_row(created[0]) is None
+    assert await repository.delete_returning(created[0], soft) is None
+
+
+async def test_delete_many_skips_missing(repository):
+    created = await repository.insert_many(users("a", "b"))
+    await repository.commit()
+
+    deleted = await repository.delete_many([created[0][0], 10 ** 9, created[1][0]])
+    assert sorted(deleted) == [created[0][0], created[1][0]]
+
+
+async def test_search(repository):
+    created = await repository.insert_many(users("Alice", "alina", "Bob", "Malik"))
+    await repository.commit()
+    ids = {row[1]: row[0] for row in created}
+
+    rows, next_id = await repository.search("ALI", "prefix", ("name",))
+    assert [row[0] for row in rows] == [ids["Alice"], ids["alina"]]
+    assert next_id is None
+
+    rows, _ = await repository.search("lik", "substring", ("name",))
+    assert [row[0] for row in rows] == [ids["Malik"]]
+
+    rows, _ = await repository.search("bob-sur", "prefix", ("surname",))
+    assert [row[0] for row in rows] == [ids["Bob"]]
+
+
+async def test_search_pages_by_id(repository):
+    created = await repository.insert_many(users("ali1", "ali2", "ali3"))
+    await repository.commit()
+
+    rows, next_id = await repository.search("ali", "prefix", ("name",), limit=2)
+    assert [row[0] for row in rows] == [created[0][0], created[1][0]]
+    rows, next_id = await repository.search("ali", "prefix", ("name",), after_id=next_id, limit=2)
+    assert [row[0] for row in rows] == [created[2][0]]
+    assert next_id is None
+
+
+async def test_search_folds_non_ascii_case(repository):
+    created = await repository.insert_many(users("Анна", "Андрей", "Жанна", "Straße"))
+    await repository.commit()
+    ids = {row[1]: row[0] for row in created}
+
+    # Префикс от трех символов - индекс, короче - обход по id
+    for query in ("АНН", "ан"):
+        rows, _ = await repository.search(query, "prefix", ("name",))
+        assert [row[1] for row in rows] == (["Анна"] if len(query) >= 3 else ["Анна", "Андрей"])
+    rows, _ = await repository.search("АННА", "substring", ("name",))
+    assert [row[0] for row in rows] == [ids["Анна"], ids["Жанна"]]
+    rows, _ = await repository.search("STRASS", "prefix", ("name",))
+    assert [row[0] for row in rows] == [ids["Straße"]]
+
+    updated = await repository.update_returning(ids["Андрей"], {"name": "Аннушка"})
+    await repository.commit()
+    rows, _ = await repository.search("аНн", "prefix", ("name",))
+    assert [row[0] for row in rows] == [ids["Анна"], updated[0]]
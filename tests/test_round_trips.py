@@ -0,0 +1,74 @@
+from contextlib import contextmanager
+
+import pytest
+from litestar.exceptions import NotFoundException
+from sqlalchemy import event
+
+from app.config import settings
+from app.schemas.user_schema import UserUpdate
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.anyio
+
+
+@contextmanager
+def count_statements(engine):
+    """Считает запросы, отправленные в БД через движок."""
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+async def user_id(session_maker) -> int:
+    async with session_maker() as session:
+        service = UserService(session=session)
+        rows = await service.user_repository.insert_many([{"name": "a", "surname": "b", "password": "x"}])
+        await service.user_repository.commit()
+    return rows[0][0]
+
+
+async def test_update_is_one_round_trip(engine, session_maker, user_id):
+    async with session_maker() as session:
+        with count_statements(engine) as statements:
+            user = await UserService(session=session).update_user(user_id, UserUpdate(name="c"))
+    assert user.name == "c"
+    assert len(statements) == 1, statements
+
+
+async def test_update_missing_is_one_round_trip(engine, session_maker):
+    async with session_maker() as session:
+        with count_statements(engine) as statements, pytest.raises(NotFoundException):
+            await UserService(session=session).update_user(10 ** 9, UserUpdate(name="c"))
+    assert len(statements) == 1, statements
+
+
+@pytest.mark.parametrize("soft", [False, True])
+async def test_delete_is_one_round_trip(engine, session_maker, user_id, monkeypatch, soft):
+    monkeypatch.setattr(settings, "USER_SOFT_DELETE", soft)
+    async with session_maker() as session:
+        with count_statements(engine) as statements:
+            await UserService(session=session).delete_user(user_id)
+    assert len(statements) == 1, statements
+
+    async with session_maker() as session:
+        with count_statements(engine) as statements, pytest.raises(NotFoundException):
+            await UserService(session=session).delete_user(user_id)
+    assert len(statements) == 1, statements
+
+
+async def test_user_version_is_one_round_trip(engine, session_maker, user_id):
+    async with session_maker() as session:
+        service = UserService(session=session)
+        with count_statements(engine) as statements:
+            version, _ = await service.get_user_version(user_id)
+        assert len(statements) == 1, statements
+        await service.update_user(user_id, UserUpdate(name="c"))
+        assert (await service.get_user_version(user_id))[0] == version + 1
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+
+import pytest
+from litestar.exceptions import ServiceUnavailableException
+
+from app.config import settings
+from app.services import security
+from app.services.security import PasswordHasherPool, hash_password, needs_rehash, verify_password
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def fast_hashing(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ALGORITHM", "pbkdf2_sha256")
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ITERATIONS", 1000)
+
+
+@pytest.fixture
+def pool():
+    pool = PasswordHasherPool(max_workers=2, max_queue=2)
+    yield pool
+    pool.shutdown()
+
+
+def record_threads(monkeypatch, name: str) -> list[int]:
+    """Подменяет функцию модуля ``security`` оберткой, запоминающей поток вызова."""
+    threads: list[int] = []
+    original = getattr(security, name)
+
+    def recorded(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(security, name, recorded)
+    return threads
+
+
+async def test_hash_and_verify_run_off_the_event_loop(monkeypatch, pool):
+    hash_threads = record_threads(monkeypatch, "hash_password")
+    verify_threads = record_threads(monkeypatch, "verify_password")
+
+    stored = await pool.hash("secret")
+    assert await pool.verify("secret", stored)
+    assert not await pool.verify("wrong", stored)
+    assert stored.startswith("pbkdf2_sha256$1000$")
+    assert hash_threads and verify_threads
+    assert threading.get_ident() not in hash_threads + verify_threads
+
+
+async def test_full_queue_is_rejected(monkeypatch, pool):
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_hash(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return "hash"
+
+    monkeypatch.setattr(security, "hash_password", blocking_hash)
+    pool.max_queue = 1
+    pending = asyncio.create_task(pool.hash("a"))
+    await asyncio.sleep(0)
+    try:
+        with pytest.raises(ServiceUnavailableException):
+            await pool.hash("b")
+    finally:
+        release.set()
+    assert await pending == "hash"
+    assert pool.pending == 0
+
+
+async def test_shutdown_stops_the_executor(pool):
+    await pool.hash("secret")
+    executor = pool.executor
+    pool.shutdown()
+    assert pool._executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(int)
+    # Следующий вызов создает исполнитель заново
+    assert await pool.verify("secret", await pool.hash("secret"))
+
+
+async def test_login_rehashes_outdated_hash(session_maker):
+    outdated = hash_password("secret", iterations=500)
+    assert needs_rehash(outdated)
+    async with session_maker() as session:
+        repository = UserService(session=session).user_repository
+        user_id = (await repository.insert_many([{"name": "a", "surname": "b", "password": outdated}]))[0][0]
+        await repository.commit()
+
+    async with session_maker() as session:
+        await UserService(session=session).verify_credentials(user_id, "secret")
+    async with session_maker() as session:
+        rehashed, _ = await UserService(session=session).user_repository.get_credentials(user_id)
+    assert rehashed.startswith("pbkdf2_sha256$1000$")
+    assert not needs_rehash(rehashed)
+    assert verify_password("secret", rehashed)
+
+    # Актуальный хеш при входе не меняется
+    async with session_maker() as session:
+        await UserService(session=session).verify_credentials(user_id, "secret")
+    async with session_maker() as session:
+        assert (await UserService(session=session).user_repository.get_credentials(user_id))[0] == rehashed
@@ -0,0 +1,29 @@
+import pytest
+
+from app.config import settings
+from app.server import build_server, per_process_state
+
+
+def test_several_workers_require_a_token_secret(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_TOKEN_SECRET", "")
+    with pytest.raises(RuntimeError, match="AUTH_TOKEN_SECRET"):
+        build_server(workers=2)
+    assert build_server(workers=1) is not None
+
+    monkeypatch.setattr(settings, "AUTH_TOKEN_SECRET", "shared")
+    assert build_server(workers=2) is not None
+
+
+def test_per_process_state_lists_worker_local_jobs(monkeypatch):
+    monkeypatch.setattr(settings, "CREATE_BATCHING_ENABLED", True)
+    monkeypatch.setattr(settings, "PURGE_INTERVAL", 3600.0)
+    monkeypatch.setattr(settings, "CHANGE_FEED_RETENTION", 3600.0)
+    state = "\n".join(per_process_state())
+    assert "create batching" in state
+    assert "purge" in state
+
+    monkeypatch.setattr(settings, "CREATE_BATCHING_ENABLED", False)
+    monkeypatch.setattr(settings, "PURGE_INTERVAL", 0.0)
+    state = "\n".join(per_process_state())
+    assert "create batching" not in state
+    assert "purge" not in state
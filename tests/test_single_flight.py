@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+class Gate:
+    """Функция чтения, которая ждет открытия и считает вызовы."""
+
+    def __init__(self, result: object = "value"):
+        self.result = result
+        self.calls = 0
+        self.opened = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.opened.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+async def settle() -> None:
+    """Дает задачам дойти до ожидания общего вызова."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+async def test_one_call_serves_all_waiters():
+    flight, gate = SingleFlight(), Gate()
+    tasks = [asyncio.create_task(flight.do("user", 1, gate)) for _ in range(5)]
+    await settle()
+    assert flight.in_flight == 1
+    gate.opened.set()
+
+    assert await asyncio.gather(*tasks) == ["value"] * 5
+    assert gate.calls == 1
+    stats = flight.stats()["user"]
+    assert (stats.calls, stats.executions, stats.collapsed) == (5, 1, 4)
+    assert flight.in_flight == 0
+
+
+async def test_different_keys_and_kinds_run_separately():
+    flight, gate = SingleFlight(), Gate()
+    gate.opened.set()
+    await asyncio.gather(flight.do("user", 1, gate), flight.do("user", 2, gate), flight.do("list", 1, gate))
+    assert gate.calls == 3
+    assert flight.stats()["user"].collapsed == 0
+
+
+async def test_result_is_not_cached():
+    flight, gate = SingleFlight(), Gate()
+    gate.opened.set()
+    await flight.do("user", 1, gate)
+    await flight.do("user", 1, gate)
+    assert gate.calls == 2
+    assert flight.stats()["user"].executions == 2
+
+
+async def test_exception_reaches_every_waiter():
+    flight, gate = SingleFlight(), Gate(ValueError("boom"))
+    tasks = [asyncio.create_task(flight.do("user", 1, gate)) for _ in range(3)]
+    await settle()
+    gate.opened.set()
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert gate.calls == 1
+    assert flight.stats()["user"].errors == 1
+
+
+async def test_per_key_timeout():
+    flight, gate = SingleFlight(timeout=10), Gate()
+    tasks = [asyncio.create_task(flight.do("user", 1, gate, timeout=0.05)) for _ in range(2)]
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(result, TimeoutError) for result in results)
+    stats = flight.stats()["user"]
+    assert (stats.executions, stats.collapsed, stats.timeouts) == (1, 1, 1)
+    assert flight.in_flight == 0
+
+
+async def test_forget_starts_a_new_call():
+    flight, old, new = SingleFlight(), Gate("old"), Gate("new")
+    before = asyncio.create_task(flight.do("user", 1, old))
+    await settle()
+    flight.forget("user", 1)
+    after = asyncio.create_task(flight.do("user", 1, new))
+    await settle()
+    new.opened.set()
+    old.opened.set()
+
+    assert (await before, await after) == ("old", "new")
+    assert (old.calls, new.calls) == (1, 1)
+    assert flight.in_flight == 0
+
+
+async def test_forget_kind_detaches_only_that_kind():
+    flight, lists, user = SingleFlight(), Gate("list"), Gate("user")
+    tasks = [
+        asyncio.create_task(flight.do("list", 1, lists)),
+        asyncio.create_task(flight.do("list", 2, lists)),
+        asyncio.create_task(flight.do("user", 1, user)),
+    ]
+    await settle()
+    flight.forget_kind("list")
+    assert flight.in_flight == 1
+
+    joined = asyncio.create_task(flight.do("user", 1, user))
+    fresh = asyncio.create_task(flight.do("list", 1, lists))
+    await settle()
+    lists.opened.set()
+    user.opened.set()
+    await asyncio.gather(*tasks, joined, fresh)
+    assert (lists.calls, user.calls) == (3, 1)
+    assert flight.stats()["user"].collapsed == 1
+
+
+async def test_disabled_runs_every_call():
+    flight, gate = SingleFlight(enabled=False), Gate()
+    gate.opened.set()
+    await asyncio.gather(*(flight.do("user", 1, gate) for _ in range(3)))
+    assert gate.calls == 3
+    assert flight.stats() == {}
@@ -0,0 +1,79 @@
+import pytest
+from litestar.exceptions import NotAuthorizedException
+
+from app.config import settings
+from app.schemas.user_schema import UserUpdate
+from app.services.security import hash_password
+from app.services.tokens import token_service
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def fast_hashing(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ALGORITHM", "pbkdf2_sha256")
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ITERATIONS", 1000)
+
+
+@pytest.fixture
+async def user_id(session_maker) -> int:
+    async with session_maker() as session:
+        repository = UserService(session=session).user_repository
+        rows = await repository.insert_many([{"name": "a", "surname": "b", "password": hash_password("secret")}])
+        await repository.commit()
+    return rows[0][0]
+
+
+async def login(session_maker, user_id: int, password: str = "secret") -> str:
+    async with session_maker() as session:
+        token, _ = token_service.issue(user_id, await UserService(session=session).verify_credentials(user_id, password))
+    return token
+
+
+async def authenticate(session_maker, token: str):
+    # Отдельная сессия на каждый запрос - как у разных воркеров
+    async with session_maker() as session:
+        return await UserService(session=session).authenticate(token)
+
+
+async def test_logout_revokes_token(session_maker, user_id):
+    token = await login(session_maker, user_id)
+    assert (await authenticate(session_maker, token)).sub == user_id
+
+    async with session_maker() as session:
+        await UserService(session=session).revoke_tokens(user_id)
+    with pytest.raises(NotAuthorizedException):
+        await authenticate(session_maker, token)
+    assert (await authenticate(session_maker, await login(session_maker, user_id))).sub == user_id
+
+
+async def test_password_change_revokes_earlier_tokens(session_maker, user_id):
+    token = await login(session_maker, user_id)
+    async with session_maker() as session:
+        await UserService(session=session).update_user(user_id, UserUpdate(name="renamed"))
+    # Смена имени токены не отзывает
+    assert (await authenticate(session_maker, token)).sub == user_id
+
+    async with session_maker() as session:
+        await UserService(session=session).update_user(user_id, UserUpdate(password="changed"))
+    with pytest.raises(NotAuthorizedException):
+        await authenticate(session_maker, token)
+    with pytest.raises(NotAuthorizedException):
+        await login(session_maker, user_id)
+    assert (await authenticate(session_maker, await login(session_maker, user_id, "changed"))).sub == user_id
+
+
+async def test_rehash_on_login_keeps_tokens(session_maker, user_id, monkeypatch):
+    token = await login(session_maker, user_id)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ITERATIONS", 2000)
+    await login(session_maker, user_id)
+    assert (await authenticate(session_maker, token)).sub == user_id
+
+
+async def test_deleted_user_token_is_rejected(session_maker, user_id):
+    token = await login(session_maker, user_id)
+    async with session_maker() as session:
+        await UserService(session=session).delete_user(user_id)
+    with pytest.raises(NotAuthorizedException):
+        await authenticate(session_maker, token)